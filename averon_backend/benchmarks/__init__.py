@@ -0,0 +1,30 @@
+"""
+Micro- and load-benchmarks for the contact backend
+
+Run from the averon_backend directory, e.g.:
+
+    python -m benchmarks.recaptcha_client
+"""
+import os
+
+
+def setup_django():
+    """
+    Configure Django for a standalone benchmark run
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-only-secret-key')
+
+    import django
+    django.setup()
+
+
+def percentile(samples, pct):
+    """
+    Return the pct-th percentile (0-100) of a list of samples
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
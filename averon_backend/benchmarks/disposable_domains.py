@@ -0,0 +1,80 @@
+"""
+Memory and lookup latency of the disposable domain index
+
+Builds a synthetic blocklist of --domains entries and reports the index's
+per-worker memory (tracemalloc) and lookup latency for listed, sub-domain
+and clean addresses.
+
+    python -m benchmarks.disposable_domains --domains 100000
+"""
+import argparse
+import json
+import os
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+
+from . import percentile, setup_django
+
+
+def _domain(rng):
+    name = ''.join(rng.choices(string.ascii_lowercase + string.digits, k=rng.randint(6, 14)))
+    return f"{name}.{rng.choice(['com', 'net', 'org', 'io', 'xyz', 'email'])}"
+
+
+def _lookup_stats(index, domains, repeat):
+    samples = []
+    for _ in range(repeat):
+        for domain in domains:
+            start = time.perf_counter_ns()
+            index.match(domain)
+            samples.append((time.perf_counter_ns() - start) / 1000)
+    return {
+        'p50_us': round(percentile(samples, 50), 3),
+        'p99_us': round(percentile(samples, 99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--domains', type=int, default=100_000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from contact.disposable import DisposableDomainIndex
+
+    rng = random.Random(7)
+    listed = [_domain(rng) for _ in range(args.domains)]
+
+    with tempfile.NamedTemporaryFile('w', suffix='.conf', delete=False) as f:
+        f.write('\n'.join(listed))
+        path = f.name
+
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        index = DisposableDomainIndex.from_file(path)
+        load_seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.unlink(path)
+
+    sample = rng.sample(listed, min(args.lookups, len(listed)))
+    results = {
+        'domains': len(index),
+        'load_seconds': round(load_seconds, 3),
+        'index_mib': round(current / 2 ** 20, 2),
+        'peak_load_mib': round(peak / 2 ** 20, 2),
+        'listed': _lookup_stats(index, sample, 3),
+        'subdomain': _lookup_stats(index, [f'mx.eu.{d}' for d in sample], 3),
+        'clean': _lookup_stats(index, [f'mail.{_domain(rng)}' for _ in sample], 3),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
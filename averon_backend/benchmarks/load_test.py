@@ -0,0 +1,257 @@
+"""
+End-to-end load test for contact form submissions
+
+Boots the app under a real server against local reCAPTCHA and Resend stubs
+and a throwaway database, drives POST /api/contacts/ at a fixed concurrency
+and prints one JSON report per scenario:
+
+- wsgi:        ContactViewSet.create under gunicorn (core/wsgi.py)
+- asgi:        ContactViewSet.create under uvicorn (core/asgi.py)
+- asgi-native: the async endpoint POST /api/contacts/async/ under uvicorn
+
+    python -m benchmarks.load_test --requests 2000 --concurrency 32
+    python -m benchmarks.load_test --scenario wsgi --recaptcha-latency 0.05
+
+A temporary SQLite database is used unless DB_ENGINE is set in the
+environment, in which case that database is used as-is. SQLite runs in WAL
+mode with IMMEDIATE transactions and a busy timeout (see core/settings.py),
+so writers queue for the lock instead of failing, but it still serializes
+them; point DB_ENGINE at a scratch PostgreSQL database for numbers
+comparable to production.
+
+Any non-2xx response or transport error in the measured phase is reported
+on stderr and makes the run exit with status 1, so an overloaded or broken
+setup cannot pass for a fast one.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+from . import percentile
+from .stubs import recaptcha_stub, resend_stub
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    'wsgi': '/api/contacts/',
+    'asgi': '/api/contacts/',
+    'asgi-native': '/api/contacts/async/',
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _server_command(scenario, port, args):
+    if scenario == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn', 'core.wsgi:application',
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(args.workers),
+            '--threads', str(args.threads),
+            '--worker-class', 'gthread' if args.threads > 1 else 'sync',
+            '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+        '--host', '127.0.0.1',
+        '--port', str(port),
+        '--workers', str(args.workers),
+        '--log-level', 'warning',
+        '--no-access-log',
+    ]
+
+
+def _server_env(recaptcha_url, resend_url, workdir):
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'benchmark-only-secret-key')
+    if 'DB_ENGINE' not in os.environ:
+        env['DB_NAME'] = str(Path(workdir) / 'loadtest.sqlite3')
+    env.update({
+        'DEBUG': 'False',
+        'ALLOWED_HOSTS': '127.0.0.1,localhost',
+        'SECURE_SSL_REDIRECT': 'False',
+        'RECAPTCHA_SECRET_KEY': 'bench',
+        'RECAPTCHA_VERIFY_URL': recaptcha_url,
+        'RESEND_API_KEY': 'bench',
+        'RESEND_API_URL': resend_url,  # honoured by the resend client
+        'CONTACT_EMAIL_RECIPIENT': 'bench@example.com',
+        'DEFAULT_FROM_EMAIL': 'bench@example.com',
+        # Measure the submission path, not the rate limiter rejecting it
+        'THROTTLE_CONTACT_RATE': '100000000/second',
+        'THROTTLE_ANON_RATE': '100000000/second',
+    })
+    return env
+
+
+def _wait_until_up(url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server did not start within {timeout}s')
+
+
+async def _drive(base_url, path, total, concurrency, label='load'):
+    # Payloads are unique per run (label) and request, so none of them is
+    # answered by the duplicate-submission short-circuit
+    latencies = []
+    statuses = Counter()
+    counter = iter(range(total))
+
+    async def worker(client):
+        for index in counter:
+            payload = {
+                'name': 'Load Tester',
+                'email': f'{label}{index}@example.com',
+                'message': f'Load test submission number {index} for the contact form.',
+                'recaptcha_token': 'bench-token',
+            }
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=payload)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, statuses, elapsed
+
+
+def run_scenario(scenario, args, recaptcha, resend):
+    """
+    Run one scenario against a fresh server and database
+
+    Returns:
+        Dict with throughput, latency percentiles and error counts
+    """
+    workdir = tempfile.mkdtemp(prefix='averon-loadtest-')
+    env = _server_env(recaptcha.url, resend.url, workdir)
+    try:
+        subprocess.run(
+            [sys.executable, 'manage.py', 'migrate', '--no-input', '-v', '0'],
+            cwd=BACKEND_DIR, env=env, check=True
+        )
+
+        port = _free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        log = open(args.server_log, 'a') if args.server_log else subprocess.DEVNULL
+        server = subprocess.Popen(
+            _server_command(scenario, port, args),
+            cwd=BACKEND_DIR, env=env, stdout=log, stderr=log
+        )
+        try:
+            _wait_until_up(f'{base_url}/api/', server)
+            if args.warmup:
+                asyncio.run(_drive(base_url, SCENARIOS[scenario], args.warmup, args.concurrency, 'warmup'))
+            recaptcha_calls, resend_calls = recaptcha.hits, resend.hits
+            latencies, statuses, elapsed = asyncio.run(
+                _drive(base_url, SCENARIOS[scenario], args.requests, args.concurrency)
+            )
+            recaptcha_calls, resend_calls = recaptcha.hits - recaptcha_calls, resend.hits - resend_calls
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+            if log is not subprocess.DEVNULL:
+                log.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    ok = statuses.get('201', 0)
+    return {
+        'scenario': scenario,
+        'path': SCENARIOS[scenario],
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'workers': args.workers,
+        'duration_s': round(elapsed, 3),
+        'rps': round(args.requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(max(latencies), 2),
+        'status_counts': dict(statuses),
+        'error_rate': round(1 - ok / args.requests, 4),
+        # Notifications go through the bounded outbox pool; whatever it
+        # cannot take is left for process_notifications, which is not run here
+        'recaptcha_calls': recaptcha_calls,
+        'resend_calls': resend_calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=[*SCENARIOS, 'all'], default='all')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--warmup', type=int, default=50, help='Requests sent before measuring')
+    parser.add_argument('--workers', type=int, default=2, help='Server worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gunicorn worker')
+    parser.add_argument('--recaptcha-latency', type=float, default=0.0,
+                        help='Artificial siteverify latency in seconds')
+    parser.add_argument('--resend-latency', type=float, default=0.0,
+                        help='Artificial Resend API latency in seconds')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    parser.add_argument('--server-log', help='Append server output to this file (discarded by default)')
+    args = parser.parse_args()
+
+    scenarios = list(SCENARIOS) if args.scenario == 'all' else [args.scenario]
+
+    recaptcha = recaptcha_stub(latency=args.recaptcha_latency)
+    resend = resend_stub(latency=args.resend_latency)
+    try:
+        results = [run_scenario(scenario, args, recaptcha, resend) for scenario in scenarios]
+    finally:
+        recaptcha.stop()
+        resend.stop()
+
+    failed = {
+        result['scenario']: {
+            status: count for status, count in result['status_counts'].items()
+            if not (status.isdigit() and 200 <= int(status) < 300)
+        }
+        for result in results
+    }
+    failed = {scenario: statuses for scenario, statuses in failed.items() if statuses}
+
+    report = json.dumps({
+        'recaptcha_latency_s': args.recaptcha_latency,
+        'resend_latency_s': args.resend_latency,
+        'results': results,
+    }, indent=2)
+    print(report)
+    if args.output:
+        Path(args.output).write_text(report + '\n')
+    if failed:
+        for scenario, statuses in failed.items():
+            print(f'ERROR: {scenario}: non-2xx responses in the measured phase: {statuses}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
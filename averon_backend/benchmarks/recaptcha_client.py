@@ -0,0 +1,60 @@
+"""
+Compare per-request `requests.post` against the pooled RecaptchaVerifier
+
+    python -m benchmarks.recaptcha_client --requests 500 --latency 0.002
+"""
+import argparse
+import json
+import time
+
+from . import percentile, setup_django
+from .stubs import recaptcha_stub
+
+
+def _measure(fn, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'requests': count,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'mean_ms': round(sum(samples) / count, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Artificial stub latency in seconds')
+    args = parser.parse_args()
+
+    setup_django()
+    import requests
+    from contact.recaptcha import RecaptchaVerifier
+
+    server = recaptcha_stub(latency=args.latency)
+    try:
+        data = {'secret': 'bench', 'response': 'token'}
+
+        def unpooled():
+            requests.post(server.url, data=data, timeout=5).json()
+
+        verifier = RecaptchaVerifier(secret_key='bench', verify_url=server.url)
+
+        results = {
+            'unpooled': _measure(unpooled, args.requests),
+            'pooled': _measure(lambda: verifier.verify('token'), args.requests),
+        }
+        verifier.close()
+    finally:
+        server.stop()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
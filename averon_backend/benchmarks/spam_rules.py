@@ -0,0 +1,80 @@
+"""
+Per-message cost of the spam filter as the rule set grows
+
+Compares the compiled SpamRuleEngine against the previous approach of
+running re.search once per pattern. The keyword list grows with --sizes while
+the number of free-form regex rules stays at --patterns: keywords share one
+trie, whereas every extra regex adds an alternative to the combined scan.
+
+    python -m benchmarks.spam_rules --sizes 10 100 1000 5000 --patterns 5
+"""
+import argparse
+import json
+import random
+import re
+import string
+import time
+
+from . import setup_django
+
+SAMPLE_MESSAGE = (
+    "Hello, we are a small family business looking for a new website with an "
+    "online booking system and a gallery. Could you send us a quote and an "
+    "estimated timeline? We would also like to discuss hosting and SEO. "
+) * 4
+
+
+def _random_word(rng):
+    return ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+
+
+def _rules(count, pattern_count, rng):
+    keywords = [_random_word(rng) for _ in range(count)]
+    patterns = [rf'{_random_word(rng)}\d{{3,}}' for _ in range(pattern_count)]
+    return (
+        [{'name': 'keywords', 'keywords': keywords}]
+        + [{'name': f'pattern-{i}', 'pattern': p} for i, p in enumerate(patterns)]
+    ), keywords + patterns
+
+
+def _per_message_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(SAMPLE_MESSAGE)
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--patterns', type=int, default=5,
+                        help='Number of regex rules alongside the keywords')
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from contact.spam import SpamRuleEngine
+
+    rng = random.Random(42)
+    results = []
+    for size in args.sizes:
+        rules, raw_patterns = _rules(size, args.patterns, rng)
+        engine = SpamRuleEngine(rules)
+
+        def naive(text, patterns=raw_patterns):
+            for pattern in patterns:
+                if re.search(pattern, text, re.IGNORECASE):
+                    return True
+            return False
+
+        results.append({
+            'rules': size,
+            'engine_us_per_message': _per_message_us(engine.match, args.iterations),
+            'per_pattern_search_us_per_message': _per_message_us(naive, max(1, args.iterations // 10)),
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Local stub servers standing in for third-party APIs during benchmarks
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024  # send headers and body in one segment
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        with self.server.hits_lock:
+            self.server.hits += 1
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        body = json.dumps(self.server.payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering every POST with a fixed JSON payload
+
+    Args:
+        payload: JSON-serializable response body
+        latency: Artificial delay in seconds before responding
+
+    `hits` counts the requests received so far.
+    """
+    daemon_threads = True
+
+    def __init__(self, payload, latency=0.0):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.payload = payload
+        self.latency = latency
+        self.hits = 0
+        self.hits_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def recaptcha_stub(score=0.9, latency=0.0):
+    """
+    Start a stub reCAPTCHA siteverify server
+    """
+    return StubServer({'success': True, 'score': score, 'action': 'submit'}, latency).start()
+
+
+def resend_stub(latency=0.0):
+    """
+    Start a stub Resend API server
+    """
+    return StubServer({'id': 'stub-email-id'}, latency).start()
@@ -1,6 +1,56 @@
+from datetime import date, timedelta
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Contacts
+from .models import Contacts, NotificationOutbox
+from .response_cache import invalidate_on_commit
+from .exports import FORMAT_CSV, FORMAT_NDJSON, export_response
+from .pagination import EstimatedCountPaginator
+
+
+class ContactsChangeList(ChangeList):
+    """
+    Changelist whose date drill-down reads the daily statistics
+
+    Without list filters or a search, the years, months and days offered by
+    date_hierarchy are exactly the days with submissions, so they come from
+    ContactDailyStats instead of a DISTINCT over every contact.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        if exclude_parameters is None and self._only_date_filters():
+            queryset = queryset.with_daily_stats_dates(*self._date_range())
+        return queryset
+
+    def _date_params(self):
+        return [f'{self.date_hierarchy}__{part}' for part in ('year', 'month', 'day')]
+
+    def _only_date_filters(self):
+        return (
+            bool(self.date_hierarchy)
+            and not self.query
+            and not self.has_active_filters
+            and set(self.get_filters_params()) <= set(self._date_params())
+        )
+
+    def _date_range(self):
+        """
+        (start, end) days selected in the drill-down; (None, None) for all
+        """
+        year, month, day = (self.params.get(param) for param in self._date_params())
+        if year is None:
+            return None, None
+        # Already validated by get_filters()
+        start = date(int(year), int(month or 1), int(day or 1))
+        if day:
+            return start, start + timedelta(days=1)
+        if month:
+            return start, (start + timedelta(days=32)).replace(day=1)
+        return start, start.replace(year=start.year + 1)
 
 
 @admin.register(Contacts)
@@ -13,25 +63,31 @@ class ContactsAdmin(admin.ModelAdmin):
         'is_processed', 'colored_status', 'ip_address'
     ]
     list_filter = [
-        'is_processed', 'created_at', 'updated_at'
+        'is_processed', 'recaptcha_degraded', 'created_at', 'updated_at'
     ]
+    # Searched through the full-text index, not ILIKE (see get_search_results)
     search_fields = [
         'name', 'email', 'message', 'ip_address'
     ]
     readonly_fields = [
         'id', 'created_at', 'updated_at',
-        'ip_address', 'user_agent', 'processed_at'
+        'ip_address', 'user_agent', 'processed_at', 'recaptcha_degraded'
     ]
     ordering = ['-created_at']
+    # Drill-down dates come from ContactDailyStats (see ContactsChangeList)
     date_hierarchy = 'created_at'
     list_per_page = 25
+    # Counts above ADMIN_EXACT_COUNT_LIMIT are planner estimates, and the
+    # unfiltered total ("of N") is not counted at all
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Contact Information', {
             'fields': ('name', 'email', 'message')
         }),
         ('Status', {
-            'fields': ('is_processed', 'processed_at')
+            'fields': ('is_processed', 'processed_at', 'recaptcha_degraded')
         }),
         ('Audit Information', {
             'fields': ('id', 'created_at', 'updated_at', 'ip_address', 'user_agent'),
@@ -39,7 +95,17 @@ class ContactsAdmin(admin.ModelAdmin):
         }),
     )
 
-    actions = ['mark_as_processed', 'mark_as_unprocessed']
+    actions = ['mark_as_processed', 'mark_as_unprocessed', 'export_as_csv', 'export_as_ndjson']
+
+    def get_changelist(self, request, **kwargs):
+        return ContactsChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """Full-text search, ranked by relevance unless a column sort is chosen"""
+        if not search_term.strip():
+            return queryset, False
+        # Runs after the changelist ordering is applied, so ranking replaces it
+        return queryset.search(search_term, ranked=ORDER_VAR not in request.GET), False
 
     def colored_status(self, obj):
         """Display colored status indicator"""
@@ -54,11 +120,9 @@ class ContactsAdmin(admin.ModelAdmin):
 
     def mark_as_processed(self, request, queryset):
         """Bulk action to mark contacts as processed"""
-        count = 0
-        for contact in queryset:
-            if not contact.is_processed:
-                contact.mark_as_processed()
-                count += 1
+        count, _ = queryset.mark_as_processed(
+            chunk_size=settings.CONTACT_BULK_UPDATE_CHUNK_SIZE
+        )
         self.message_user(
             request,
             f'{count} contact(s) marked as processed.'
@@ -67,9 +131,52 @@ class ContactsAdmin(admin.ModelAdmin):
 
     def mark_as_unprocessed(self, request, queryset):
         """Bulk action to mark contacts as unprocessed"""
-        count = queryset.update(is_processed=False, processed_at=None)
+        count = queryset.update(is_processed=False, processed_at=None, updated_at=timezone.now())
+        invalidate_on_commit()
         self.message_user(
             request,
             f'{count} contact(s) marked as unprocessed.'
         )
     mark_as_unprocessed.short_description = 'Mark selected contacts as unprocessed'
+
+    def export_as_csv(self, request, queryset):
+        """Bulk action to download the selected contacts as CSV"""
+        return export_response(queryset, FORMAT_CSV)
+    export_as_csv.short_description = 'Export selected contacts as CSV'
+
+    def export_as_ndjson(self, request, queryset):
+        """Bulk action to download the selected contacts as NDJSON"""
+        return export_response(queryset, FORMAT_NDJSON)
+    export_as_ndjson.short_description = 'Export selected contacts as NDJSON'
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    """
+    Read-only view of queued and failed contact notifications
+    """
+    list_display = [
+        'id', 'contact', 'status', 'attempts', 'next_attempt_at', 'sent_at'
+    ]
+    list_filter = ['status']
+    list_select_related = ['contact']
+    readonly_fields = [
+        'contact', 'status', 'attempts', 'next_attempt_at',
+        'last_error', 'created_at', 'sent_at'
+    ]
+    ordering = ['-created_at']
+    list_per_page = 25
+
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        """Bulk action to reschedule notifications for immediate delivery"""
+        count = queryset.exclude(status=NotificationOutbox.STATUS_SENT).update(
+            status=NotificationOutbox.STATUS_PENDING,
+            next_attempt_at=timezone.now()
+        )
+        self.message_user(
+            request,
+            f'{count} notification(s) rescheduled.'
+        )
+    retry_now.short_description = 'Retry selected notifications now'
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ContactConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contact'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Load the blocklist at startup rather than on the first request
+        from .disposable import get_disposable_index
+        get_disposable_index()
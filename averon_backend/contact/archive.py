@@ -0,0 +1,203 @@
+"""
+Archival of old processed contacts
+
+Processed contacts older than a retention period are moved out of the
+contacts table into gzip-compressed JSONL files, one shard per day of
+submission:
+
+    CONTACT_ARCHIVE_DIR/2026/03/contacts-2026-03-01.jsonl.gz
+
+Each chunk is a short transaction: lock up to `chunk_size` of the oldest
+matching rows (skipping rows other transactions hold), append them to their
+shards as a new gzip member, fsync, then delete them. A crash between the
+write and the commit leaves rows both archived and in the table; they are
+archived again on the next run and restoring skips contacts that exist, so
+duplicates in a shard are harmless (the last copy wins).
+
+Restoring reinserts the contacts with their original ids and timestamps.
+ContactDailyStats keeps archived contacts in its archived columns, so the
+statistics are unchanged by either direction.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .models import Contacts
+from .response_cache import invalidate_on_commit
+from .stats import record_archived
+
+SHARD_PREFIX = 'contacts-'
+SHARD_SUFFIX = '.jsonl.gz'
+
+# search_vector is derived and refilled by the search trigger on restore
+ARCHIVE_FIELDS = [
+    field.attname for field in Contacts._meta.concrete_fields if field.name != 'search_vector'
+]
+
+
+class _ArchiveEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder keeping full microsecond precision
+
+    DjangoJSONEncoder rounds datetimes to milliseconds, which would move
+    restored contacts in the (created_at, id) keyset order.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def archive_root(root=None):
+    return Path(root or settings.CONTACT_ARCHIVE_DIR)
+
+
+def shard_path(root, day):
+    """
+    Archive file holding the contacts submitted on `day`
+    """
+    return archive_root(root) / f'{day:%Y}' / f'{day:%m}' / f'{SHARD_PREFIX}{day.isoformat()}{SHARD_SUFFIX}'
+
+
+def archivable(older_than_days, using=DEFAULT_DB_ALIAS):
+    """
+    Processed contacts submitted more than `older_than_days` days ago
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Contacts.objects.using(using).filter(is_processed=True, created_at__lt=cutoff)
+
+
+def archive_contacts(older_than_days, chunk_size=None, root=None, using=DEFAULT_DB_ALIAS):
+    """
+    Move processed contacts older than `older_than_days` days to the archive
+
+    Returns:
+        Number of contacts archived
+    """
+    chunk_size = chunk_size or settings.CONTACT_ARCHIVE_CHUNK_SIZE
+    total = 0
+    while True:
+        archived = _archive_chunk(archivable(older_than_days, using), chunk_size, root, using)
+        total += archived
+        if archived < chunk_size:
+            return total
+
+
+def _archive_chunk(queryset, chunk_size, root, using):
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        rows = list(
+            queryset.select_for_update(skip_locked=True)
+            .order_by('created_at', 'id')
+            .values(*ARCHIVE_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            return 0
+
+        shards = {}
+        for row in rows:
+            shards.setdefault(timezone.localdate(row['created_at']), []).append(row)
+        for day, shard_rows in shards.items():
+            _append_shard(shard_path(root, day), shard_rows)
+
+        Contacts.objects.using(using).filter(pk__in=[row['id'] for row in rows]).delete()
+        record_archived(
+            connection,
+            [(row['created_at'], row['is_processed'], row['processed_at']) for row in rows]
+        )
+    return len(rows)
+
+
+def _append_shard(path, rows):
+    # A new gzip member per chunk; readers see the concatenation
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as shard:
+            for row in rows:
+                shard.write(json.dumps(row, cls=_ArchiveEncoder).encode('utf-8') + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def shard_paths(start=None, end=None, root=None):
+    """
+    Archive files for the days from `start` to `end` (inclusive), oldest first
+    """
+    paths = []
+    for path in archive_root(root).glob(f'*/*/{SHARD_PREFIX}*{SHARD_SUFFIX}'):
+        try:
+            day = date.fromisoformat(path.name[len(SHARD_PREFIX):-len(SHARD_SUFFIX)])
+        except ValueError:
+            continue
+        if (start is None or day >= start) and (end is None or day <= end):
+            paths.append((day, path))
+    return [path for day, path in sorted(paths)]
+
+
+def read_shard(path):
+    """
+    Contacts in an archive file as model field values, the last copy of each
+    """
+    records = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as shard:
+        for line in shard:
+            if line.strip():
+                row = json.loads(line)
+                records[row['id']] = {
+                    attname: Contacts._meta.get_field(attname).to_python(row.get(attname))
+                    for attname in ARCHIVE_FIELDS
+                }
+    return list(records.values())
+
+
+def restore_contacts(paths, chunk_size=None, using=DEFAULT_DB_ALIAS):
+    """
+    Put the contacts in the given archive files back into the table
+
+    Contacts that are already in the table are left alone, so restoring the
+    same files again is a no-op.
+
+    Returns:
+        Number of contacts restored
+    """
+    chunk_size = chunk_size or settings.CONTACT_ARCHIVE_CHUNK_SIZE
+    total = 0
+    for path in paths:
+        records = read_shard(path)
+        for start in range(0, len(records), chunk_size):
+            total += _restore_chunk(records[start:start + chunk_size], using)
+    return total
+
+
+def _restore_chunk(records, using):
+    manager = Contacts.objects.using(using)
+    with transaction.atomic(using=using):
+        existing = set(
+            manager.filter(pk__in=[record['id'] for record in records]).values_list('pk', flat=True)
+        )
+        records = [record for record in records if record['id'] not in existing]
+        if not records:
+            return 0
+
+        contacts = manager.bulk_create(Contacts(**record) for record in records)
+        # bulk_create stamps auto_now(_add) fields; bulk_update does not
+        for contact, record in zip(contacts, records):
+            contact.created_at = record['created_at']
+            contact.updated_at = record['updated_at']
+        manager.bulk_update(contacts, ['created_at', 'updated_at'])
+
+        record_archived(
+            connections[using],
+            [(record['created_at'], record['is_processed'], record['processed_at']) for record in records],
+            sign=-1
+        )
+        invalidate_on_commit()
+    return len(records)
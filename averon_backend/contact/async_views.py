@@ -0,0 +1,151 @@
+"""
+Native async contact submission endpoint for the ASGI entry point
+
+Served by `core/asgi.py` (e.g. under uvicorn), this view awaits reCAPTCHA
+verification instead of blocking a worker thread, so a single worker can hold
+many in-flight submissions while Google is slow. Under WSGI it still works,
+but Django runs it in a one-off event loop per request.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .dedup import claim_submission, finish_submission
+from .recaptcha import averify_recaptcha
+from .serializers import ContactSerializer
+from .throttles import ContactSubmitThrottle
+from .timing import stage
+from .views import (
+    check_recaptcha_result, duplicate_submission_result, get_client_ip,
+    get_user_agent, save_contact, submission_response_data,
+)
+
+logger = logging.getLogger('django')
+security_logger = logging.getLogger('django.security')
+
+
+def _json_response(body, status_code, headers=None):
+    response = HttpResponse(
+        JSONRenderer().render(body),
+        content_type='application/json',
+        status=status_code,
+    )
+    for header, value in (headers or {}).items():
+        response[header] = value
+    return response
+
+
+def _check_throttle(request):
+    """
+    Apply ContactSubmitThrottle; returns the wait in seconds if throttled
+    """
+    throttle = ContactSubmitThrottle()
+    if throttle.allow_request(Request(request), None):
+        return None
+    return throttle.wait() or 0
+
+
+@csrf_exempt
+@require_POST
+async def create_contact_async(request):
+    """
+    Create a new contact without blocking the event loop
+
+    Mirrors ContactViewSet.create: same throttling, reCAPTCHA rules,
+    validation and response body.
+    """
+    try:
+        ip_address = get_client_ip(request)
+        user_agent = get_user_agent(request)
+
+        with stage('throttle'):
+            wait = await sync_to_async(_check_throttle, thread_sensitive=False)(request)
+        if wait is not None:
+            return _json_response(
+                {'detail': 'Request was throttled.'},
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                {'Retry-After': str(int(wait))}
+            )
+
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return _json_response(
+                {'message': 'Validation failed', 'errors': {'non_field_errors': ['Invalid JSON body']}},
+                status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(data, dict):
+            return _json_response(
+                {'message': 'Validation failed', 'errors': {'non_field_errors': ['Expected a JSON object']}},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        # Identical recent submission: answer it before any expensive work
+        dedup_key, previous = await sync_to_async(claim_submission, thread_sensitive=False)(data)
+        if previous is not None:
+            return _json_response(*duplicate_submission_result(previous))
+
+        created = None
+        try:
+            # Log the submission attempt
+            security_logger.info(
+                "Contact form submission attempt from IP: %s", ip_address
+            )
+
+            # Verify reCAPTCHA if token is provided
+            recaptcha_token = data.get('recaptcha_token', '')
+            recaptcha_degraded = False
+            if recaptcha_token:
+                with stage('recaptcha'):
+                    result = await averify_recaptcha(recaptcha_token, ip_address)
+                rejection, recaptcha_degraded = check_recaptcha_result(result, ip_address)
+                if rejection:
+                    return _json_response(*rejection)
+
+            # Validation is pure CPU work and does not touch the database
+            serializer = ContactSerializer(data=data)
+            with stage('validate'):
+                is_valid = serializer.is_valid()
+            if not is_valid:
+                logger.warning(
+                    "Contact form validation failed from IP %s: %s", ip_address, serializer.errors
+                )
+                return _json_response(
+                    {'message': 'Validation failed', 'errors': serializer.errors},
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+            # Django's async ORM cannot open transactions yet, so the atomic
+            # contact + outbox insert hops to the ORM thread the same way
+            # acreate() does. The notification is then handed to the bounded
+            # outbox pool on commit; no thread is spawned per request.
+            contact = await sync_to_async(save_contact)(
+                serializer, ip_address, user_agent, recaptcha_degraded
+            )
+
+            created = submission_response_data(contact)
+            return _json_response(created, status.HTTP_201_CREATED)
+        finally:
+            await sync_to_async(finish_submission, thread_sensitive=False)(dedup_key, created)
+
+    except Exception as e:
+        # Catch any unexpected errors
+        logger.error(
+            "Unexpected error in async contact form submission: %s", e,
+            exc_info=True
+        )
+        return _json_response(
+            {
+                'message': 'An error occurred while processing your request. Please try again later.',
+                'error': str(e) if settings.DEBUG else 'Internal server error'
+            },
+            status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
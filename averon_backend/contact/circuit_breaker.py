@@ -0,0 +1,151 @@
+"""
+Cache-backed circuit breaker for calls to third-party services
+
+State lives in the Django cache, so every worker process sharing that cache
+(e.g. Redis) sees the same breaker. Each process also remembers when the
+breaker was opened, so while it is open requests are rejected without even a
+cache round trip.
+
+Callers hold on to the permit returned by allow_request() and hand it back
+to record_success() / record_failure(), so the half-open probe is tracked
+per call rather than per thread (coroutines share a thread).
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('django')
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# Permits returned by CircuitBreaker.allow_request()
+PERMIT_CALL = 'call'
+PERMIT_PROBE = 'probe'
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker
+
+    - closed: calls flow; failures are counted in a fixed window and the
+      breaker opens once `failure_threshold` is reached.
+    - open: calls are rejected immediately for `reset_timeout` seconds.
+    - half-open: a single probe call is let through (across all workers);
+      success closes the breaker, failure re-opens it.
+
+    Args:
+        name: Cache key namespace for this breaker
+        failure_threshold: Failures within the window that open the breaker
+        failure_window: Window in seconds for counting failures
+        reset_timeout: Seconds to stay open before allowing a probe
+    """
+
+    def __init__(self, name, failure_threshold=5, failure_window=30, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+
+        self._failures_key = f'circuit:{name}:failures'
+        self._opened_key = f'circuit:{name}:opened_at'
+        self._probe_key = f'circuit:{name}:probe'
+
+        self._open_until = 0.0  # per-process fast path
+
+    @classmethod
+    def from_settings(cls, name, prefix):
+        """
+        Build a breaker from `<prefix>_BREAKER_*` settings
+        """
+        return cls(
+            name,
+            failure_threshold=getattr(settings, f'{prefix}_BREAKER_FAILURE_THRESHOLD', 5),
+            failure_window=getattr(settings, f'{prefix}_BREAKER_FAILURE_WINDOW', 30),
+            reset_timeout=getattr(settings, f'{prefix}_BREAKER_RESET_TIMEOUT', 30),
+        )
+
+    @property
+    def state(self) -> str:
+        """Current breaker state as seen by this process"""
+        if time.time() < self._open_until:
+            return STATE_OPEN
+
+        opened_at = cache.get(self._opened_key)
+        if opened_at is None:
+            return STATE_CLOSED
+        if time.time() - opened_at < self.reset_timeout:
+            self._open_until = opened_at + self.reset_timeout
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def allow_request(self):
+        """
+        Return a permit if a call may be attempted now, else None
+
+        In the half-open state only one caller across all workers wins the
+        probe slot (PERMIT_PROBE); everyone else is rejected until the probe
+        resolves. Pass the permit to record_success() / record_failure().
+        """
+        state = self.state
+        if state == STATE_CLOSED:
+            return PERMIT_CALL
+        if state == STATE_OPEN:
+            return None
+
+        if cache.add(self._probe_key, 1, timeout=self.reset_timeout):
+            return PERMIT_PROBE
+        return None
+
+    def record_success(self, permit=PERMIT_CALL):
+        """Record a successful call; closes the breaker after a good probe"""
+        if permit == PERMIT_PROBE:
+            cache.delete_many([self._opened_key, self._failures_key, self._probe_key])
+            self._open_until = 0.0
+            logger.warning("Circuit '%s' closed after successful probe", self.name)
+
+    def record_failure(self, permit=PERMIT_CALL):
+        """Record a failed call; opens the breaker when the threshold is hit"""
+        if permit == PERMIT_PROBE:
+            cache.delete(self._probe_key)
+            self._open()
+            return
+
+        cache.add(self._failures_key, 0, timeout=self.failure_window)
+        try:
+            failures = cache.incr(self._failures_key)
+        except ValueError:
+            # Window expired between add() and incr()
+            cache.set(self._failures_key, 1, timeout=self.failure_window)
+            failures = 1
+
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        now = time.time()
+        cache.set(self._opened_key, now, timeout=self.reset_timeout * 10)
+        cache.delete(self._failures_key)
+        self._open_until = now + self.reset_timeout
+        logger.warning(
+            "Circuit '%s' opened for %ss", self.name, self.reset_timeout
+        )
+
+    def reset(self):
+        """Force the breaker closed"""
+        cache.delete_many([self._opened_key, self._failures_key, self._probe_key])
+        self._open_until = 0.0
+
+    def snapshot(self) -> dict:
+        """
+        Breaker state for metrics and health checks
+        """
+        return {
+            'name': self.name,
+            'state': self.state,
+            'failures': cache.get(self._failures_key, 0),
+            'opened_at': cache.get(self._opened_key),
+        }
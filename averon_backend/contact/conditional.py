@@ -0,0 +1,95 @@
+"""
+Conditional GET (ETag / Last-Modified) for admin contact endpoints
+
+Validators are derived from MAX(updated_at) and COUNT(*) of the rows an
+endpoint reads, plus the request path and query string. One aggregate query
+(or one cache lookup, see response_cache) is enough to answer
+`304 Not Modified`, without running the page query or serializing anything.
+
+Every write path keeps `updated_at` current (saves via auto_now, set-based
+updates explicitly), and deletes change the count, so the ETag changes
+whenever the response body would.
+
+Last-Modified is only sent for single objects. For a list, MAX(updated_at)
+does not advance when a row is deleted or archived (or leaves the filter),
+so If-Modified-Since would answer 304 for a changed list; list endpoints
+revalidate with the ETag alone.
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+from .response_cache import get_versioned, request_key, set_versioned
+
+VALIDATOR_KEY_PREFIX = 'contacts:validators:'
+
+
+def compute_validators(queryset, request, view):
+    """
+    Build the ETag and Last-Modified values for a queryset
+
+    Returns:
+        Tuple of (etag, last_modified) where last_modified is a Unix
+        timestamp, or None for an empty queryset
+    """
+    stats = queryset.order_by().aggregate(last_updated=Max('updated_at'), rows=Count('pk'))
+    last_updated = stats['last_updated']
+
+    parts = [
+        last_updated.isoformat() if last_updated else '',
+        str(stats['rows']),
+        request.get_full_path(),
+        view.get_serializer_class().__name__,
+    ]
+    etag = 'W/"%s"' % hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+    return etag, int(last_updated.timestamp()) if last_updated else None
+
+
+def _get_validators(queryset, request, view):
+    if not settings.CONTACT_RESPONSE_CACHE_TIMEOUT:
+        return compute_validators(queryset, request, view)
+
+    key = request_key(request, view, prefix=VALIDATOR_KEY_PREFIX)
+    version, validators = get_versioned(key)
+    if validators is None:
+        validators = compute_validators(queryset, request, view)
+        set_versioned(key, version, validators)
+    return validators
+
+
+def conditional_response(get_scope, last_modified=True):
+    """
+    Answer conditional GETs for a ViewSet action
+
+    Args:
+        get_scope: Callable (view, request, kwargs) -> queryset of the rows
+            the action's response is built from
+        last_modified: Send and honour Last-Modified; False for lists
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            etag, modified = _get_validators(get_scope(self, request, kwargs), request, self)
+            if not last_modified:
+                modified = None
+
+            not_modified = get_conditional_response(
+                request._request, etag=etag, last_modified=modified
+            )
+            response = not_modified or view_method(self, request, *args, **kwargs)
+
+            if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+                response['ETag'] = etag
+                if modified is not None:
+                    response['Last-Modified'] = http_date(modified)
+                # Let clients keep the copy but revalidate on every poll
+                response['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return wrapper
+    return decorator
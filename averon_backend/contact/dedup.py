@@ -0,0 +1,92 @@
+"""
+Duplicate submission short-circuit
+
+Double clicks and replayed payloads are recognised by a fingerprint of
+(email, normalized message) kept in the shared cache (Redis in production)
+for CONTACT_DUPLICATE_WINDOW seconds. A repeat inside the window gets the
+original 201 response back before reCAPTCHA, validation, the INSERT or the
+notification run.
+
+The first request claims the fingerprint with an atomic cache.add(), so
+concurrent duplicates cannot both get through: while the first one is still
+running they get 409 with Retry-After straight away rather than holding a
+worker, and a later retry replays its response. A claim left behind by a
+crashed worker expires after CONTACT_DUPLICATE_CLAIM_TIMEOUT seconds.
+
+A submission that does not end in 201 releases the fingerprint, so a
+corrected retry (e.g. with a fresh reCAPTCHA token) is processed normally.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import DUPLICATE_SUBMISSIONS
+
+KEY_PREFIX = 'contact:dup:'
+IN_FLIGHT = 'in-flight'
+
+
+def normalize_message(message):
+    """
+    Case- and whitespace-insensitive form of a message
+    """
+    return ' '.join(message.casefold().split())
+
+
+def fingerprint(email, message):
+    """
+    Hex digest identifying a submission by sender and content
+    """
+    content = f'{email.strip().casefold()}\n{normalize_message(message)}'
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def claim_submission(data):
+    """
+    Claim the fingerprint of a raw submission payload
+
+    Args:
+        data: Submitted data (not yet validated)
+
+    Returns:
+        Tuple of (key, previous): previous is the stored response body of an
+        identical earlier submission, IN_FLIGHT if one is still being
+        processed, or None when this request now owns the key (None when
+        deduplication does not apply). Pass the key to finish_submission().
+    """
+    window = settings.CONTACT_DUPLICATE_WINDOW
+    email, message = data.get('email'), data.get('message')
+    if not window or not isinstance(email, str) or not isinstance(message, str):
+        return None, None
+
+    key = KEY_PREFIX + fingerprint(email, message)
+    timeout = settings.CONTACT_DUPLICATE_CLAIM_TIMEOUT
+    if cache.add(key, IN_FLIGHT, timeout):
+        return key, None
+
+    previous = cache.get(key)
+    # The earlier attempt failed and released the key; claim it once more
+    if previous is None and cache.add(key, IN_FLIGHT, timeout):
+        return key, None
+    if previous is None:
+        previous = cache.get(key) or IN_FLIGHT
+
+    DUPLICATE_SUBMISSIONS.labels('in_flight' if previous == IN_FLIGHT else 'replayed').inc()
+    return None, previous
+
+
+def finish_submission(key, body):
+    """
+    Store the response of a successful submission, or release the claim
+
+    Args:
+        key: Key returned by claim_submission() (no-op if None)
+        body: Response body of the 201, or None if the submission failed
+    """
+    if key is None:
+        return
+    if body is None:
+        cache.delete(key)
+    else:
+        cache.set(key, body, settings.CONTACT_DUPLICATE_WINDOW)
@@ -0,0 +1,149 @@
+"""
+Disposable email domain index
+
+Public disposable-domain blocklists (100k+ entries, one domain per line) are
+loaded into a frozenset. A lookup walks the address's domain suffixes, so
+`sub.mailinator.com` is caught by a `mailinator.com` entry in O(labels) set
+probes regardless of list size.
+
+The list is read from DISPOSABLE_DOMAINS_FILE and reloaded when its mtime
+changes (checked at most every DISPOSABLE_DOMAINS_CHECK_INTERVAL seconds).
+A new index is built off to the side and swapped in with a single
+assignment, so lookups never see a half-loaded list. The index is loaded in
+AppConfig.ready() so the first request does not pay for it. Every worker
+process holds its own copy (about 12 MB for 100k domains): even when loaded
+before a fork, CPython's reference counting writes to the shared pages and
+copies them into each worker.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger('django')
+
+# Domains that shipped with the original serializer
+DEFAULT_DOMAINS = [
+    'tempmail.com', 'throwaway.email', '10minutemail.com',
+    'guerrillamail.com', 'mailinator.com'
+]
+
+
+class DisposableDomainIndex:
+    """
+    Immutable set of disposable domains with subdomain matching
+
+    Args:
+        domains: Iterable of domain names
+        version: Opaque identifier of the list source (e.g. file mtime)
+    """
+
+    def __init__(self, domains, version=None):
+        self._domains = frozenset(
+            domain.strip().lower().rstrip('.')
+            for domain in domains
+            if domain.strip() and not domain.lstrip().startswith('#')
+        )
+        self.version = version
+
+    def __len__(self):
+        return len(self._domains)
+
+    def match(self, domain: str):
+        """
+        Find the listed domain covering the given domain
+
+        Returns:
+            The matching list entry (the domain itself or a parent domain),
+            or None
+        """
+        domain = domain.lower().rstrip('.')
+        while domain:
+            if domain in self._domains:
+                return domain
+            dot = domain.find('.')
+            if dot == -1:
+                return None
+            domain = domain[dot + 1:]
+        return None
+
+    def __contains__(self, domain):
+        return self.match(domain) is not None
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load a blocklist with one domain per line ('#' starts a comment)
+        """
+        with open(path, encoding='utf-8') as f:
+            return cls(f, version=os.stat(path).st_mtime_ns)
+
+
+class _IndexHolder:
+    """
+    Per-process index with mtime-based hot reload
+    """
+
+    def __init__(self):
+        self._index = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> DisposableDomainIndex:
+        path = getattr(settings, 'DISPOSABLE_DOMAINS_FILE', '')
+        index = self._index
+        if index is not None and (
+            not path or time.monotonic() - self._checked_at < settings.DISPOSABLE_DOMAINS_CHECK_INTERVAL
+        ):
+            return index
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if not path:
+                if self._index is None:
+                    self._index = DisposableDomainIndex(DEFAULT_DOMAINS)
+                return self._index
+
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if self._index is None or self._index.version != mtime:
+                    self._index = DisposableDomainIndex.from_file(path)
+                    logger.info("Loaded %s disposable domains from %s", len(self._index), path)
+            except (OSError, UnicodeDecodeError) as e:
+                # Keep serving the last good list
+                logger.error("Could not load disposable domains from %s: %s", path, e)
+                if self._index is None:
+                    self._index = DisposableDomainIndex(DEFAULT_DOMAINS)
+            return self._index
+
+    def reset(self):
+        with self._lock:
+            self._index = None
+            self._checked_at = 0.0
+
+
+_holder = _IndexHolder()
+
+
+def get_disposable_index() -> DisposableDomainIndex:
+    """
+    Return the current disposable domain index, reloading the list if it changed
+    """
+    return _holder.get()
+
+
+def is_disposable_domain(domain: str) -> bool:
+    """
+    Check whether a domain or any of its parent domains is disposable
+    """
+    return domain in get_disposable_index()
+
+
+@receiver(setting_changed)
+def _reset_index_on_setting_change(setting, **kwargs):
+    if setting.startswith('DISPOSABLE_DOMAINS_'):
+        _holder.reset()
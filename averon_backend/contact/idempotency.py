@@ -0,0 +1,150 @@
+"""
+Idempotency-Key support for contact creation
+
+A client that may retry a POST (mobile apps on flaky networks) sends a
+unique `Idempotency-Key` header. The first request with a key runs normally
+and, if it succeeds, its response is stored in the shared cache for
+CONTACT_IDEMPOTENCY_TTL seconds; retries with the same key get that
+response back (with `Idempotent-Replayed: true`) without reCAPTCHA
+verification, which would fail anyway on the single-use token, and without
+touching the database.
+
+While the first request is running, retries get 409 Conflict: a short lock
+(CONTACT_IDEMPOTENCY_LOCK_TIMEOUT seconds) held with an atomic cache.add().
+Keys are scoped to the client (user, or IP address for anonymous clients,
+identified like the throttles do), so one client cannot replay another's
+response by guessing its key. Reusing a key with a different body is
+rejected with 422. Rejections are
+not stored: a reCAPTCHA failure (e.g. a 'network-error' or an expired
+token), a throttled or conflicting request or a server error can be retried
+with the same key, typically with a fresh reCAPTCHA token.
+"""
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+KEY_PREFIX = 'contact:idempotency:'
+LOCK_PREFIX = 'contact:idempotency-lock:'
+MAX_KEY_LENGTH = 255
+
+
+def client_identity(request):
+    """
+    Who a key belongs to: the user, or the client IP for anonymous requests
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'ip:{BaseThrottle().get_ident(request)}'
+
+
+def _scoped(prefix, request, key):
+    # Hash so any client-chosen string makes a safe, bounded cache key
+    return prefix + hashlib.sha256(f'{client_identity(request)}\n{key}'.encode()).hexdigest()
+
+
+def _record_key(request, key):
+    return _scoped(KEY_PREFIX, request, key)
+
+
+def _lock_key(request, key):
+    return _scoped(LOCK_PREFIX, request, key)
+
+
+def request_fingerprint(request):
+    """
+    Digest of the method, path and parsed body of a request
+
+    The reCAPTCHA token is left out: a client may fetch a fresh one before
+    retrying, and that is still the same submission.
+    """
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    if isinstance(data, dict):
+        data = {field: value for field, value in data.items() if field != 'recaptcha_token'}
+    body = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{body}'.encode()).hexdigest()
+
+
+def is_replay(request):
+    """
+    Whether the request repeats an idempotency key with a stored response
+
+    Used by the throttle, so retries do not count against the client's limit.
+    """
+    key = request.META.get(HEADER)
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return False
+    return cache.get(_record_key(request, key)) is not None
+
+
+def _replay(record, fingerprint):
+    if record['fingerprint'] != fingerprint:
+        return Response(
+            {'message': 'Idempotency-Key was already used with a different request body.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = Response(record['data'], status=record['status'], headers=record['headers'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view_method):
+    """
+    Honour the Idempotency-Key header on a ViewSet action
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'message': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        record_key = _record_key(request, key)
+        record = cache.get(record_key)
+        if record is not None:
+            return _replay(record, fingerprint)
+
+        lock_key = _lock_key(request, key)
+        if not cache.add(lock_key, True, settings.CONTACT_IDEMPOTENCY_LOCK_TIMEOUT):
+            return Response(
+                {'message': 'A request with this Idempotency-Key is still being processed.'},
+                status=status.HTTP_409_CONFLICT,
+                headers={'Retry-After': '1'}
+            )
+        try:
+            # The first request may have finished between get() and add()
+            record = cache.get(record_key)
+            if record is not None:
+                return _replay(record, fingerprint)
+
+            response = view_method(self, request, *args, **kwargs)
+            if status.is_success(response.status_code):
+                cache.set(record_key, {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'data': response.data,
+                    # Content-Type is set again when the replay is rendered
+                    'headers': {
+                        header: value for header, value in response.items()
+                        if header.lower() != 'content-type'
+                    },
+                }, settings.CONTACT_IDEMPOTENCY_TTL)
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
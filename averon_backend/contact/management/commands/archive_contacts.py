@@ -0,0 +1,49 @@
+"""
+Move old processed contacts out of the contacts table into the archive
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from contact.archive import archive_contacts, archive_root, archivable
+
+
+class Command(BaseCommand):
+    help = 'Archive processed contacts older than a retention period to compressed daily JSONL files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=settings.CONTACT_ARCHIVE_AFTER_DAYS,
+            help=f'Age in days of the contacts to archive (default: {settings.CONTACT_ARCHIVE_AFTER_DAYS})'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.CONTACT_ARCHIVE_CHUNK_SIZE,
+            help=f'Contacts moved per transaction (default: {settings.CONTACT_ARCHIVE_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many contacts would be archived and exit'
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database to archive from (default: "default")'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable(options['older_than'], options['database']).count()
+            self.stdout.write(f'{count} contact(s) would be archived')
+            return
+
+        archived = archive_contacts(
+            options['older_than'],
+            chunk_size=options['chunk_size'],
+            using=options['database']
+        )
+        self.stdout.write(f'Archived {archived} contact(s) to {archive_root()}')
@@ -0,0 +1,51 @@
+"""
+Deliver queued contact notifications from the outbox
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from contact.notifications import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending contact notifications, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the currently due notifications and exit'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Maximum notifications to deliver per pass (default: 100)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when the outbox is empty (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        self._running = True
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self._stop)
+            signal.signal(signal.SIGINT, self._stop)
+
+        while self._running:
+            delivered = process_outbox(limit=options['batch_size'])
+            if delivered:
+                self.stdout.write(f'Delivered {delivered} notification(s)')
+
+            if options['once']:
+                break
+            if delivered < options['batch_size']:
+                time.sleep(options['interval'])
+
+    def _stop(self, signum, frame):
+        self._running = False
@@ -0,0 +1,24 @@
+"""
+Recompute the daily contact statistics from the contacts table
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from contact.models import ContactDailyStats
+from contact.stats import install_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild ContactDailyStats from the contacts and (re)install its triggers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database to rebuild (default: "default")'
+        )
+
+    def handle(self, *args, **options):
+        install_stats(connections[options['database']])
+        days = ContactDailyStats.objects.using(options['database']).count()
+        self.stdout.write(f'Rebuilt statistics for {days} day(s)')
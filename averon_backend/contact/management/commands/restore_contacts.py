@@ -0,0 +1,43 @@
+"""
+Put archived contacts back into the contacts table
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from contact.archive import restore_contacts, shard_paths
+
+
+class Command(BaseCommand):
+    help = 'Restore archived contacts, by submission day or from the given archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            help='Archive files to restore (default: every file in CONTACT_ARCHIVE_DIR within the range)'
+        )
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='First day to restore (YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            help='Last day to restore (YYYY-MM-DD, inclusive)'
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database to restore into (default: "default")'
+        )
+
+    def handle(self, *args, **options):
+        if options['files'] and (options['start'] or options['end']):
+            raise CommandError('Give either archive files or --start/--end, not both')
+
+        paths = options['files'] or shard_paths(options['start'], options['end'])
+        restored = restore_contacts(paths, using=options['database'])
+        self.stdout.write(f'Restored {restored} contact(s) from {len(paths)} file(s)')
@@ -0,0 +1,223 @@
+"""
+Prometheus metrics for the contact backend
+
+gunicorn runs several worker processes, and a scrape only reaches one of
+them. When PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py and start.sh
+set it), every process writes its samples to mmap files in that directory
+and /metrics aggregates all of them, so counters and histograms cover the
+whole server rather than whichever worker answered.
+
+Values that describe shared state rather than events (outbox depth, circuit
+breaker state) are computed at scrape time by StateCollector instead of
+being kept as per-process gauges.
+"""
+import logging
+import os
+import secrets
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Count, Min
+from django.http import HttpResponse
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+logger = logging.getLogger('django')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUESTS = Counter(
+    'averon_http_requests_total',
+    'HTTP requests by route, method and status',
+    ['view', 'method', 'status'],
+)
+REQUEST_SECONDS = Histogram(
+    'averon_http_request_duration_seconds',
+    'HTTP request latency by route and method',
+    ['view', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'averon_http_request_db_queries',
+    'Database queries per request by route and method',
+    ['view', 'method'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+STAGE_SECONDS = Histogram(
+    'averon_request_stage_duration_seconds',
+    'Exclusive time spent in each timed request stage',
+    ['stage'],
+    buckets=LATENCY_BUCKETS,
+)
+RECAPTCHA_VERIFICATIONS = Counter(
+    'averon_recaptcha_verifications_total',
+    'reCAPTCHA verifications by outcome',
+    ['outcome'],
+)
+RECAPTCHA_SECONDS = Histogram(
+    'averon_recaptcha_request_duration_seconds',
+    'Latency of siteverify calls that returned a response',
+    buckets=LATENCY_BUCKETS,
+)
+THROTTLE_REJECTIONS = Counter(
+    'averon_throttle_rejections_total',
+    'Requests rejected by a throttle',
+    ['scope'],
+)
+DUPLICATE_SUBMISSIONS = Counter(
+    'averon_duplicate_submissions_total',
+    'Submissions answered from an identical earlier one',
+    ['outcome'],
+)
+NOTIFICATION_SEND_SECONDS = Histogram(
+    'averon_notification_send_duration_seconds',
+    'Notification email send latency by outcome',
+    ['outcome'],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class StateCollector:
+    """
+    Scrape-time gauges for state shared by all processes
+    """
+
+    def collect(self):
+        try:
+            families = self._outbox()
+        except DatabaseError as e:
+            # Keep the rest of the scrape working while the database is down
+            logger.error("Could not collect outbox metrics: %s", e)
+            families = []
+        yield from families
+        yield self._breaker()
+
+    def _outbox(self):
+        """
+        Outbox depth families; both are built before either is emitted
+        """
+        from .models import NotificationOutbox
+
+        outbox = GaugeMetricFamily(
+            'averon_notification_outbox',
+            'Notifications waiting in the outbox by status',
+            labels=['status'],
+        )
+        counts = dict(
+            NotificationOutbox.objects
+            .exclude(status=NotificationOutbox.STATUS_SENT)
+            .values_list('status')
+            .annotate(rows=Count('pk'))
+        )
+        for status in (NotificationOutbox.STATUS_PENDING, NotificationOutbox.STATUS_FAILED):
+            outbox.add_metric([status], counts.get(status, 0))
+
+        oldest = NotificationOutbox.objects.filter(
+            status=NotificationOutbox.STATUS_PENDING
+        ).aggregate(oldest=Min('created_at'))['oldest']
+        age = GaugeMetricFamily(
+            'averon_notification_outbox_oldest_pending_seconds',
+            'Age of the oldest pending notification',
+            value=(timezone.now() - oldest).total_seconds() if oldest else 0,
+        )
+        return [outbox, age]
+
+    def _breaker(self):
+        from .recaptcha import get_verifier
+
+        breaker = get_verifier().breaker.snapshot()
+        state = GaugeMetricFamily(
+            'averon_circuit_breaker_state',
+            'Circuit breaker state (1 for the current state)',
+            labels=['name', 'state'],
+        )
+        for name in ('closed', 'open', 'half_open'):
+            state.add_metric([breaker['name'], name], 1 if breaker['state'] == name else 0)
+        return state
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unmatched>'
+
+
+class MetricsMiddleware:
+    """
+    Count requests, their latency and their database queries per route
+
+    Queries are counted on the request thread's connection; ORM calls that
+    async views push to other threads are not included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - started, queries[0])
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - started, None)
+        return response
+
+    def _record(self, request, response, elapsed, queries):
+        route = _route(request)
+        REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+        REQUEST_SECONDS.labels(route, request.method).observe(elapsed)
+        if queries is not None:
+            REQUEST_DB_QUERIES.labels(route, request.method).observe(queries)
+
+
+def _authorized(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        return False
+    return secrets.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+
+
+def metrics_view(request):
+    """
+    Prometheus exposition of the metrics of every worker process
+
+    Requires METRICS_TOKEN as a bearer token; while it is unset the endpoint
+    is disabled rather than open to anyone who can reach it.
+    """
+    if not getattr(settings, 'METRICS_TOKEN', ''):
+        return HttpResponse('Metrics disabled: METRICS_TOKEN is not set', status=403, content_type='text/plain')
+    if not _authorized(request):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+
+    state = CollectorRegistry()
+    state.register(StateCollector())
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        output = generate_latest(registry)
+    else:
+        output = generate_latest(REGISTRY)
+
+    return HttpResponse(output + generate_latest(state), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0002_notificationoutbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contacts",
+            name="recaptcha_degraded",
+            field=models.BooleanField(
+                default=False,
+                help_text="Accepted without reCAPTCHA verification while the service was unavailable",
+            ),
+        ),
+    ]
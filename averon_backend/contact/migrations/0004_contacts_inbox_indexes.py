@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0003_contacts_recaptcha_degraded"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="contacts",
+            name="contact_con_is_proc_7090f0_idx",
+        ),
+        migrations.AddIndex(
+            model_name="contacts",
+            index=models.Index(
+                condition=models.Q(("is_processed", False)),
+                fields=["-created_at", "-id"],
+                name="contact_unprocessed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contacts",
+            index=models.Index(
+                fields=["is_processed", "-created_at"],
+                name="contact_processed_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,139 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:08
+
+import logging
+
+import django.contrib.postgres.search
+from django.db import DatabaseError, migrations
+
+# Non-atomic: on PostgreSQL the existing rows are indexed in batches that
+# commit one by one and the GIN index is built CONCURRENTLY, so neither
+# holds locks on contact_contacts for the length of the migration. The SQL
+# is inlined so this migration does not change with contact/search.py.
+
+BATCH_SIZE = 5000
+
+PG_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}email, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}message, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(host({row}ip_address), '')), 'C')"
+)
+
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contact_contacts_fts USING fts5("
+    "name, email, message, ip_address, content='contact_contacts', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    """
+    CREATE TRIGGER IF NOT EXISTS contact_contacts_fts_ai AFTER INSERT ON contact_contacts BEGIN
+        INSERT INTO contact_contacts_fts(rowid, name, email, message, ip_address)
+        VALUES (new.id, new.name, new.email, new.message, new.ip_address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contact_contacts_fts_ad AFTER DELETE ON contact_contacts BEGIN
+        INSERT INTO contact_contacts_fts(contact_contacts_fts, rowid, name, email, message, ip_address)
+        VALUES ('delete', old.id, old.name, old.email, old.message, old.ip_address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contact_contacts_fts_au
+    AFTER UPDATE OF name, email, message, ip_address ON contact_contacts BEGIN
+        INSERT INTO contact_contacts_fts(contact_contacts_fts, rowid, name, email, message, ip_address)
+        VALUES ('delete', old.id, old.name, old.email, old.message, old.ip_address);
+        INSERT INTO contact_contacts_fts(rowid, name, email, message, ip_address)
+        VALUES (new.id, new.name, new.email, new.message, new.ip_address);
+    END
+    """,
+    # Index the rows that existed before the triggers did
+    "INSERT INTO contact_contacts_fts(contact_contacts_fts) VALUES ('rebuild')",
+]
+
+
+def pg_install(cursor):
+    cursor.execute(f"""
+        CREATE OR REPLACE FUNCTION contact_contacts_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {PG_VECTOR.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cursor.execute('DROP TRIGGER IF EXISTS contact_contacts_search_vector_trigger ON contact_contacts')
+    cursor.execute("""
+        CREATE TRIGGER contact_contacts_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, email, message, ip_address ON contact_contacts
+        FOR EACH ROW EXECUTE FUNCTION contact_contacts_search_vector_update()
+    """)
+    # Rows written from here on are filled by the trigger
+    last_id = 0
+    while True:
+        cursor.execute(
+            'SELECT max(id) FROM (SELECT id FROM contact_contacts WHERE id > %s ORDER BY id LIMIT %s) AS batch',
+            [last_id, BATCH_SIZE]
+        )
+        batch_end = cursor.fetchone()[0]
+        if batch_end is None:
+            break
+        cursor.execute(
+            f"UPDATE contact_contacts SET search_vector = {PG_VECTOR.format(row='')} "
+            f"WHERE id > %s AND id <= %s AND search_vector IS NULL",
+            [last_id, batch_end]
+        )
+        last_id = batch_end
+    cursor.execute(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS contact_search_vector_gin '
+        'ON contact_contacts USING gin (search_vector)'
+    )
+
+
+def install(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            pg_install(cursor)
+        elif connection.vendor == 'sqlite':
+            try:
+                for statement in SQLITE_INSTALL:
+                    cursor.execute(statement)
+            except DatabaseError as e:
+                # SQLite built without FTS5; search uses substring matching
+                logging.getLogger('django').warning(
+                    "Full-text search unavailable, using substring search: %s", e
+                )
+
+
+def uninstall(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX CONCURRENTLY IF EXISTS contact_search_vector_gin')
+            cursor.execute('DROP TRIGGER IF EXISTS contact_contacts_search_vector_trigger ON contact_contacts')
+            cursor.execute('DROP FUNCTION IF EXISTS contact_contacts_search_vector_update()')
+        elif connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS contact_contacts_fts_{suffix}')
+            cursor.execute('DROP TABLE IF EXISTS contact_contacts_fts')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("contact", "0004_contacts_inbox_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contacts",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="Full-text search document for name, email, message and IP",
+                null=True,
+            ),
+        ),
+        # Trigger + GIN index on PostgreSQL, FTS5 table + triggers on SQLite;
+        # indexes existing rows
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,181 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Row-level triggers keeping ContactDailyStats current (0008 makes the
+# PostgreSQL ones statement-level). The SQL is inlined so this migration
+# does not change with contact/stats.py. Other backends get no triggers;
+# `manage.py rebuild_contact_stats` fills the table there.
+
+EXPRESSIONS = {
+    'postgresql': {
+        'day': "({row}created_at AT TIME ZONE '{tz}')::date",
+        'processed': 'CASE WHEN {row}is_processed THEN 1 ELSE 0 END',
+        'seconds': (
+            'CASE WHEN {row}is_processed AND {row}processed_at IS NOT NULL '
+            'THEN extract(epoch FROM {row}processed_at - {row}created_at) ELSE 0 END'
+        ),
+    },
+    'sqlite': {
+        'day': 'date({row}created_at)',
+        'processed': 'CASE WHEN {row}is_processed THEN 1 ELSE 0 END',
+        'seconds': (
+            'CASE WHEN {row}is_processed AND {row}processed_at IS NOT NULL '
+            'THEN (julianday({row}processed_at) - julianday({row}created_at)) * 86400.0 ELSE 0 END'
+        ),
+    },
+}
+
+CHANGED = (
+    '{old}created_at IS DISTINCT FROM {new}created_at '
+    'OR {old}is_processed IS DISTINCT FROM {new}is_processed '
+    'OR {old}processed_at IS DISTINCT FROM {new}processed_at'
+)
+
+
+def expression(vendor, name, row=''):
+    return EXPRESSIONS[vendor][name].format(row=row, tz=settings.TIME_ZONE)
+
+
+def upsert(vendor, row, sign):
+    return (
+        "INSERT INTO contact_contactdailystats (day, submissions, processed, processing_seconds) "
+        f"VALUES ({expression(vendor, 'day', row)}, {sign}1, "
+        f"{sign}({expression(vendor, 'processed', row)}), {sign}({expression(vendor, 'seconds', row)})) "
+        "ON CONFLICT (day) DO UPDATE SET "
+        "submissions = contact_contactdailystats.submissions + excluded.submissions, "
+        "processed = contact_contactdailystats.processed + excluded.processed, "
+        "processing_seconds = contact_contactdailystats.processing_seconds + excluded.processing_seconds"
+    )
+
+
+def install_statements(vendor):
+    if vendor == 'postgresql':
+        return [
+            f"""
+            CREATE OR REPLACE FUNCTION contact_daily_stats_update() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    {upsert(vendor, 'OLD.', '-')};
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    {upsert(vendor, 'NEW.', '')};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            CREATE TRIGGER contact_daily_stats_trigger
+            AFTER INSERT OR DELETE ON contact_contacts
+            FOR EACH ROW EXECUTE FUNCTION contact_daily_stats_update()
+            """,
+            f"""
+            CREATE TRIGGER contact_daily_stats_update_trigger
+            AFTER UPDATE OF created_at, is_processed, processed_at ON contact_contacts
+            FOR EACH ROW WHEN ({CHANGED.format(old='OLD.', new='NEW.')})
+            EXECUTE FUNCTION contact_daily_stats_update()
+            """,
+        ]
+    return sqlite_triggers()
+
+
+def sqlite_triggers():
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS contact_daily_stats_ai AFTER INSERT ON contact_contacts BEGIN
+            {upsert('sqlite', 'new.', '')};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS contact_daily_stats_ad AFTER DELETE ON contact_contacts BEGIN
+            {upsert('sqlite', 'old.', '-')};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS contact_daily_stats_au
+        AFTER UPDATE OF created_at, is_processed, processed_at ON contact_contacts
+        WHEN {CHANGED.format(old='old.', new='new.')} BEGIN
+            {upsert('sqlite', 'old.', '-')};
+            {upsert('sqlite', 'new.', '')};
+        END
+        """,
+    ]
+
+
+def install(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in EXPRESSIONS:
+        return
+    if vendor == 'postgresql':
+        # Writes wait until the table is filled, so none is counted twice
+        schema_editor.execute('LOCK TABLE contact_contacts IN SHARE MODE')
+    for statement in install_statements(vendor):
+        schema_editor.execute(statement)
+    schema_editor.execute(
+        "INSERT INTO contact_contactdailystats (day, submissions, processed, processing_seconds) "
+        f"SELECT {expression(vendor, 'day')}, count(*), "
+        f"sum({expression(vendor, 'processed')}), sum({expression(vendor, 'seconds')}) "
+        "FROM contact_contacts GROUP BY 1"
+    )
+
+
+def uninstall(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP TRIGGER IF EXISTS contact_daily_stats_update_trigger ON contact_contacts')
+        schema_editor.execute('DROP TRIGGER IF EXISTS contact_daily_stats_trigger ON contact_contacts')
+        schema_editor.execute('DROP FUNCTION IF EXISTS contact_daily_stats_update()')
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS contact_daily_stats_{suffix}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0005_contacts_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContactDailyStats",
+            fields=[
+                (
+                    "day",
+                    models.DateField(
+                        help_text="Day the contacts were submitted",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "submissions",
+                    models.IntegerField(
+                        default=0, help_text="Contacts submitted on this day"
+                    ),
+                ),
+                (
+                    "processed",
+                    models.IntegerField(
+                        default=0, help_text="How many of them are processed"
+                    ),
+                ),
+                (
+                    "processing_seconds",
+                    models.FloatField(
+                        default=0,
+                        help_text="Total seconds from submission to processing of the processed ones",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily statistics",
+                "verbose_name_plural": "Daily statistics",
+                "ordering": ["-day"],
+            },
+        ),
+        # Triggers on contact_contacts; fills the table from existing rows
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.8 on 2026-10-17 16:45
+
+from django.db import migrations, models
+
+# SQLite rebuilds the statistics table to add columns with a database
+# default, which fails while triggers on contact_contacts refer to it: drop
+# them around the change. Nothing is written in between, as the migration
+# runs in one transaction. PostgreSQL adds the columns in place. The SQL is
+# inlined so this migration does not change with contact/stats.py.
+
+DAY = 'date({row}.created_at)'
+PROCESSED = 'CASE WHEN {row}.is_processed THEN 1 ELSE 0 END'
+SECONDS = (
+    'CASE WHEN {row}.is_processed AND {row}.processed_at IS NOT NULL '
+    'THEN (julianday({row}.processed_at) - julianday({row}.created_at)) * 86400.0 ELSE 0 END'
+)
+
+
+def upsert(row, sign):
+    return (
+        "INSERT INTO contact_contactdailystats (day, submissions, processed, processing_seconds) "
+        f"VALUES ({DAY.format(row=row)}, {sign}1, "
+        f"{sign}({PROCESSED.format(row=row)}), {sign}({SECONDS.format(row=row)})) "
+        "ON CONFLICT (day) DO UPDATE SET "
+        "submissions = contact_contactdailystats.submissions + excluded.submissions, "
+        "processed = contact_contactdailystats.processed + excluded.processed, "
+        "processing_seconds = contact_contactdailystats.processing_seconds + excluded.processing_seconds"
+    )
+
+
+def create_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS contact_daily_stats_ai AFTER INSERT ON contact_contacts BEGIN
+            {upsert('new', '')};
+        END
+    """)
+    schema_editor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS contact_daily_stats_ad AFTER DELETE ON contact_contacts BEGIN
+            {upsert('old', '-')};
+        END
+    """)
+    schema_editor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS contact_daily_stats_au
+        AFTER UPDATE OF created_at, is_processed, processed_at ON contact_contacts
+        WHEN old.created_at IS DISTINCT FROM new.created_at
+            OR old.is_processed IS DISTINCT FROM new.is_processed
+            OR old.processed_at IS DISTINCT FROM new.processed_at BEGIN
+            {upsert('old', '-')};
+            {upsert('new', '')};
+        END
+    """)
+
+
+def drop_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS contact_daily_stats_{suffix}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0006_contact_daily_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sqlite_triggers, create_sqlite_triggers),
+        migrations.AddField(
+            model_name="contactdailystats",
+            name="archived",
+            field=models.IntegerField(
+                db_default=0, help_text="Contacts from this day moved to the archive"
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactdailystats",
+            name="archived_processing_seconds",
+            field=models.FloatField(
+                db_default=0,
+                help_text="Total seconds from submission to processing of the archived ones",
+            ),
+        ),
+        migrations.RunPython(create_sqlite_triggers, drop_sqlite_triggers),
+    ]
@@ -0,0 +1,150 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:10
+
+from django.conf import settings
+from django.db import migrations
+
+# Replaces the row-level statistics triggers of 0006 on PostgreSQL with
+# statement-level ones reading transition tables: one upsert per touched day
+# and statement instead of one per row. SQLite keeps its row-level triggers.
+# The SQL is inlined so this migration does not change with contact/stats.py.
+
+DAY = "({row}.created_at AT TIME ZONE '{tz}')::date"
+PROCESSED = "CASE WHEN {row}.is_processed THEN 1 ELSE 0 END"
+SECONDS = (
+    "CASE WHEN {row}.is_processed AND {row}.processed_at IS NOT NULL "
+    "THEN extract(epoch FROM {row}.processed_at - {row}.created_at) ELSE 0 END"
+)
+CHANGED = (
+    "FROM old_rows o JOIN new_rows n ON n.id = o.id "
+    "WHERE o.created_at IS DISTINCT FROM n.created_at "
+    "OR o.is_processed IS DISTINCT FROM n.is_processed "
+    "OR o.processed_at IS DISTINCT FROM n.processed_at"
+)
+
+
+def delta(row, sign, source):
+    return (
+        f"SELECT {DAY.format(row=row, tz=settings.TIME_ZONE)} AS day, {sign}1 AS submissions, "
+        f"{sign}({PROCESSED.format(row=row)}) AS processed, "
+        f"{sign}({SECONDS.format(row=row)}) AS processing_seconds {source}"
+    )
+
+
+def apply(*deltas):
+    return (
+        "INSERT INTO contact_contactdailystats (day, submissions, processed, processing_seconds) "
+        "SELECT day, sum(submissions), sum(processed), sum(processing_seconds) "
+        f"FROM ({' UNION ALL '.join(deltas)}) AS delta GROUP BY day ORDER BY day "
+        "ON CONFLICT (day) DO UPDATE SET "
+        "submissions = contact_contactdailystats.submissions + excluded.submissions, "
+        "processed = contact_contactdailystats.processed + excluded.processed, "
+        "processing_seconds = contact_contactdailystats.processing_seconds + excluded.processing_seconds"
+    )
+
+
+def upsert(row, sign):
+    return (
+        "INSERT INTO contact_contactdailystats (day, submissions, processed, processing_seconds) "
+        f"VALUES ({DAY.format(row=row, tz=settings.TIME_ZONE)}, {sign}1, "
+        f"{sign}({PROCESSED.format(row=row)}), {sign}({SECONDS.format(row=row)})) "
+        "ON CONFLICT (day) DO UPDATE SET "
+        "submissions = contact_contactdailystats.submissions + excluded.submissions, "
+        "processed = contact_contactdailystats.processed + excluded.processed, "
+        "processing_seconds = contact_contactdailystats.processing_seconds + excluded.processing_seconds"
+    )
+
+
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS contact_daily_stats_trigger ON contact_contacts",
+    "DROP TRIGGER IF EXISTS contact_daily_stats_delete_trigger ON contact_contacts",
+    "DROP TRIGGER IF EXISTS contact_daily_stats_update_trigger ON contact_contacts",
+]
+
+
+def statement_level():
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION contact_daily_stats_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {apply(delta('new_rows', '', 'FROM new_rows'))};
+            ELSIF TG_OP = 'DELETE' THEN
+                {apply(delta('old_rows', '-', 'FROM old_rows'))};
+            ELSE
+                {apply(delta('o', '-', CHANGED), delta('n', '', CHANGED))};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        *DROP_TRIGGERS,
+        """
+        CREATE TRIGGER contact_daily_stats_trigger AFTER INSERT ON contact_contacts
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION contact_daily_stats_update()
+        """,
+        """
+        CREATE TRIGGER contact_daily_stats_delete_trigger AFTER DELETE ON contact_contacts
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION contact_daily_stats_update()
+        """,
+        """
+        CREATE TRIGGER contact_daily_stats_update_trigger AFTER UPDATE ON contact_contacts
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION contact_daily_stats_update()
+        """,
+    ]
+
+
+def row_level():
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION contact_daily_stats_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                {upsert('OLD', '-')};
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                {upsert('NEW', '')};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        *DROP_TRIGGERS,
+        """
+        CREATE TRIGGER contact_daily_stats_trigger
+        AFTER INSERT OR DELETE ON contact_contacts
+        FOR EACH ROW EXECUTE FUNCTION contact_daily_stats_update()
+        """,
+        """
+        CREATE TRIGGER contact_daily_stats_update_trigger
+        AFTER UPDATE OF created_at, is_processed, processed_at ON contact_contacts
+        FOR EACH ROW WHEN (
+            OLD.created_at IS DISTINCT FROM NEW.created_at
+            OR OLD.is_processed IS DISTINCT FROM NEW.is_processed
+            OR OLD.processed_at IS DISTINCT FROM NEW.processed_at
+        )
+        EXECUTE FUNCTION contact_daily_stats_update()
+        """,
+    ]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements():
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0007_contactdailystats_archived"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(statement_level), run(row_level)),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0008_contact_daily_stats_statement_triggers"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="contacts",
+            name="contact_processed_created_idx",
+        ),
+    ]
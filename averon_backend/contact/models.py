@@ -1,7 +1,98 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import EmailValidator, MinLengthValidator
 from django.utils import timezone
 
+from .response_cache import invalidate_on_commit
+from .search import search_queryset
+
+
+class ContactsQuerySet(models.QuerySet):
+    """
+    Set-based operations on contact submissions
+    """
+
+    def mark_as_processed(self, chunk_size=None):
+        """
+        Mark every unprocessed contact in the queryset as processed
+
+        All rows share one processed_at timestamp. With a chunk_size the
+        update runs in primary-key ranges of at most that many rows, so very
+        large selections do not hold locks on the whole set at once.
+
+        Args:
+            chunk_size: Maximum rows per UPDATE; a single UPDATE if None
+
+        Returns:
+            Tuple of (updated row count, processed_at)
+        """
+        now = timezone.now()
+        pending = self.filter(is_processed=False)
+        values = {'is_processed': True, 'processed_at': now, 'updated_at': now}
+
+        if not chunk_size:
+            updated = pending.update(**values)
+            if updated:
+                invalidate_on_commit()
+            return updated, now
+
+        # Ordering/slicing is not allowed on the UPDATE itself, so page
+        # through the primary keys and update each page separately
+        pending = pending.order_by('pk')
+        updated = 0
+        last_pk = None
+        while True:
+            page = pending if last_pk is None else pending.filter(pk__gt=last_pk)
+            ids = list(page.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            updated += Contacts.objects.filter(pk__in=ids, is_processed=False).update(**values)
+            last_pk = ids[-1]
+        if updated:
+            # UPDATE bypasses post_save, so drop cached responses explicitly
+            invalidate_on_commit()
+        return updated, now
+
+    def search(self, query, ranked=False):
+        """
+        Full-text search on name, email, message and IP (see contact/search.py)
+
+        Args:
+            query: Free text as typed by the user
+            ranked: Order by relevance (`search_rank`) instead of keeping
+                the current ordering
+        """
+        return search_queryset(self, query, ranked=ranked)
+
+    def with_daily_stats_dates(self, start=None, end=None):
+        """
+        Answer datetimes('created_at', ...) from the daily statistics
+
+        For the admin date drill-down of an otherwise unfiltered changelist:
+        the distinct years, months or days are read from ContactDailyStats
+        (one row per day) instead of truncating every contact. Only applies
+        to the returned queryset itself, not to querysets derived from it.
+
+        Args:
+            start: First day to include (date), or None
+            end: Day after the last one to include (date), or None
+        """
+        clone = self._chain()
+        clone._daily_stats_range = (start, end)
+        return clone
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None):
+        stats_range = getattr(self, '_daily_stats_range', None)
+        if stats_range is None or field_name != 'created_at' or kind not in ('year', 'month', 'day'):
+            return super().datetimes(field_name, kind, order=order, tzinfo=tzinfo)
+        start, end = stats_range
+        days = ContactDailyStats.objects.using(self.db).filter(submissions__gt=0)
+        if start is not None:
+            days = days.filter(day__gte=start)
+        if end is not None:
+            days = days.filter(day__lt=end)
+        return days.dates('day', kind, order=order)
+
 
 class Contacts(models.Model):
     """
@@ -54,6 +145,20 @@ class Contacts(models.Model):
         blank=True,
         help_text="When the contact was processed"
     )
+    recaptcha_degraded = models.BooleanField(
+        default=False,
+        help_text="Accepted without reCAPTCHA verification while the service was unavailable"
+    )
+
+    # Maintained by a database trigger on PostgreSQL (see contact/search.py);
+    # unused on other backends
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text search document for name, email, message and IP"
+    )
+
+    objects = ContactsQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Contact"
@@ -62,7 +167,14 @@ class Contacts(models.Model):
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['email']),
-            models.Index(fields=['is_processed']),
+            # Inbox query (unprocessed, newest first): a partial index holds
+            # only the pending rows, so it stays small as processed contacts
+            # pile up. Its ordering matches the keyset pagination.
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_processed=False),
+                name='contact_unprocessed_idx',
+            ),
         ]
 
     def __str__(self):
@@ -72,4 +184,130 @@ class Contacts(models.Model):
         """Mark the contact as processed"""
         self.is_processed = True
         self.processed_at = timezone.now()
-        self.save(update_fields=['is_processed', 'processed_at'])
\ No newline at end of file
+        self.save(update_fields=['is_processed', 'processed_at', 'updated_at'])
+
+
+class NotificationOutbox(models.Model):
+    """
+    Pending admin notifications for contact submissions
+
+    Rows are written in the same transaction as the contact, so a notification
+    is never lost when a worker is recycled before the email goes out.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    contact = models.ForeignKey(
+        Contacts,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        help_text="Contact this notification is about"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text="Delivery status of the notification"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of delivery attempts so far"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the next delivery attempt may run"
+    )
+    last_error = models.TextField(
+        blank=True,
+        default='',
+        help_text="Error message from the last failed attempt"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the notification was queued"
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the notification was delivered"
+    )
+
+    class Meta:
+        verbose_name = "Notification"
+        verbose_name_plural = "Notification outbox"
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"Notification for contact {self.contact_id} ({self.status})"
+
+
+class ContactDailyStats(models.Model):
+    """
+    Per-day submission statistics, maintained by database triggers
+
+    See contact/stats.py. The live columns count the contacts in the table;
+    the archived ones those moved out by contact/archive.py (all processed).
+    """
+    day = models.DateField(
+        primary_key=True,
+        help_text="Day the contacts were submitted"
+    )
+    submissions = models.IntegerField(
+        default=0,
+        help_text="Contacts submitted on this day"
+    )
+    processed = models.IntegerField(
+        default=0,
+        help_text="How many of them are processed"
+    )
+    processing_seconds = models.FloatField(
+        default=0,
+        help_text="Total seconds from submission to processing of the processed ones"
+    )
+    # Database defaults: the triggers insert rows without these columns
+    archived = models.IntegerField(
+        db_default=0,
+        help_text="Contacts from this day moved to the archive"
+    )
+    archived_processing_seconds = models.FloatField(
+        db_default=0,
+        help_text="Total seconds from submission to processing of the archived ones"
+    )
+
+    class Meta:
+        verbose_name = "Daily statistics"
+        verbose_name_plural = "Daily statistics"
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.day}: {self.total_submissions} submitted, {self.total_processed} processed"
+
+    @property
+    def total_submissions(self):
+        """Contacts submitted on this day, archived or not"""
+        return self.submissions + self.archived
+
+    @property
+    def total_processed(self):
+        """Processed contacts from this day, archived or not"""
+        return self.processed + self.archived
+
+    @property
+    def total_processing_seconds(self):
+        return self.processing_seconds + self.archived_processing_seconds
+
+    @property
+    def mean_processing_seconds(self):
+        """Mean time to process, or None if nothing from this day is processed"""
+        if not self.total_processed:
+            return None
+        return self.total_processing_seconds / self.total_processed
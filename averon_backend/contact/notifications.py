@@ -0,0 +1,442 @@
+"""
+Durable admin notifications for contact form submissions
+
+Notifications are written to the NotificationOutbox table in the same
+transaction as the contact. After commit they are handed to a small, bounded
+in-process pool; anything the pool cannot take (or that fails) is retried with
+exponential backoff by the `process_notifications` management command.
+
+With NOTIFICATION_MODE = 'digest', pending notifications are coalesced into
+one email per batch instead: a batch goes out once it holds
+NOTIFICATION_DIGEST_MAX_SIZE notifications or once its oldest notification
+has waited NOTIFICATION_DIGEST_INTERVAL_SECONDS. Every commit hands a flush
+to the pool, which checks whether a batch is ready off the request thread;
+the worker command flushes the batches that are only ready by age. One flush
+runs at a time (a cache lock) and claims each batch with a single UPDATE, so
+concurrent commits cannot send overlapping or split digests.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .metrics import NOTIFICATION_SEND_SECONDS
+from .models import NotificationOutbox
+from .timing import stage
+
+logger = logging.getLogger('django')
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None
+
+NOTIFICATION_MODE_IMMEDIATE = 'immediate'
+NOTIFICATION_MODE_DIGEST = 'digest'
+
+DIGEST_FLUSH_LOCK_KEY = 'notifications:digest-flush'
+
+
+def digest_mode() -> bool:
+    """
+    Whether notifications are batched into digest emails
+    """
+    return settings.NOTIFICATION_MODE == NOTIFICATION_MODE_DIGEST
+
+
+def _admin_url(contact) -> str:
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+    return f"http://{host}:8000/admin/contact/contacts/{contact.id}/"
+
+
+def build_notification_email(contact) -> tuple[str, str]:
+    """
+    Build the subject and plain-text body for a contact notification
+
+    Args:
+        contact: The Contacts instance to notify about
+
+    Returns:
+        Tuple of (subject, message)
+    """
+    # Customize subject line
+    subject = f"🔔 Averon.al - New Contact from {contact.name}"
+
+    # Customize email body
+    message = f"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+  AVERON.AL - NEW CONTACT FORM SUBMISSION
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+📧 CONTACT INFORMATION
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Name:    {contact.name}
+Email:   {contact.email}
+
+💬 MESSAGE
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{contact.message}
+
+🔍 SUBMISSION DETAILS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+ID:            {contact.id}
+Submitted:     {contact.created_at.strftime('%B %d, %Y at %I:%M %p UTC')}
+IP Address:    {contact.ip_address}
+User Agent:    {contact.user_agent[:100]}...
+
+🔗 QUICK ACTIONS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+View in Admin: {_admin_url(contact)}
+Reply to:      {contact.email}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+This is an automated notification from Averon.al
+        """
+    return subject, message
+
+
+def build_digest_email(contacts) -> tuple[str, str]:
+    """
+    Build the subject and plain-text body for a digest of several contacts
+
+    Args:
+        contacts: The Contacts instances to notify about, oldest first
+
+    Returns:
+        Tuple of (subject, message)
+    """
+    subject = f"🔔 Averon.al - {len(contacts)} New Contacts"
+
+    entries = []
+    for number, contact in enumerate(contacts, start=1):
+        message = contact.message if len(contact.message) <= 500 else f"{contact.message[:500]}..."
+        entries.append(f"""
+#{number}  {contact.name} <{contact.email}>
+Submitted:     {contact.created_at.strftime('%B %d, %Y at %I:%M %p UTC')}
+IP Address:    {contact.ip_address}
+View in Admin: {_admin_url(contact)}
+
+{message}
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━""")
+
+    message = f"""
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+  AVERON.AL - {len(contacts)} NEW CONTACT FORM SUBMISSIONS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{''.join(entries)}
+
+This is an automated notification digest from Averon.al
+        """
+    return subject, message
+
+
+def _send_email(subject, message):
+    """
+    Send one notification email to the configured recipient
+
+    Returns False when email is not configured (nothing to deliver) and
+    raises on delivery errors so the outbox can schedule a retry.
+    """
+    # Check if email is configured
+    if not settings.CONTACT_EMAIL_RECIPIENT:
+        logger.warning("Email recipient not configured. Skipping email notification.")
+        return False
+
+    if not settings.DEFAULT_FROM_EMAIL:
+        logger.warning("Default from email not configured. Skipping email notification.")
+        return False
+
+    import resend
+    resend.api_key = settings.RESEND_API_KEY
+    resend.Emails.send({
+        "from": f"Averon <{settings.DEFAULT_FROM_EMAIL}>",
+        "to": [settings.CONTACT_EMAIL_RECIPIENT],
+        "subject": subject,
+        "text": message,
+    })
+    return True
+
+
+def send_notification_email(contact):
+    """
+    Send email notification for new contact submission
+
+    Returns False when email is not configured (nothing to deliver) and
+    raises on delivery errors so the outbox can schedule a retry.
+    """
+    return _send_email(*build_notification_email(contact))
+
+
+def send_digest_email(contacts):
+    """
+    Send one email notifying about several contact submissions
+
+    Same return value and errors as send_notification_email().
+    """
+    return _send_email(*build_digest_email(contacts))
+
+
+def enqueue_notification(contact) -> NotificationOutbox:
+    """
+    Queue a notification for a contact
+
+    Must be called inside the transaction that saves the contact. Once that
+    transaction commits, the notification is offered to the in-process pool.
+    """
+    notification = NotificationOutbox.objects.create(contact=contact)
+    transaction.on_commit(lambda: dispatch_notification(notification.pk))
+    return notification
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Exponential backoff delay after the given number of failed attempts
+    """
+    base = settings.NOTIFICATION_RETRY_BASE_SECONDS
+    cap = settings.NOTIFICATION_RETRY_MAX_SECONDS
+    return timedelta(seconds=min(cap, base * (2 ** max(attempts - 1, 0))))
+
+
+def _claim(notification_id) -> bool:
+    """
+    Lease a due notification so no other worker delivers it concurrently
+
+    The lease is a compare-and-set UPDATE on next_attempt_at, which works on
+    every database backend without holding row locks during delivery.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+    claimed = NotificationOutbox.objects.filter(
+        pk=notification_id,
+        status=NotificationOutbox.STATUS_PENDING,
+        next_attempt_at__lte=now,
+    ).update(next_attempt_at=now + lease, attempts=F('attempts') + 1)
+    return claimed == 1
+
+
+def _claim_batch(notification_ids) -> list:
+    """
+    Lease the due notifications among `notification_ids` in one UPDATE
+
+    Returns:
+        Ids of the notifications claimed, i.e. those leased until exactly
+        the expiry this call set
+    """
+    now = timezone.now()
+    leased_until = now + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+    claimable = NotificationOutbox.objects.filter(
+        pk__in=notification_ids,
+        status=NotificationOutbox.STATUS_PENDING,
+    )
+    if not claimable.filter(next_attempt_at__lte=now).update(
+        next_attempt_at=leased_until, attempts=F('attempts') + 1
+    ):
+        return []
+    return list(claimable.filter(next_attempt_at=leased_until).order_by('pk').values_list('pk', flat=True))
+
+
+def deliver_notification(notification_id) -> bool:
+    """
+    Claim and deliver a single outbox entry
+
+    Returns:
+        True if the notification was delivered, False if it was not due,
+        already claimed elsewhere, or failed and was rescheduled.
+    """
+    if not _claim(notification_id):
+        return False
+
+    notification = NotificationOutbox.objects.select_related('contact').get(pk=notification_id)
+
+    started = time.perf_counter()
+    try:
+        send_notification_email(notification.contact)
+    except Exception as e:
+        NOTIFICATION_SEND_SECONDS.labels('failed').observe(time.perf_counter() - started)
+        logger.error(
+            "Notification %s for contact %s failed (attempt %s): %s",
+            notification.pk, notification.contact_id, notification.attempts, e
+        )
+        _record_failure(notification, e)
+        return False
+
+    NOTIFICATION_SEND_SECONDS.labels('sent').observe(time.perf_counter() - started)
+    notification.status = NotificationOutbox.STATUS_SENT
+    notification.sent_at = timezone.now()
+    notification.last_error = ''
+    notification.save(update_fields=['status', 'sent_at', 'last_error'])
+    return True
+
+
+def _record_failure(notification, error):
+    """
+    Reschedule a claimed notification after a failed send, or give up on it
+    """
+    notification.last_error = str(error)[:1000]
+    if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+        notification.status = NotificationOutbox.STATUS_FAILED
+    else:
+        notification.next_attempt_at = timezone.now() + retry_delay(notification.attempts)
+    notification.save(update_fields=['status', 'next_attempt_at', 'last_error'])
+
+
+def deliver_digest(notification_ids) -> int:
+    """
+    Claim the given outbox entries and deliver them as one email
+
+    Entries claimed elsewhere are left out; a single remaining entry gets the
+    regular notification email. On failure every entry is rescheduled.
+
+    Returns:
+        Number of notifications delivered
+    """
+    claimed = _claim_batch(notification_ids)
+    if not claimed:
+        return 0
+
+    notifications = list(
+        NotificationOutbox.objects.select_related('contact').filter(pk__in=claimed).order_by('created_at', 'pk')
+    )
+    contacts = [notification.contact for notification in notifications]
+
+    started = time.perf_counter()
+    try:
+        if len(contacts) == 1:
+            send_notification_email(contacts[0])
+        else:
+            send_digest_email(contacts)
+    except Exception as e:
+        NOTIFICATION_SEND_SECONDS.labels('failed').observe(time.perf_counter() - started)
+        logger.error("Digest of %s notification(s) failed: %s", len(notifications), e)
+        for notification in notifications:
+            _record_failure(notification, e)
+        return 0
+
+    NOTIFICATION_SEND_SECONDS.labels('sent').observe(time.perf_counter() - started)
+    NotificationOutbox.objects.filter(pk__in=claimed).update(
+        status=NotificationOutbox.STATUS_SENT, sent_at=timezone.now(), last_error=''
+    )
+    return len(notifications)
+
+
+def _due_notifications():
+    return NotificationOutbox.objects.filter(
+        status=NotificationOutbox.STATUS_PENDING,
+        next_attempt_at__lte=timezone.now(),
+    )
+
+
+def flush_digests(limit: int = 100) -> int:
+    """
+    Send the digests that are ready among up to `limit` due notifications
+
+    A batch is ready when it is full (NOTIFICATION_DIGEST_MAX_SIZE) or its
+    oldest notification has waited NOTIFICATION_DIGEST_INTERVAL_SECONDS.
+    Returns 0 at once while another flush holds the lock; the notifications
+    stay pending for it or the next one.
+
+    Returns:
+        Number of notifications delivered
+    """
+    token = uuid.uuid4().hex
+    if not cache.add(DIGEST_FLUSH_LOCK_KEY, token, timeout=settings.NOTIFICATION_LEASE_SECONDS):
+        return 0
+    try:
+        return _flush_digests(limit)
+    finally:
+        if cache.get(DIGEST_FLUSH_LOCK_KEY) == token:
+            cache.delete(DIGEST_FLUSH_LOCK_KEY)
+
+
+def _flush_digests(limit):
+    size = settings.NOTIFICATION_DIGEST_MAX_SIZE
+    waited_since = timezone.now() - timedelta(seconds=settings.NOTIFICATION_DIGEST_INTERVAL_SECONDS)
+    due = list(_due_notifications().order_by('created_at', 'pk').values_list('pk', 'created_at')[:limit])
+
+    delivered = 0
+    for start in range(0, len(due), size):
+        batch = due[start:start + size]
+        if len(batch) < size and batch[0][1] > waited_since:
+            break
+        delivered += deliver_digest([pk for pk, created_at in batch])
+    return delivered
+
+
+def process_outbox(limit: int = 100) -> int:
+    """
+    Deliver up to `limit` due notifications, as digests in digest mode
+
+    Returns:
+        Number of notifications delivered
+    """
+    if digest_mode():
+        return flush_digests(limit)
+
+    due_ids = list(
+        _due_notifications().order_by('next_attempt_at').values_list('pk', flat=True)[:limit]
+    )
+    return sum(1 for pk in due_ids if deliver_notification(pk))
+
+
+def _get_executor():
+    """
+    Lazily create the per-process notification pool
+    """
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = settings.NOTIFICATION_WORKERS
+                _slots = threading.BoundedSemaphore(workers * 2)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='contact-notify'
+                )
+    return _executor
+
+
+def _run_pooled(deliver, *args):
+    close_old_connections()
+    try:
+        deliver(*args)
+    except Exception as e:
+        logger.error("Notification delivery %s%s crashed: %s", deliver.__name__, args, e, exc_info=True)
+    finally:
+        _slots.release()
+        close_old_connections()
+
+
+def dispatch_notification(notification_id) -> bool:
+    """
+    Offer a committed notification to the bounded in-process pool
+
+    When the pool is disabled or saturated, the notification simply stays
+    pending in the outbox for the `process_notifications` worker. In digest
+    mode the pool gets a flush, which sends nothing until a batch is ready.
+
+    Returns:
+        True if the notification (or a digest flush) was handed to the pool
+    """
+    if settings.NOTIFICATION_WORKERS <= 0:
+        return False
+
+    with stage('notify'):
+        if digest_mode():
+            task = (flush_digests, settings.NOTIFICATION_DIGEST_MAX_SIZE)
+        else:
+            task = (deliver_notification, notification_id)
+
+        executor = _get_executor()
+        if not _slots.acquire(blocking=False):
+            logger.info("Notification pool saturated; leaving %s for the outbox worker", notification_id)
+            return False
+
+        executor.submit(_run_pooled, *task)
+    return True
@@ -0,0 +1,32 @@
+"""
+Custom request parsers for contact endpoints
+"""
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse newline-delimited JSON (one object per line) into a list
+
+    Blank lines are skipped; a malformed line fails the whole request with
+    its line number so the client can fix the file.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+
+        rows = []
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line.decode(encoding)))
+            except (ValueError, UnicodeDecodeError) as e:
+                raise ParseError(f'NDJSON parse error on line {line_number}: {e}')
+        return rows
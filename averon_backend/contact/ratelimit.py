@@ -0,0 +1,157 @@
+"""
+Generic cell rate algorithm (GCRA) rate limiter
+
+GCRA stores a single number per client, the "theoretical arrival time" (TAT)
+of its next request, instead of a list of past request timestamps. A limit
+of N requests per period P is a token bucket: a burst of N, then one
+request every P / N seconds as the bucket refills. That is a sustained rate
+of N per P, not a sliding window: a client that bursts and then keeps
+sending as soon as it is allowed gets up to 2N - 1 requests into the first
+period (5 for 3/hour), and at most N + k in any later P where it had k
+tokens saved up.
+
+With REDIS_URL set, each check is a single Lua script run atomically inside
+Redis using Redis' own clock, so every worker process and host shares one
+limit. Otherwise (tests, local development) the check runs in-process
+against the Django cache.
+"""
+import logging
+import math
+import threading
+import time
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger('django')
+
+# TATs for RedisGCRALimiter's fallback; in-process, so it works when Redis is down
+fallback_cache = LocMemCache('averon-gcra-fallback', {'OPTIONS': {'MAX_ENTRIES': 100000}})
+
+# KEYS[1] = client key; ARGV[1] = emission interval, ARGV[2] = period (seconds)
+# Returns {allowed, seconds until the next request would be allowed}
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, tostring(allow_at - now)}
+end
+
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+class LocalGCRALimiter:
+    """
+    In-process GCRA limiter backed by a Django cache
+
+    Exact within one process; with a per-process cache (LocMemCache) every
+    worker enforces the limit separately.
+
+    Args:
+        store: Cache holding the TATs; the default Django cache if None
+    """
+
+    def __init__(self, store=None):
+        self._lock = threading.Lock()
+        self.store = store if store is not None else cache
+
+    def hit(self, key, limit, period):
+        """
+        Record a request and decide whether it is allowed
+
+        Args:
+            key: Client identifier
+            limit: Requests allowed per period
+            period: Period length in seconds
+
+        Returns:
+            Tuple of (allowed, wait) where wait is the number of seconds
+            until the next request would be allowed (0 if allowed)
+        """
+        interval = period / limit
+        key = f'gcra:{key}'
+        with self._lock:
+            now = time.time()
+            tat = max(self.store.get(key, now), now)
+            new_tat = tat + interval
+            allow_at = new_tat - period
+            if allow_at > now:
+                return False, allow_at - now
+            self.store.set(key, new_tat, timeout=math.ceil(new_tat - now))
+            return True, 0.0
+
+
+class RedisGCRALimiter:
+    """
+    GCRA limiter evaluated atomically inside Redis
+
+    If Redis cannot be reached the request is checked by a LocalGCRALimiter
+    instead, so an outage degrades to per-process limits rather than either
+    blocking every submission or disabling throttling. The fallback keeps its
+    state in a private in-process cache: the default Django cache is usually
+    on the same Redis server and down with it.
+    """
+
+    def __init__(self, url, timeout=0.5, fallback=None):
+        self.client = redis.Redis.from_url(
+            url,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+        self.script = self.client.register_script(GCRA_SCRIPT)
+        self.fallback = fallback or LocalGCRALimiter(store=fallback_cache)
+
+    def hit(self, key, limit, period):
+        """
+        See LocalGCRALimiter.hit
+        """
+        try:
+            allowed, wait = self.script(keys=[f'gcra:{key}'], args=[period / limit, period])
+        except redis.RedisError as e:
+            logger.error("Redis rate limiter unavailable, using in-process limits: %s", e)
+            return self.fallback.hit(key, limit, period)
+        return bool(allowed), float(wait)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Return the per-process limiter: Redis-backed when REDIS_URL is set
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                url = getattr(settings, 'REDIS_URL', '')
+                if url:
+                    _limiter = RedisGCRALimiter(url, timeout=settings.THROTTLE_REDIS_TIMEOUT)
+                else:
+                    _limiter = LocalGCRALimiter()
+    return _limiter
+
+
+@receiver(setting_changed)
+def _reset_limiter_on_setting_change(setting, **kwargs):
+    global _limiter
+    if setting in ('REDIS_URL', 'THROTTLE_REDIS_TIMEOUT'):
+        with _limiter_lock:
+            _limiter = None
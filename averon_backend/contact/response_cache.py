@@ -0,0 +1,125 @@
+"""
+Versioned read-through cache for admin contact endpoints
+
+Cached responses are tagged with a global "contacts version". Any write to
+the Contacts table bumps the version (post_save / post_delete signals, plus
+explicit bumps from bulk code paths that bypass signals), which invalidates
+every cached page at once without having to track which keys exist.
+
+A lookup fetches the version and the cached entry with a single get_many
+(one MGET on Redis), so a dashboard polling every few seconds costs one
+cache round trip instead of a COUNT plus a page query.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'contacts:response:version'
+RESPONSE_KEY_PREFIX = 'contacts:response:'
+
+
+def _cache():
+    return caches[settings.CONTACT_RESPONSE_CACHE_ALIAS]
+
+
+def bump_version():
+    """
+    Invalidate every cached contacts response
+    """
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Key missing (first write or evicted): start a fresh version that
+        # cannot collide with entries cached under an earlier one
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_on_commit():
+    """
+    Bump the version once the current transaction commits
+
+    Bumping after commit guarantees that a response cached under the new
+    version was built from data that includes the write.
+    """
+    transaction.on_commit(bump_version)
+
+
+def request_key(request, view, prefix=RESPONSE_KEY_PREFIX):
+    """
+    Cache key for a ViewSet request
+
+    Covers the action, host, path with query string (filters, cursor, page
+    size) and serializer class.
+    """
+    parts = [
+        view.action,
+        request.get_host(),
+        request.get_full_path(),
+        view.get_serializer_class().__name__,
+    ]
+    digest = hashlib.sha256('|'.join(parts).encode()).hexdigest()
+    return f'{prefix}{digest}'
+
+
+def get_versioned(key):
+    """
+    Look up a cached value together with the current contacts version
+
+    Returns:
+        Tuple of (version, value); value is None if missing or cached under
+        an older version
+    """
+    cache = _cache()
+    found = cache.get_many([VERSION_KEY, key])
+    version = found.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+
+    entry = found.get(key)
+    if entry is not None and entry[0] == version:
+        return version, entry[1]
+    return version, None
+
+
+def set_versioned(key, version, value):
+    """
+    Cache a value computed from data read under the given version
+    """
+    _cache().set(key, (version, value), timeout=settings.CONTACT_RESPONSE_CACHE_TIMEOUT)
+
+
+def cached_response(view_method):
+    """
+    Cache successful responses of a read-only ViewSet action
+
+    See request_key for what the key covers. Permissions are checked by DRF
+    before the action runs, so cached data is only served to callers who
+    could have read it anyway.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if not settings.CONTACT_RESPONSE_CACHE_TIMEOUT:
+            return view_method(self, request, *args, **kwargs)
+
+        key = request_key(request, self)
+        version, data = get_versioned(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            # Tagged with the version read *before* querying, so a write that
+            # lands mid-request leaves this entry already stale
+            set_versioned(key, version, response.data)
+            response['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
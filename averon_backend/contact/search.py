@@ -0,0 +1,249 @@
+"""
+Full-text search over contact submissions
+
+PostgreSQL: `Contacts.search_vector` (a tsvector) is filled by a trigger on
+every insert and on updates of the searched columns, so set-based writes
+(bulk_create, QuerySet.update) stay indexed too. A GIN index on the column
+answers `search_vector @@ query` without scanning the table.
+
+SQLite (development): an external-content FTS5 table mirrors the searched
+columns through triggers and is ranked with bm25().
+
+Other backends, or SQLite builds without FTS5, fall back to case-insensitive
+substring matching.
+
+The database objects are created by migration 0005 and, for databases built
+without migrations (tests, `migrate --run-syncdb`), by a post_migrate handler.
+Existing rows are indexed in batches of BACKFILL_BATCH_SIZE, each its own
+statement, and outside a transaction the GIN index is built CONCURRENTLY, so
+installing on a large table does not block writes to it.
+"""
+import logging
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import DatabaseError, connections, models
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger('django')
+
+SEARCH_CONFIG = 'english'
+
+TABLE = 'contact_contacts'
+FTS_TABLE = 'contact_contacts_fts'
+PG_FUNCTION = 'contact_contacts_search_vector_update'
+PG_TRIGGER = 'contact_contacts_search_vector_trigger'
+PG_INDEX = 'contact_search_vector_gin'
+
+SEARCHED_COLUMNS = ('name', 'email', 'message', 'ip_address')
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Weights: A for who sent it, B for what they wrote, C for where from
+_PG_VECTOR = (
+    "setweight(to_tsvector('{config}', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce({row}email, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce({row}message, '')), 'B') || "
+    "setweight(to_tsvector('{config}', coalesce(host({row}ip_address), '')), 'C')"
+)
+# bm25() column weights matching the PostgreSQL weights above
+_FTS_WEIGHTS = '10.0, 10.0, 4.0, 2.0'
+
+
+def _pg_backfill(cursor):
+    # Walk the table by id so every batch is a short statement; when not in
+    # a transaction each one commits and releases its row locks
+    vector = _PG_VECTOR.format(config=SEARCH_CONFIG, row='')
+    last_id = 0
+    while True:
+        cursor.execute(
+            f'SELECT max(id) FROM (SELECT id FROM {TABLE} WHERE id > %s ORDER BY id LIMIT %s) AS batch',
+            [last_id, BACKFILL_BATCH_SIZE]
+        )
+        batch_end = cursor.fetchone()[0]
+        if batch_end is None:
+            return
+        cursor.execute(
+            f'UPDATE {TABLE} SET search_vector = {vector} '
+            f'WHERE id > %s AND id <= %s AND search_vector IS NULL',
+            [last_id, batch_end]
+        )
+        last_id = batch_end
+
+
+def _pg_install(cursor, concurrently):
+    cursor.execute(f"""
+        CREATE OR REPLACE FUNCTION {PG_FUNCTION}() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {_PG_VECTOR.format(config=SEARCH_CONFIG, row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cursor.execute(f'DROP TRIGGER IF EXISTS {PG_TRIGGER} ON {TABLE}')
+    cursor.execute(f"""
+        CREATE TRIGGER {PG_TRIGGER}
+        BEFORE INSERT OR UPDATE OF {', '.join(SEARCHED_COLUMNS)} ON {TABLE}
+        FOR EACH ROW EXECUTE FUNCTION {PG_FUNCTION}()
+    """)
+    _pg_backfill(cursor)
+    cursor.execute(
+        f'CREATE INDEX {"CONCURRENTLY " if concurrently else ""}IF NOT EXISTS {PG_INDEX} '
+        f'ON {TABLE} USING gin (search_vector)'
+    )
+
+
+def _pg_uninstall(cursor):
+    cursor.execute(f'DROP INDEX IF EXISTS {PG_INDEX}')
+    cursor.execute(f'DROP TRIGGER IF EXISTS {PG_TRIGGER} ON {TABLE}')
+    cursor.execute(f'DROP FUNCTION IF EXISTS {PG_FUNCTION}()')
+
+
+def _sqlite_install(cursor):
+    columns = ', '.join(SEARCHED_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCHED_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCHED_COLUMNS)
+
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{columns}, content='{TABLE}', content_rowid='id', tokenize='porter unicode61')"
+    )
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {columns} ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+    # Index the rows that existed before the triggers did
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _sqlite_uninstall(cursor):
+    for suffix in ('ai', 'ad', 'au'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+    cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def install_search(connection):
+    """
+    Create (or refresh) the full-text index and the triggers that maintain it
+
+    Safe to run repeatedly. Rows written before installation are indexed.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+            _pg_install(cursor, concurrently=not connection.in_atomic_block)
+        elif connection.vendor == 'sqlite':
+            try:
+                _sqlite_install(cursor)
+            except DatabaseError as e:
+                # SQLite built without FTS5; search uses substring matching
+                logger.warning("Full-text search unavailable, using substring search: %s", e)
+
+
+def uninstall_search(connection):
+    """
+    Drop the full-text index and its triggers
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            _pg_uninstall(cursor)
+        elif connection.vendor == 'sqlite':
+            _sqlite_uninstall(cursor)
+
+
+def search_installed(connection):
+    """
+    Whether install_search() has run on this database
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT 1 FROM pg_trigger WHERE tgname = %s', [PG_TRIGGER])
+        elif connection.vendor == 'sqlite':
+            # Later migrations that alter contact_contacts rebuild the table on
+            # SQLite, which drops its triggers; count them as well
+            cursor.execute(
+                "SELECT count(*) = 4 FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                [FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+            )
+            return bool(cursor.fetchone()[0])
+        else:
+            return True
+        return cursor.fetchone() is not None
+
+
+def _fts_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def fts_query(query):
+    """
+    Turn free text into an FTS5 query that cannot be a syntax error
+
+    Every whitespace-separated term becomes a quoted phrase, so operators
+    and punctuation in the input are matched literally (an email address or
+    IP is tokenized into a phrase). Terms without any word character are
+    dropped; returns '' when nothing is left to search for.
+    """
+    terms = [term for term in query.split() if re.search(r'\w', term)]
+    return ' '.join('"%s"' % term.replace('"', '""') for term in terms)
+
+
+def search_queryset(queryset, query, ranked=False):
+    """
+    Filter a Contacts queryset to full-text matches of `query`
+
+    Args:
+        queryset: Contacts queryset to filter
+        query: Free text as typed by the user (web-search syntax on PostgreSQL)
+        ranked: Annotate `search_rank` (higher is better) and order by it,
+            newest first among equal ranks
+
+    Returns:
+        Filtered queryset; the existing ordering is kept unless ranked
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        queryset = queryset.filter(search_vector=search_query)
+        rank = SearchRank(models.F('search_vector'), search_query)
+    elif connection.vendor == 'sqlite' and _fts_available(connection):
+        match = fts_query(query)
+        if not match:
+            queryset, rank = queryset.none(), models.Value(0.0, output_field=models.FloatField())
+        else:
+            queryset = queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+            ))
+            rank = RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, {_FTS_WEIGHTS}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TABLE}.id',
+                [match], output_field=models.FloatField()
+            )
+    else:
+        condition = models.Q()
+        for term in query.split():
+            condition &= (
+                models.Q(name__icontains=term)
+                | models.Q(email__icontains=term)
+                | models.Q(message__icontains=term)
+            )
+        queryset = queryset.filter(condition)
+        rank = models.Value(0.0, output_field=models.FloatField())
+
+    if ranked:
+        queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', '-created_at', '-id')
+    return queryset
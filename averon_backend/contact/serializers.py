@@ -1,7 +1,12 @@
+import logging
 import re
 from rest_framework import serializers
 from django.utils.html import strip_tags
-from .models import Contacts
+from .models import Contacts, ContactDailyStats
+from .spam import get_spam_engine
+from .disposable import is_disposable_domain
+
+logger = logging.getLogger('django')
 
 
 class ContactSerializer(serializers.ModelSerializer):
@@ -59,13 +64,9 @@ class ContactSerializer(serializers.ModelSerializer):
                 "Email address is too long"
             )
 
-        # Check for common disposable email domains (optional)
-        disposable_domains = [
-            'tempmail.com', 'throwaway.email', '10minutemail.com',
-            'guerrillamail.com', 'mailinator.com'
-        ]
+        # Reject disposable email domains, including their subdomains
         domain = value.split('@')[-1]
-        if domain in disposable_domains:
+        if is_disposable_domain(domain):
             raise serializers.ValidationError(
                 "Please use a permanent email address"
             )
@@ -89,18 +90,13 @@ class ContactSerializer(serializers.ModelSerializer):
                 "Message must not exceed 5000 characters"
             )
 
-        # Check for spam patterns (basic detection)
-        spam_patterns = [
-            r'(viagra|cialis|lottery|prize)',  # Common spam words
-            r'http[s]?://[^\s]{50,}',  # Very long URLs
-            r'(\$\$\$|!!!{3,})',  # Excessive symbols
-        ]
-
-        for pattern in spam_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                raise serializers.ValidationError(
-                    "Message contains prohibited content"
-                )
+        # Check against the precompiled spam rules
+        match = get_spam_engine().match(value)
+        if match:
+            logger.info("Contact message rejected by spam rule '%s'", match.rule)
+            raise serializers.ValidationError(
+                "Message contains prohibited content"
+            )
 
         return value
 
@@ -118,6 +114,13 @@ class ContactSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def create(self, validated_data):
+        """
+        Drop the reCAPTCHA token, which is verified in the view and not stored
+        """
+        validated_data.pop('recaptcha_token', None)
+        return super().create(validated_data)
+
 
 class ContactAdminSerializer(ContactSerializer):
     """
@@ -125,9 +128,93 @@ class ContactAdminSerializer(ContactSerializer):
     """
     class Meta(ContactSerializer.Meta):
         fields = ContactSerializer.Meta.fields + [
-            'ip_address', 'user_agent', 'processed_at'
+            'ip_address', 'user_agent', 'processed_at', 'recaptcha_degraded'
         ]
         read_only_fields = [
             'id', 'created_at', 'updated_at',
-            'ip_address', 'user_agent', 'processed_at'
+            'ip_address', 'user_agent', 'processed_at', 'recaptcha_degraded'
         ]
+
+
+class ContactFilterSerializer(serializers.Serializer):
+    """
+    Whitelisted filters for admin bulk operations on contacts
+    """
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    email = serializers.EmailField(required=False)
+    is_processed = serializers.BooleanField(required=False, allow_null=True, default=None)
+    recaptcha_degraded = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+    def filter_queryset(self, queryset, data=None):
+        """
+        Apply the validated filters to a Contacts queryset
+
+        Args:
+            queryset: Contacts queryset to narrow down
+            data: Validated filter values; defaults to this serializer's
+                validated_data (pass them explicitly when nested)
+        """
+        if data is None:
+            data = self.validated_data
+        if data.get('created_after'):
+            queryset = queryset.filter(created_at__gte=data['created_after'])
+        if data.get('created_before'):
+            queryset = queryset.filter(created_at__lt=data['created_before'])
+        if data.get('email'):
+            queryset = queryset.filter(email__iexact=data['email'])
+        if data.get('is_processed') is not None:
+            queryset = queryset.filter(is_processed=data['is_processed'])
+        if data.get('recaptcha_degraded') is not None:
+            queryset = queryset.filter(recaptcha_degraded=data['recaptcha_degraded'])
+        return queryset
+
+
+class BulkMarkProcessedSerializer(serializers.Serializer):
+    """
+    Selection for the bulk mark-processed action: a list of IDs or a filter
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=50000
+    )
+    filter = ContactFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        """
+        Require exactly one of ids or filter
+        """
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError("Provide either 'ids' or 'filter'")
+        if 'filter' in attrs and not any(v is not None for v in attrs['filter'].values()):
+            # Refuse to silently select every contact
+            raise serializers.ValidationError({'filter': ['At least one filter is required']})
+        return attrs
+
+
+class DailyStatsRangeSerializer(serializers.Serializer):
+    """
+    Day range for the daily statistics (both ends inclusive)
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({'end': ['Must not be before start']})
+        return attrs
+
+
+class ContactDailyStatsSerializer(serializers.ModelSerializer):
+    """
+    One day of contact statistics, archived contacts included
+    """
+    submissions = serializers.IntegerField(source='total_submissions', read_only=True)
+    processed = serializers.IntegerField(source='total_processed', read_only=True)
+    mean_processing_seconds = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ContactDailyStats
+        fields = ['day', 'submissions', 'processed', 'archived', 'mean_processing_seconds']
@@ -0,0 +1,234 @@
+"""
+Precompiled spam rule engine for contact messages
+
+All rules are compiled once into a single regular expression, so checking a
+message is one scan no matter how many rules are loaded. Each rule's plain
+keywords are merged into a trie-shaped alternation (e.g.
+``ca(?:sino|sh prize)``), which keeps the scan cost flat as keyword lists
+grow. Every rule gets its own named group, so a match names its rule
+directly.
+
+Rules can be hot-reloaded from a JSON file (SPAM_RULES_FILE) without
+restarting workers: the file's mtime is checked at most once every
+SPAM_RULES_CHECK_INTERVAL seconds and a changed file is compiled and swapped
+in atomically.
+
+Rule file format::
+
+    [
+        {"name": "pharma", "keywords": ["viagra", "cialis"]},
+        {"name": "long-url", "pattern": "http[s]?://[^\\s]{50,}"}
+    ]
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger('django')
+
+# Rules that shipped with the original serializer
+DEFAULT_RULES = [
+    {'name': 'spam-keywords', 'keywords': ['viagra', 'cialis', 'lottery', 'prize']},  # Common spam words
+    {'name': 'long-url', 'pattern': r'http[s]?://[^\s]{50,}'},  # Very long URLs
+    {'name': 'excessive-symbols', 'pattern': r'(\$\$\$|!!!{3,})'},  # Excessive symbols
+]
+
+
+class SpamRule(NamedTuple):
+    name: str
+    pattern: str = ''
+    keywords: tuple = ()
+
+
+class SpamMatch(NamedTuple):
+    rule: str
+    text: str
+
+
+def _trie_pattern(words) -> str:
+    """
+    Build a regex alternation shaped like a trie of the given words
+
+    Shared prefixes are factored out so the regex engine only walks each
+    prefix once, regardless of how many keywords share it.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = None  # end of word
+
+    def build(node):
+        if '' in node and len(node) == 1:
+            return ''
+
+        branches = []
+        optional = False
+        for char in sorted(node):
+            if char == '':
+                optional = True
+                continue
+            branches.append(re.escape(char) + build(node[char]))
+
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        result = '(?:' + '|'.join(branches) + ')'
+        return result + '?' if optional else result
+
+    return build(trie)
+
+
+class SpamRuleEngine:
+    """
+    Compiled set of spam rules
+
+    Args:
+        rules: Iterable of dicts or SpamRule with a `name` and either a regex
+            `pattern` or a list of literal `keywords`
+        version: Opaque identifier of the rule source (e.g. file mtime)
+    """
+
+    def __init__(self, rules, version=None):
+        self.rules = [self._parse_rule(rule) for rule in rules]
+        self.version = version
+        self._regex = self._compile()
+
+    @staticmethod
+    def _parse_rule(rule) -> SpamRule:
+        if isinstance(rule, SpamRule):
+            return rule
+        if not rule.get('name'):
+            raise ValueError(f"Spam rule without a name: {rule!r}")
+        if bool(rule.get('pattern')) == bool(rule.get('keywords')):
+            raise ValueError(f"Spam rule '{rule['name']}' needs exactly one of 'pattern' or 'keywords'")
+        return SpamRule(
+            name=rule['name'],
+            pattern=rule.get('pattern', ''),
+            keywords=tuple(rule.get('keywords', ())),
+        )
+
+    def _compile(self):
+        alternatives = []
+        self._group_rules = {}
+
+        # A keyword listed by several rules belongs to the first of them
+        seen = set()
+        for index, rule in enumerate(rule for rule in self.rules if rule.keywords):
+            keywords = {keyword.lower() for keyword in rule.keywords} - seen
+            seen |= keywords
+            if keywords:
+                group = f'k{index}'
+                self._group_rules[group] = rule.name
+                alternatives.append(f'(?P<{group}>{_trie_pattern(keywords)})')
+
+        for index, rule in enumerate(rule for rule in self.rules if rule.pattern):
+            try:
+                compiled = re.compile(rule.pattern)
+            except re.error as e:
+                raise ValueError(f"Spam rule '{rule.name}' has an invalid pattern: {e}") from e
+            if compiled.groupindex:
+                raise ValueError(f"Spam rule '{rule.name}' must not use named groups")
+            group = f'r{index}'
+            self._group_rules[group] = rule.name
+            alternatives.append(f'(?P<{group}>{rule.pattern})')
+
+        if not alternatives:
+            return None
+        try:
+            return re.compile('|'.join(alternatives), re.IGNORECASE)
+        except re.error as e:
+            # e.g. inline global flags, which are only valid at the start
+            raise ValueError(f"Spam rules cannot be combined: {e}") from e
+
+    def match(self, text: str):
+        """
+        Find the first rule matching the text
+
+        Returns:
+            SpamMatch with the rule name and matched text, or None
+        """
+        if self._regex is None:
+            return None
+        found = self._regex.search(text)
+        if found is None:
+            return None
+
+        group = found.lastgroup
+        return SpamMatch(self._group_rules[group], found.group(group))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load and compile rules from a JSON file
+        """
+        with open(path, encoding='utf-8') as f:
+            rules = json.load(f)
+        return cls(rules, version=os.stat(path).st_mtime_ns)
+
+
+class _EngineHolder:
+    """
+    Per-process engine with mtime-based hot reload
+    """
+
+    def __init__(self):
+        self._engine = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> SpamRuleEngine:
+        path = getattr(settings, 'SPAM_RULES_FILE', '')
+        engine = self._engine
+        if engine is not None and (
+            not path or time.monotonic() - self._checked_at < settings.SPAM_RULES_CHECK_INTERVAL
+        ):
+            return engine
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if not path:
+                if self._engine is None:
+                    self._engine = SpamRuleEngine(DEFAULT_RULES)
+                return self._engine
+
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if self._engine is None or self._engine.version != mtime:
+                    self._engine = SpamRuleEngine.from_file(path)
+                    logger.info("Loaded %s spam rules from %s", len(self._engine.rules), path)
+            except (OSError, ValueError) as e:
+                # Keep serving the last good rule set
+                logger.error("Could not load spam rules from %s: %s", path, e)
+                if self._engine is None:
+                    self._engine = SpamRuleEngine(DEFAULT_RULES)
+            return self._engine
+
+    def reset(self):
+        with self._lock:
+            self._engine = None
+            self._checked_at = 0.0
+
+
+_holder = _EngineHolder()
+
+
+def get_spam_engine() -> SpamRuleEngine:
+    """
+    Return the current rule engine, reloading the rules file if it changed
+    """
+    return _holder.get()
+
+
+@receiver(setting_changed)
+def _reset_engine_on_setting_change(setting, **kwargs):
+    if setting.startswith('SPAM_RULES_'):
+        _holder.reset()
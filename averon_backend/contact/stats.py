@@ -0,0 +1,362 @@
+"""
+Daily contact statistics
+
+`ContactDailyStats` holds one row per day with the number of submissions,
+how many of them are processed and their total time to process. Triggers on
+the contacts table keep it current on every insert, delete and change of
+created_at / is_processed / processed_at, so set-based writes (bulk_create,
+QuerySet.update) are counted too, in the same transaction as the write.
+Reports read O(days) rows instead of scanning O(rows) contacts.
+
+On PostgreSQL the triggers are statement-level: each statement reads its
+transition tables and makes one upsert per day it touched, in day order, so
+a bulk write costs one extra statement and locks each day's row once rather
+than once per contact. SQLite (development) has only row-level triggers.
+
+Contacts moved out of the table by the archiver (contact/archive.py) are
+kept in the `archived` columns, so history survives archival.
+
+Days are bucketed in TIME_ZONE on PostgreSQL and in UTC on SQLite, whose
+dates are stored as UTC text. Other backends have no triggers; run
+`manage.py rebuild_contact_stats` to refresh the table there.
+
+The triggers are created by migration 0006 and, for databases built without
+migrations, by a post_migrate handler. Installing them (again) recomputes the
+whole table from the contacts.
+"""
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+TABLE = 'contact_contacts'
+STATS_TABLE = 'contact_contactdailystats'
+PG_FUNCTION = 'contact_daily_stats_update'
+PG_TRIGGER = 'contact_daily_stats_trigger'
+PG_DELETE_TRIGGER = 'contact_daily_stats_delete_trigger'
+PG_UPDATE_TRIGGER = 'contact_daily_stats_update_trigger'
+PG_TRIGGERS = (PG_TRIGGER, PG_DELETE_TRIGGER, PG_UPDATE_TRIGGER)
+SQLITE_TRIGGER = 'contact_daily_stats'
+
+# Columns a row's contribution depends on
+TRACKED_COLUMNS = ('created_at', 'is_processed', 'processed_at')
+
+# Per-vendor expressions for a row's day and its contribution; {row} is a
+# row or table alias with its dot ('new.', 'o.') or '' (a plain SELECT)
+_EXPRESSIONS = {
+    'postgresql': {
+        'day': "({row}created_at AT TIME ZONE '{tz}')::date",
+        'processed': 'CASE WHEN {row}is_processed THEN 1 ELSE 0 END',
+        'seconds': (
+            'CASE WHEN {row}is_processed AND {row}processed_at IS NOT NULL '
+            'THEN extract(epoch FROM {row}processed_at - {row}created_at) ELSE 0 END'
+        ),
+    },
+    'sqlite': {
+        'day': 'date({row}created_at)',
+        'processed': 'CASE WHEN {row}is_processed THEN 1 ELSE 0 END',
+        'seconds': (
+            'CASE WHEN {row}is_processed AND {row}processed_at IS NOT NULL '
+            'THEN (julianday({row}processed_at) - julianday({row}created_at)) * 86400.0 ELSE 0 END'
+        ),
+    },
+}
+
+
+def _expression(vendor, name, row=''):
+    return _EXPRESSIONS[vendor][name].format(row=row, tz=settings.TIME_ZONE)
+
+
+def _upsert(vendor, row, sign):
+    """
+    Statement adding (sign '') or removing (sign '-') one row's contribution
+    """
+    return (
+        f"INSERT INTO {STATS_TABLE} (day, submissions, processed, processing_seconds) "
+        f"VALUES ({_expression(vendor, 'day', row)}, {sign}1, "
+        f"{sign}({_expression(vendor, 'processed', row)}), {sign}({_expression(vendor, 'seconds', row)})) "
+        f"ON CONFLICT (day) DO UPDATE SET "
+        f"submissions = {STATS_TABLE}.submissions + excluded.submissions, "
+        f"processed = {STATS_TABLE}.processed + excluded.processed, "
+        f"processing_seconds = {STATS_TABLE}.processing_seconds + excluded.processing_seconds"
+    )
+
+
+def _changed(old, new):
+    """
+    Trigger condition: a tracked column changed (NULL-safe comparison)
+    """
+    return ' OR '.join(
+        f'{old}{column} IS DISTINCT FROM {new}{column}' for column in TRACKED_COLUMNS
+    )
+
+
+def _pg_delta(rows, sign, where=''):
+    """
+    SELECT of the per-row changes (day, submissions, processed, seconds) that
+    adding (sign '') or removing (sign '-') the rows aliased `rows` makes
+    """
+    row = f'{rows}.'
+    return (
+        f"SELECT {_expression('postgresql', 'day', row)} AS day, {sign}1 AS submissions, "
+        f"{sign}({_expression('postgresql', 'processed', row)}) AS processed, "
+        f"{sign}({_expression('postgresql', 'seconds', row)}) AS processing_seconds {where}"
+    )
+
+
+def _pg_apply(deltas):
+    """
+    Statement adding the rows of the `deltas` SELECTs to their days
+
+    Days are upserted in order so concurrent statements lock them in the
+    same order and cannot deadlock on each other.
+    """
+    return (
+        f"INSERT INTO {STATS_TABLE} (day, submissions, processed, processing_seconds) "
+        f"SELECT day, sum(submissions), sum(processed), sum(processing_seconds) "
+        f"FROM ({' UNION ALL '.join(deltas)}) AS delta GROUP BY day ORDER BY day "
+        f"ON CONFLICT (day) DO UPDATE SET "
+        f"submissions = {STATS_TABLE}.submissions + excluded.submissions, "
+        f"processed = {STATS_TABLE}.processed + excluded.processed, "
+        f"processing_seconds = {STATS_TABLE}.processing_seconds + excluded.processing_seconds"
+    )
+
+
+def _pg_install(cursor):
+    # Only rows whose counted values changed; Django's save() rewrites every
+    # column, and transition tables rule out an UPDATE OF column list
+    changed = f"FROM old_rows o JOIN new_rows n ON n.id = o.id WHERE {_changed('o.', 'n.')}"
+    cursor.execute(f"""
+        CREATE OR REPLACE FUNCTION {PG_FUNCTION}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {_pg_apply([_pg_delta('new_rows', '', 'FROM new_rows')])};
+            ELSIF TG_OP = 'DELETE' THEN
+                {_pg_apply([_pg_delta('old_rows', '-', 'FROM old_rows')])};
+            ELSE
+                {_pg_apply([_pg_delta('o', '-', changed), _pg_delta('n', '', changed)])};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for trigger in PG_TRIGGERS:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {trigger} ON {TABLE}')
+    # A trigger with transition tables handles a single event
+    cursor.execute(f"""
+        CREATE TRIGGER {PG_TRIGGER} AFTER INSERT ON {TABLE}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {PG_FUNCTION}()
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {PG_DELETE_TRIGGER} AFTER DELETE ON {TABLE}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {PG_FUNCTION}()
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {PG_UPDATE_TRIGGER} AFTER UPDATE ON {TABLE}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {PG_FUNCTION}()
+    """)
+
+
+def _pg_uninstall(cursor):
+    for trigger in PG_TRIGGERS:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {trigger} ON {TABLE}')
+    cursor.execute(f'DROP FUNCTION IF EXISTS {PG_FUNCTION}()')
+
+
+def _sqlite_install(cursor):
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_TRIGGER}_ai AFTER INSERT ON {TABLE} BEGIN
+            {_upsert('sqlite', 'new.', '')};
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_TRIGGER}_ad AFTER DELETE ON {TABLE} BEGIN
+            {_upsert('sqlite', 'old.', '-')};
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {SQLITE_TRIGGER}_au
+        AFTER UPDATE OF {', '.join(TRACKED_COLUMNS)} ON {TABLE}
+        WHEN {_changed('old.', 'new.')} BEGIN
+            {_upsert('sqlite', 'old.', '-')};
+            {_upsert('sqlite', 'new.', '')};
+        END
+    """)
+
+
+def _sqlite_uninstall(cursor):
+    for suffix in ('ai', 'ad', 'au'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {SQLITE_TRIGGER}_{suffix}')
+
+
+def rebuild_stats(connection):
+    """
+    Recompute every day from the contacts table
+
+    Runs in one transaction. On PostgreSQL writes to the contacts table wait
+    until the rebuild has committed, so none are counted twice or lost. The
+    archived columns are kept: those contacts are no longer in the table.
+    """
+    vendor = connection.vendor
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            cursor.execute(f'LOCK TABLE {TABLE} IN SHARE MODE')
+        cursor.execute(
+            f'UPDATE {STATS_TABLE} SET submissions = 0, processed = 0, processing_seconds = 0'
+        )
+        if vendor in _EXPRESSIONS:
+            # WHERE true: SQLite needs it to parse an upsert from a SELECT
+            cursor.execute(
+                f"INSERT INTO {STATS_TABLE} (day, submissions, processed, processing_seconds) "
+                f"SELECT {_expression(vendor, 'day')}, count(*), "
+                f"sum({_expression(vendor, 'processed')}), sum({_expression(vendor, 'seconds')}) "
+                f"FROM {TABLE} WHERE true GROUP BY 1 "
+                f"ON CONFLICT (day) DO UPDATE SET "
+                f"submissions = excluded.submissions, processed = excluded.processed, "
+                f"processing_seconds = excluded.processing_seconds"
+            )
+        else:
+            _rebuild_generic(connection, cursor)
+
+
+def _rebuild_generic(connection, cursor):
+    # Backends without the SQL above: accumulate in Python, one pass. Raw
+    # SQL for the writes: migration 0006 runs this before the archived
+    # columns exist.
+    from .models import Contacts
+
+    days = {}
+    rows = Contacts.objects.using(connection.alias).order_by().values_list(*TRACKED_COLUMNS)
+    for created_at, is_processed, processed_at in rows.iterator(chunk_size=2000):
+        day = days.setdefault(
+            stats_day(connection, created_at),
+            {'submissions': 0, 'processed': 0, 'processing_seconds': 0.0}
+        )
+        processed, seconds = contribution(is_processed, created_at, processed_at)
+        day['submissions'] += 1
+        day['processed'] += processed
+        day['processing_seconds'] += seconds
+    for day, values in days.items():
+        params = [values['submissions'], values['processed'], values['processing_seconds'], day]
+        cursor.execute(
+            f'UPDATE {STATS_TABLE} SET submissions = %s, processed = %s, processing_seconds = %s '
+            f'WHERE day = %s',
+            params
+        )
+        if not cursor.rowcount:
+            cursor.execute(
+                f'INSERT INTO {STATS_TABLE} (submissions, processed, processing_seconds, day) '
+                f'VALUES (%s, %s, %s, %s)',
+                params
+            )
+
+
+def stats_day(connection, moment):
+    """
+    Day a contact created at `moment` is counted under on this database
+    """
+    if connection.vendor == 'sqlite':
+        return moment.astimezone(dt_timezone.utc).date()
+    return timezone.localdate(moment)
+
+
+def contribution(is_processed, created_at, processed_at):
+    """
+    (processed, processing seconds) one contact adds to its day
+    """
+    if not is_processed:
+        return 0, 0.0
+    if processed_at is None:
+        return 1, 0.0
+    return 1, (processed_at - created_at).total_seconds()
+
+
+def record_archived(connection, rows, sign=1):
+    """
+    Move contacts between the live and the archived columns of their days
+
+    Called in the transaction that deletes (sign 1) or restores (sign -1) the
+    contacts. On backends with triggers those already adjust the live
+    columns; elsewhere they are adjusted here.
+
+    Args:
+        rows: (created_at, is_processed, processed_at) of each contact
+    """
+    from .models import ContactDailyStats
+
+    days = {}
+    for created_at, is_processed, processed_at in rows:
+        processed, seconds = contribution(is_processed, created_at, processed_at)
+        day = days.setdefault(stats_day(connection, created_at), [0, 0, 0.0])
+        day[0] += 1
+        day[1] += processed
+        day[2] += seconds
+
+    manager = ContactDailyStats.objects.using(connection.alias)
+    for day, (count, processed, seconds) in days.items():
+        manager.get_or_create(day=day)
+        changes = {
+            'archived': F('archived') + sign * count,
+            'archived_processing_seconds': F('archived_processing_seconds') + sign * seconds,
+        }
+        if connection.vendor not in _EXPRESSIONS:
+            changes.update(
+                submissions=F('submissions') - sign * count,
+                processed=F('processed') - sign * processed,
+                processing_seconds=F('processing_seconds') - sign * seconds,
+            )
+        manager.filter(day=day).update(**changes)
+
+
+def install_stats(connection):
+    """
+    Create (or refresh) the triggers maintaining the daily statistics
+
+    Safe to run repeatedly; the table is recomputed from the contacts.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            _pg_install(cursor)
+        elif connection.vendor == 'sqlite':
+            _sqlite_install(cursor)
+    rebuild_stats(connection)
+
+
+def uninstall_stats(connection):
+    """
+    Drop the triggers maintaining the daily statistics
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            _pg_uninstall(cursor)
+        elif connection.vendor == 'sqlite':
+            _sqlite_uninstall(cursor)
+
+
+def stats_installed(connection):
+    """
+    Whether install_stats() has run on this database
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # All three: databases from before 0008 have row-level triggers
+            cursor.execute(
+                'SELECT count(*) = 3 FROM pg_trigger WHERE tgname IN (%s, %s, %s)', list(PG_TRIGGERS)
+            )
+            return bool(cursor.fetchone()[0])
+        elif connection.vendor == 'sqlite':
+            # Migrations that alter contact_contacts rebuild the table on
+            # SQLite, which drops its triggers; check all of them
+            cursor.execute(
+                "SELECT count(*) = 3 FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+                [f'{SQLITE_TRIGGER}_ai', f'{SQLITE_TRIGGER}_ad', f'{SQLITE_TRIGGER}_au']
+            )
+            return bool(cursor.fetchone()[0])
+        else:
+            return True
+        return cursor.fetchone() is not None
@@ -1,14 +1,56 @@
 import pytest
-from django.test import TestCase
+import asyncio
+import os
+import re
+import tempfile
+from io import StringIO
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib import admin as django_admin
+from django.db import connection
+from django.db.models import F
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
+from rest_framework.request import Request
 from rest_framework import status
 from unittest.mock import patch, MagicMock
-from .models import Contacts
+import hashlib
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+import json
+import logging
+import sys
+import threading
+import httpx
+import requests
+import redis
+from requests.adapters import BaseAdapter
+from .models import Contacts, ContactDailyStats, NotificationOutbox
 from .serializers import ContactSerializer, ContactAdminSerializer
 from .views import get_client_ip, get_user_agent
+from .pagination import EstimatedCountPaginator, KeysetPagination
+from .dedup import IN_FLIGHT, KEY_PREFIX as DEDUP_KEY_PREFIX, fingerprint
+from .idempotency import LOCK_PREFIX as IDEMPOTENCY_LOCK_PREFIX
+from .ratelimit import LocalGCRALimiter, RedisGCRALimiter, fallback_cache
+from .archive import (
+    ARCHIVE_FIELDS, archive_contacts, read_shard, restore_contacts, shard_path, shard_paths, _append_shard
+)
+from .timing import StageTimer, stage_histograms, reset_stage_histograms
+from .notifications import (
+    process_outbox, dispatch_notification, retry_delay, build_digest_email, flush_digests,
+    deliver_digest, _run_pooled, DIGEST_FLUSH_LOCK_KEY
+)
+from .recaptcha import (
+    RecaptchaVerifier, AsyncRecaptchaVerifier, get_verifier, verify_recaptcha, CIRCUIT_OPEN
+)
+from .disposable import DisposableDomainIndex, get_disposable_index
+from .spam import SpamRuleEngine, get_spam_engine, _trie_pattern
+from .circuit_breaker import (
+    CircuitBreaker, PERMIT_PROBE, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+)
+from core.log import JSONFormatter, QueueListenerHandler
 
 User = get_user_model()
 
@@ -196,6 +238,15 @@ class ContactSerializerTests(TestCase):
         self.assertFalse(serializer.is_valid())
         self.assertIn('email', serializer.errors)
 
+    def test_disposable_subdomain_rejection(self):
+        """Test that subdomains of disposable domains are rejected"""
+        data = self.valid_data.copy()
+        data['email'] = 'test@sub.Mailinator.com'
+
+        serializer = ContactSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('email', serializer.errors)
+
     def test_message_html_stripping(self):
         """Test that HTML tags are stripped from message"""
         data = self.valid_data.copy()
@@ -268,6 +319,9 @@ class ContactAPITests(APITestCase):
         self.client = APIClient()
         self.contact_url = '/api/contacts/'
 
+        # Throttle history lives in the cache; start every test with a clean slate
+        cache.clear()
+
         # Create admin user
         self.admin_user = User.objects.create_superuser(
             username='admin',
@@ -359,27 +413,37 @@ class ContactAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('errors', response.data)
 
-    @patch('contact.views.send_mail')
-    def test_email_notification_sent(self, mock_send_mail):
-        """Test that email notification is sent on contact creation"""
-        mock_send_mail.return_value = 1
+    @patch('contact.notifications.send_notification_email')
+    def test_email_notification_sent(self, mock_send):
+        """Test that email notification is queued and delivered on contact creation"""
+        mock_send.return_value = True
 
-        response = self.client.post(
-            self.contact_url,
-            self.valid_contact_data,
-            format='json'
-        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                self.contact_url,
+                self.valid_contact_data,
+                format='json'
+            )
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['email_sent'])
+        # Notification dispatch + admin response cache invalidation
+        self.assertEqual(len(callbacks), 2)
 
-        # Verify send_mail was called
-        mock_send_mail.assert_called_once()
+        # Notification is queued in the outbox, not sent on the request thread
+        notification = NotificationOutbox.objects.get()
+        self.assertEqual(notification.status, NotificationOutbox.STATUS_PENDING)
+        mock_send.assert_not_called()
 
-    @patch('contact.views.send_mail')
-    def test_email_failure_does_not_break_submission(self, mock_send_mail):
+        self.assertEqual(process_outbox(), 1)
+        mock_send.assert_called_once()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, NotificationOutbox.STATUS_SENT)
+
+    @patch('contact.notifications.send_notification_email')
+    def test_email_failure_does_not_break_submission(self, mock_send):
         """Test that contact is still created even if email fails"""
-        mock_send_mail.side_effect = Exception('Email server down')
+        mock_send.side_effect = Exception('Email server down')
 
         response = self.client.post(
             self.contact_url,
@@ -389,9 +453,16 @@ class ContactAPITests(APITestCase):
 
         # Contact should still be created
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertFalse(response.data['email_sent'])
         self.assertEqual(Contacts.objects.count(), 1)
 
+        # Failed delivery is kept in the outbox for a later retry
+        self.assertEqual(process_outbox(), 0)
+        notification = NotificationOutbox.objects.get()
+        self.assertEqual(notification.status, NotificationOutbox.STATUS_PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn('Email server down', notification.last_error)
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+
     def test_list_contacts_requires_admin(self):
         """Test that listing contacts requires admin authentication"""
         # Create a contact first
@@ -462,8 +533,8 @@ class ContactAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Should only return unprocessed contact
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['email'], 'apitest@example.com')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['email'], 'apitest@example.com')
 
     def test_admin_serializer_includes_extra_fields(self):
         """Test that admin serializer includes IP and user agent"""
@@ -531,3 +602,2016 @@ class UtilityFunctionTests(TestCase):
 
         user_agent = get_user_agent(request)
         self.assertEqual(user_agent, '')
+
+
+@override_settings(NOTIFICATION_MAX_ATTEMPTS=3, NOTIFICATION_WORKERS=0)
+class NotificationOutboxTests(TestCase):
+    """Test cases for the notification outbox"""
+
+    def setUp(self):
+        """Set up a contact with a queued notification"""
+        self.contact = Contacts.objects.create(
+            name='Outbox User',
+            email='outbox@example.com',
+            message='A message waiting for a notification.'
+        )
+        self.notification = NotificationOutbox.objects.create(contact=self.contact)
+
+    @patch('contact.notifications.send_notification_email')
+    def test_failed_delivery_is_marked_failed_after_max_attempts(self, mock_send):
+        """Test that delivery gives up after the configured number of attempts"""
+        mock_send.side_effect = Exception('Provider unavailable')
+
+        for _ in range(3):
+            NotificationOutbox.objects.filter(pk=self.notification.pk).update(
+                next_attempt_at=timezone.now()
+            )
+            process_outbox()
+
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, NotificationOutbox.STATUS_FAILED)
+        self.assertEqual(self.notification.attempts, 3)
+        self.assertEqual(mock_send.call_count, 3)
+
+    @patch('contact.notifications.send_notification_email')
+    def test_notifications_not_due_are_skipped(self, mock_send):
+        """Test that rescheduled notifications wait for their backoff"""
+        NotificationOutbox.objects.filter(pk=self.notification.pk).update(
+            next_attempt_at=timezone.now() + retry_delay(1)
+        )
+
+        self.assertEqual(process_outbox(), 0)
+        mock_send.assert_not_called()
+
+    def test_retry_delay_backs_off_exponentially(self):
+        """Test exponential backoff with an upper bound"""
+        self.assertEqual(retry_delay(1).total_seconds(), 30)
+        self.assertEqual(retry_delay(2).total_seconds(), 60)
+        self.assertEqual(retry_delay(3).total_seconds(), 120)
+        self.assertEqual(retry_delay(50).total_seconds(), 3600)
+
+    def test_dispatch_disabled_leaves_notification_queued(self):
+        """Test that disabling the pool leaves delivery to the worker command"""
+        self.assertFalse(dispatch_notification(self.notification.pk))
+
+    @patch('contact.notifications.send_notification_email')
+    def test_process_notifications_command(self, mock_send):
+        """Test the outbox worker management command"""
+        call_command('process_notifications', '--once', stdout=StringIO())
+
+        mock_send.assert_called_once()
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, NotificationOutbox.STATUS_SENT)
+        self.assertIsNotNone(self.notification.sent_at)
+
+
+@override_settings(
+    NOTIFICATION_MODE='digest', NOTIFICATION_DIGEST_MAX_SIZE=3,
+    NOTIFICATION_DIGEST_INTERVAL_SECONDS=600, NOTIFICATION_MAX_ATTEMPTS=3, NOTIFICATION_WORKERS=0
+)
+class NotificationDigestTests(TestCase):
+    """Test cases for digest notifications"""
+
+    def _queue(self, count, age=timedelta(0)):
+        notifications = []
+        for i in range(count):
+            contact = Contacts.objects.create(
+                name=f'Digest User {i}', email=f'digest{i}@example.com',
+                message='A message waiting for a digest email.'
+            )
+            notifications.append(NotificationOutbox.objects.create(contact=contact))
+        NotificationOutbox.objects.filter(pk__in=[n.pk for n in notifications]).update(
+            created_at=timezone.now() - age
+        )
+        return notifications
+
+    @patch('contact.notifications.send_notification_email')
+    @patch('contact.notifications.send_digest_email')
+    def test_partial_batch_waits_for_interval(self, mock_digest, mock_send):
+        """Test that a small batch is held until its oldest entry has waited"""
+        self._queue(2)
+
+        self.assertEqual(process_outbox(), 0)
+        mock_digest.assert_not_called()
+
+        NotificationOutbox.objects.update(created_at=timezone.now() - timedelta(minutes=11))
+        self.assertEqual(process_outbox(), 2)
+
+        mock_digest.assert_called_once()
+        self.assertEqual(len(mock_digest.call_args[0][0]), 2)
+        mock_send.assert_not_called()
+        self.assertFalse(NotificationOutbox.objects.exclude(status=NotificationOutbox.STATUS_SENT).exists())
+
+    @patch('contact.notifications.send_digest_email')
+    def test_full_batches_sent_immediately(self, mock_digest):
+        """Test that full batches go out at once, one email per batch"""
+        self._queue(7)
+
+        self.assertEqual(flush_digests(), 6)
+
+        self.assertEqual(mock_digest.call_count, 2)
+        self.assertEqual(
+            NotificationOutbox.objects.filter(status=NotificationOutbox.STATUS_PENDING).count(), 1
+        )
+
+    @patch('contact.notifications.send_notification_email')
+    def test_single_notification_uses_regular_email(self, mock_send):
+        """Test that a lone overdue notification is sent on its own"""
+        self._queue(1, age=timedelta(hours=1))
+
+        self.assertEqual(process_outbox(), 1)
+        mock_send.assert_called_once()
+
+    @patch('contact.notifications.send_digest_email')
+    def test_failed_digest_reschedules_every_entry(self, mock_digest):
+        """Test that a failed digest puts its notifications back with backoff"""
+        mock_digest.side_effect = Exception('Rate limited')
+        self._queue(3)
+
+        self.assertEqual(flush_digests(), 0)
+
+        for notification in NotificationOutbox.objects.all():
+            self.assertEqual(notification.status, NotificationOutbox.STATUS_PENDING)
+            self.assertEqual(notification.attempts, 1)
+            self.assertGreater(notification.next_attempt_at, timezone.now())
+            self.assertEqual(notification.last_error, 'Rate limited')
+
+    @override_settings(NOTIFICATION_WORKERS=1)
+    @patch('contact.notifications._get_executor')
+    def test_dispatch_leaves_batch_check_to_pool(self, mock_executor):
+        """Test that dispatch queries nothing and hands a flush to the pool"""
+        notifications = self._queue(2)
+
+        with patch('contact.notifications._slots', threading.BoundedSemaphore(1)):
+            with self.assertNumQueries(0):
+                self.assertTrue(dispatch_notification(notifications[-1].pk))
+
+        mock_executor.return_value.submit.assert_called_once_with(
+            _run_pooled, flush_digests, 3
+        )
+
+    @patch('contact.notifications.send_digest_email')
+    def test_flush_skipped_while_another_runs(self, mock_digest):
+        """Test that only one flush at a time claims batches"""
+        self._queue(3)
+        cache.add(DIGEST_FLUSH_LOCK_KEY, 'other-flush')
+        self.addCleanup(cache.delete, DIGEST_FLUSH_LOCK_KEY)
+
+        self.assertEqual(flush_digests(), 0)
+        mock_digest.assert_not_called()
+
+        cache.delete(DIGEST_FLUSH_LOCK_KEY)
+        self.assertEqual(flush_digests(), 3)
+        self.assertIsNone(cache.get(DIGEST_FLUSH_LOCK_KEY))
+
+    @patch('contact.notifications.send_digest_email')
+    def test_digest_leaves_out_entries_claimed_elsewhere(self, mock_digest):
+        """Test that a batch is claimed in one UPDATE, skipping leased entries"""
+        notifications = self._queue(3)
+        NotificationOutbox.objects.filter(pk=notifications[0].pk).update(
+            next_attempt_at=timezone.now() + timedelta(minutes=2)
+        )
+
+        self.assertEqual(deliver_digest([n.pk for n in notifications]), 2)
+
+        self.assertEqual(
+            [contact.pk for contact in mock_digest.call_args[0][0]],
+            [n.contact.pk for n in notifications[1:]]
+        )
+        self.assertEqual(
+            NotificationOutbox.objects.get(pk=notifications[0].pk).status, NotificationOutbox.STATUS_PENDING
+        )
+
+    def test_digest_email_lists_every_contact(self):
+        """Test the digest subject and body"""
+        contacts = [n.contact for n in self._queue(2)]
+
+        subject, message = build_digest_email(contacts)
+
+        self.assertIn('2 New Contacts', subject)
+        for contact in contacts:
+            self.assertIn(contact.email, message)
+            self.assertIn(f'/admin/contact/contacts/{contact.id}/', message)
+
+
+class StubTransport(BaseAdapter):
+    """Requests adapter answering siteverify calls without the network"""
+
+    def __init__(self, payload=None, error=None):
+        super().__init__()
+        self.payload = payload or {'success': True, 'score': 0.9}
+        self.error = error
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append((request, kwargs))
+        if self.error:
+            raise self.error
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(self.payload).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class RecaptchaVerifierTests(TestCase):
+    """Test cases for the pooled reCAPTCHA verifier"""
+
+    def setUp(self):
+        """Start with a closed circuit breaker"""
+        cache.clear()
+
+    def test_verify_success_through_transport(self):
+        """Test verification against a pluggable transport"""
+        transport = StubTransport({'success': True, 'score': 0.8})
+        verifier = RecaptchaVerifier(
+            secret_key='secret',
+            verify_url='http://stub.local/siteverify',
+            transport=transport
+        )
+
+        self.assertEqual(verifier.verify('token', '203.0.113.1'), (True, 0.8, []))
+
+        request, kwargs = transport.requests[0]
+        self.assertEqual(request.url, 'http://stub.local/siteverify')
+        self.assertIn('remoteip=203.0.113.1', request.body)
+        self.assertEqual(kwargs['timeout'], (2.0, 3.0))
+
+    def test_session_is_reused_between_calls(self):
+        """Test that one session serves every verification"""
+        transport = StubTransport()
+        verifier = RecaptchaVerifier(secret_key='secret', transport=transport)
+
+        verifier.verify('first')
+        verifier.verify('second')
+
+        self.assertEqual(len(transport.requests), 2)
+        self.assertIs(verifier.session.get_adapter(verifier.verify_url), transport)
+
+    def test_network_error_fails_closed(self):
+        """Test that transport errors reject the token"""
+        transport = StubTransport(error=requests.ConnectionError('unreachable'))
+        verifier = RecaptchaVerifier(secret_key='secret', transport=transport)
+
+        self.assertEqual(verifier.verify('token'), (False, 0.0, ['network-error']))
+
+    def test_missing_token_rejected_without_request(self):
+        """Test that an empty token never reaches the transport"""
+        transport = StubTransport()
+        verifier = RecaptchaVerifier(secret_key='secret', transport=transport)
+
+        self.assertEqual(verifier.verify(''), (False, 0.0, ['missing-input-response']))
+        self.assertEqual(transport.requests, [])
+
+    @override_settings(RECAPTCHA_SECRET_KEY='')
+    def test_unconfigured_secret_skips_verification(self):
+        """Test that verification is skipped when no secret is configured"""
+        self.assertEqual(verify_recaptcha('token'), (True, 1.0, []))
+
+    def test_shared_verifier_rebuilt_on_setting_change(self):
+        """Test that the per-process verifier follows settings overrides"""
+        verifier = get_verifier()
+        self.assertIs(get_verifier(), verifier)
+
+        with override_settings(RECAPTCHA_VERIFY_URL='http://127.0.0.1:9/siteverify', RECAPTCHA_POOL_SIZE=4):
+            stubbed = get_verifier()
+            self.assertIsNot(stubbed, verifier)
+            self.assertEqual(stubbed.verify_url, 'http://127.0.0.1:9/siteverify')
+            self.assertEqual(stubbed.pool_size, 4)
+
+
+class CircuitBreakerTests(TestCase):
+    """Test cases for the cache-backed circuit breaker"""
+
+    def setUp(self):
+        """Create a breaker that opens after two failures"""
+        cache.clear()
+        self.breaker = CircuitBreaker('test', failure_threshold=2, failure_window=60, reset_timeout=30)
+
+    def test_opens_after_threshold(self):
+        """Test that the breaker opens once failures reach the threshold"""
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow_request())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_open_state_is_shared_through_cache(self):
+        """Test that another worker's breaker sees the open state"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        other_worker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+        self.assertEqual(other_worker.state, STATE_OPEN)
+        self.assertFalse(other_worker.allow_request())
+
+    def test_half_open_allows_single_probe(self):
+        """Test that only one probe goes through after the reset timeout"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        with patch('contact.circuit_breaker.time.time', return_value=timezone.now().timestamp() + 31):
+            self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+            permit = self.breaker.allow_request()
+            self.assertEqual(permit, PERMIT_PROBE)
+
+            other_worker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+            self.assertIsNone(other_worker.allow_request())
+
+            self.breaker.record_success(permit)
+            self.assertEqual(self.breaker.state, STATE_CLOSED)
+            self.assertEqual(other_worker.state, STATE_CLOSED)
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe re-opens the breaker"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        with patch('contact.circuit_breaker.time.time', return_value=timezone.now().timestamp() + 31):
+            permit = self.breaker.allow_request()
+            self.breaker.record_failure(permit)
+            self.assertEqual(self.breaker.state, STATE_OPEN)
+
+    async def test_probe_survives_interleaved_callers(self):
+        """Test that callers rejected during an async probe do not lose it"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        release = asyncio.Event()
+        calls = []
+
+        async def siteverify(request):
+            calls.append(request)
+            await release.wait()
+            return httpx.Response(200, json={'success': True, 'score': 0.9})
+
+        verifier = AsyncRecaptchaVerifier(
+            secret_key='secret', transport=httpx.MockTransport(siteverify), breaker=self.breaker
+        )
+        with patch('contact.circuit_breaker.time.time', return_value=timezone.now().timestamp() + 31):
+            probe = asyncio.ensure_future(verifier.verify('probe'))
+            while not calls:
+                await asyncio.sleep(0)
+            # Same thread, while the probe is in flight
+            self.assertEqual(await verifier.verify('other'), (False, 0.0, [CIRCUIT_OPEN]))
+            release.set()
+            self.assertEqual(await probe, (True, 0.9, []))
+
+            self.assertEqual(self.breaker.state, STATE_CLOSED)
+            self.assertEqual(len(calls), 1)
+        await verifier.aclose()
+
+    def test_open_breaker_skips_transport(self):
+        """Test that an open breaker fails fast without calling siteverify"""
+        transport = StubTransport(error=requests.Timeout('slow'))
+        verifier = RecaptchaVerifier(secret_key='secret', transport=transport, breaker=self.breaker)
+
+        verifier.verify('one')
+        verifier.verify('two')
+        self.assertEqual(len(transport.requests), 2)
+
+        self.assertEqual(verifier.verify('three'), (False, 0.0, [CIRCUIT_OPEN]))
+        self.assertEqual(len(transport.requests), 2)
+        self.assertEqual(self.breaker.snapshot()['state'], STATE_OPEN)
+
+
+class RecaptchaDegradedPolicyTests(APITestCase):
+    """Test cases for contact submissions while the reCAPTCHA breaker is open"""
+
+    def setUp(self):
+        """Open the shared breaker"""
+        cache.clear()
+        self.data = {
+            'name': 'Degraded User',
+            'email': 'degraded@example.com',
+            'message': 'Submitted while reCAPTCHA was unavailable.',
+            'recaptcha_token': 'token'
+        }
+
+    def _open_breaker(self):
+        breaker = get_verifier().breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+    @override_settings(RECAPTCHA_SECRET_KEY='secret', RECAPTCHA_DEGRADED_POLICY='reject')
+    def test_reject_policy_returns_503(self):
+        """Test that the reject policy refuses submissions while open"""
+        self._open_breaker()
+
+        response = self.client.post('/api/contacts/', self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Contacts.objects.count(), 0)
+
+    @override_settings(RECAPTCHA_SECRET_KEY='secret', RECAPTCHA_DEGRADED_POLICY='accept')
+    def test_accept_policy_flags_contact(self):
+        """Test that the accept policy saves and flags submissions while open"""
+        self._open_breaker()
+
+        response = self.client.post('/api/contacts/', self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Contacts.objects.get().recaptcha_degraded)
+
+
+class AsyncContactCreateTests(TestCase):
+    """Test cases for the async contact submission endpoint"""
+
+    url = '/api/contacts/async/'
+
+    def setUp(self):
+        """Set up valid submission data"""
+        cache.clear()
+        self.valid_contact_data = {
+            'name': 'Async User',
+            'email': 'async@example.com',
+            'message': 'Submitted through the ASGI code path.'
+        }
+
+    async def test_create_contact(self):
+        """Test that the async endpoint saves the contact and queues a notification"""
+        response = await self.async_client.post(
+            self.url,
+            self.valid_contact_data,
+            content_type='application/json',
+            headers={'user-agent': 'Async Test Browser'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        body = response.json()
+        self.assertEqual(body['data']['email'], 'async@example.com')
+
+        contact = await Contacts.objects.aget(pk=body['data']['id'])
+        self.assertEqual(contact.user_agent, 'Async Test Browser')
+        self.assertTrue(await NotificationOutbox.objects.filter(contact=contact).aexists())
+
+    async def test_invalid_data_rejected(self):
+        """Test that serializer validation errors are returned"""
+        response = await self.async_client.post(
+            self.url,
+            {'name': 'A', 'email': 'invalid', 'message': 'Short'},
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('errors', response.json())
+        self.assertFalse(await Contacts.objects.aexists())
+
+    async def test_malformed_json_rejected(self):
+        """Test that a malformed body returns 400"""
+        response = await self.async_client.post(
+            self.url, 'not json', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_get_not_allowed(self):
+        """Test that only POST is accepted"""
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+    async def test_throttled_after_rate_limit(self):
+        """Test that the contact throttle applies to the async endpoint"""
+        for _ in range(3):
+            await self.async_client.post(
+                self.url, self.valid_contact_data, content_type='application/json'
+            )
+
+        response = await self.async_client.post(
+            self.url, self.valid_contact_data, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(RECAPTCHA_SECRET_KEY='secret')
+    async def test_low_recaptcha_score_rejected(self):
+        """Test that reCAPTCHA rules match the sync endpoint"""
+        with patch('contact.async_views.averify_recaptcha', return_value=(True, 0.1, [])):
+            response = await self.async_client.post(
+                self.url,
+                {**self.valid_contact_data, 'recaptcha_token': 'token'},
+                content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['message'], 'Suspicious activity detected')
+
+
+class AsyncRecaptchaVerifierTests(TestCase):
+    """Test cases for the httpx-based reCAPTCHA verifier"""
+
+    def setUp(self):
+        """Start with a closed circuit breaker"""
+        cache.clear()
+
+    async def test_verify_through_mock_transport(self):
+        """Test async verification against a pluggable transport"""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={'success': True, 'score': 0.7})
+
+        verifier = AsyncRecaptchaVerifier(
+            secret_key='secret',
+            verify_url='http://stub.local/siteverify',
+            transport=httpx.MockTransport(handler)
+        )
+
+        self.assertEqual(await verifier.verify('token', '203.0.113.9'), (True, 0.7, []))
+        self.assertIn(b'remoteip=203.0.113.9', seen[0].content)
+        await verifier.aclose()
+
+    async def test_network_error_fails_closed(self):
+        """Test that transport errors reject the token"""
+        def handler(request):
+            raise httpx.ConnectError('unreachable')
+
+        verifier = AsyncRecaptchaVerifier(secret_key='secret', transport=httpx.MockTransport(handler))
+
+        self.assertEqual(await verifier.verify('token'), (False, 0.0, ['network-error']))
+        await verifier.aclose()
+
+
+class SpamRuleEngineTests(TestCase):
+    """Test cases for the precompiled spam rule engine"""
+
+    def test_default_rules_report_matching_rule(self):
+        """Test that the built-in rules match and name the rule"""
+        engine = get_spam_engine()
+
+        self.assertEqual(engine.match('Win the LOTTERY today').rule, 'spam-keywords')
+        self.assertEqual(engine.match('Pay $$$ now please').rule, 'excessive-symbols')
+        self.assertEqual(engine.match('See https://' + 'a' * 60).rule, 'long-url')
+        self.assertIsNone(engine.match('I would like a quote for a new website.'))
+
+    def test_keyword_trie_matches_every_keyword(self):
+        """Test that the trie alternation matches exactly the given keywords"""
+        words = ['cash', 'cash prize', 'casino', 'crypto', 'c']
+        regex = re.compile(_trie_pattern(words))
+
+        for word in words:
+            self.assertEqual(regex.fullmatch(word).group(), word)
+        self.assertIsNone(regex.fullmatch('cas'))
+
+    def test_keywords_map_back_to_their_rule(self):
+        """Test that keyword hits report the rule that owns the keyword"""
+        engine = SpamRuleEngine([
+            {'name': 'pharma', 'keywords': ['viagra', 'cialis']},
+            {'name': 'finance', 'keywords': ['crypto', 'forex']},
+        ])
+
+        self.assertEqual(engine.match('cheap Forex signals').rule, 'finance')
+        self.assertEqual(engine.match('cheap Forex signals').text, 'Forex')
+        self.assertEqual(engine.match('buy cialis').rule, 'pharma')
+
+    def test_case_folded_keywords_match_their_rule(self):
+        """Test that non-ASCII case-insensitive hits still name their rule"""
+        engine = SpamRuleEngine([
+            {'name': 'pharma', 'keywords': ['viagra', 'cialis']},
+            {'name': 'finance', 'keywords': ['crypto', 'cialis']},
+        ])
+
+        # Long s and dotted capital I do not lower-case back to the keyword
+        self.assertEqual(engine.match('buy cialiſ now'), ('pharma', 'cialiſ'))
+        self.assertEqual(engine.match('cheap VİAGRA'), ('pharma', 'VİAGRA'))
+
+    def test_invalid_rules_rejected(self):
+        """Test that malformed rules fail to compile"""
+        with self.assertRaises(ValueError):
+            SpamRuleEngine([{'name': 'broken', 'pattern': '(unclosed'}])
+        with self.assertRaises(ValueError):
+            SpamRuleEngine([{'name': 'named', 'pattern': '(?P<x>a)'}])
+        with self.assertRaises(ValueError):
+            SpamRuleEngine([{'name': 'both', 'pattern': 'a', 'keywords': ['b']}])
+
+    def test_rules_file_hot_reload(self):
+        """Test that a changed rules file is picked up without a restart"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rules.json')
+            with open(path, 'w') as f:
+                json.dump([{'name': 'first', 'keywords': ['alpha']}], f)
+
+            with override_settings(SPAM_RULES_FILE=path, SPAM_RULES_CHECK_INTERVAL=0):
+                self.assertEqual(get_spam_engine().match('alpha').rule, 'first')
+
+                with open(path, 'w') as f:
+                    json.dump([{'name': 'second', 'keywords': ['beta']}], f)
+                os.utime(path, ns=(1, os.stat(path).st_mtime_ns + 1_000_000))
+
+                engine = get_spam_engine()
+                self.assertIsNone(engine.match('alpha'))
+                self.assertEqual(engine.match('beta').rule, 'second')
+
+                # A broken file keeps the last good rule set
+                with open(path, 'w') as f:
+                    f.write('not json')
+                os.utime(path, ns=(1, os.stat(path).st_mtime_ns + 2_000_000))
+                self.assertEqual(get_spam_engine().match('beta').rule, 'second')
+
+    def test_serializer_uses_rules_file(self):
+        """Test that message validation uses the loaded rules"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rules.json')
+            with open(path, 'w') as f:
+                json.dump([{'name': 'seo-spam', 'keywords': ['guaranteed first page']}], f)
+
+            with override_settings(SPAM_RULES_FILE=path):
+                serializer = ContactSerializer(data={
+                    'name': 'Jane Smith',
+                    'email': 'jane@example.com',
+                    'message': 'We offer Guaranteed First Page rankings for your site.'
+                })
+                self.assertFalse(serializer.is_valid())
+                self.assertIn('message', serializer.errors)
+
+
+class DisposableDomainIndexTests(TestCase):
+    """Test cases for the disposable email domain index"""
+
+    def test_matches_domain_and_subdomains(self):
+        """Test suffix matching on label boundaries"""
+        index = DisposableDomainIndex(['mailinator.com', '# comment', '', 'Temp-Mail.org.'])
+
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.match('mailinator.com'), 'mailinator.com')
+        self.assertEqual(index.match('a.b.MAILINATOR.com'), 'mailinator.com')
+        self.assertIn('temp-mail.org', index)
+        self.assertNotIn('notmailinator.com', index)
+        self.assertNotIn('example.com', index)
+        self.assertNotIn('com', index)
+
+    def test_blocklist_file_reload(self):
+        """Test that a changed blocklist replaces the index atomically"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'disposable.conf')
+            with open(path, 'w') as f:
+                f.write('first-disposable.com\n')
+
+            with override_settings(DISPOSABLE_DOMAINS_FILE=path, DISPOSABLE_DOMAINS_CHECK_INTERVAL=0):
+                old_index = get_disposable_index()
+                self.assertIn('x.first-disposable.com', old_index)
+
+                with open(path, 'w') as f:
+                    f.write('second-disposable.com\n')
+                os.utime(path, ns=(1, os.stat(path).st_mtime_ns + 1_000_000))
+
+                new_index = get_disposable_index()
+                self.assertIsNot(new_index, old_index)
+                self.assertIn('second-disposable.com', new_index)
+                self.assertNotIn('first-disposable.com', new_index)
+                # The previous index is left untouched for in-flight lookups
+                self.assertIn('first-disposable.com', old_index)
+
+    def test_missing_file_falls_back_to_builtin_list(self):
+        """Test that an unreadable blocklist keeps validation working"""
+        with override_settings(DISPOSABLE_DOMAINS_FILE='/nonexistent/disposable.conf'):
+            self.assertIn('mailinator.com', get_disposable_index())
+
+
+class ContactBulkImportTests(APITestCase):
+    """Test cases for the admin bulk import endpoint"""
+
+    url = '/api/contacts/bulk/'
+
+    def setUp(self):
+        """Authenticate as admin"""
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def _row(self, index):
+        return {
+            'name': 'Lead Person',
+            'email': f'lead{index}@example.com',
+            'message': f'Imported lead number {index} from the partner form.'
+        }
+
+    @override_settings(CONTACT_BULK_BATCH_SIZE=2)
+    def test_json_import_in_batches(self):
+        """Test that valid JSON rows are inserted in chunks"""
+        rows = [self._row(i) for i in range(5)]
+
+        with self.assertNumQueries(3 * 3):  # SAVEPOINT + INSERT + RELEASE per chunk
+            response = self.client.post(self.url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual(Contacts.objects.count(), 5)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_ndjson_import_reports_row_errors(self):
+        """Test that NDJSON is accepted and invalid rows are reported by index"""
+        rows = [self._row(0), {'name': 'A', 'email': 'bad', 'message': 'Short'}, self._row(2)]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n'
+
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('email', response.data['errors'][0]['errors'])
+        self.assertEqual(Contacts.objects.count(), 2)
+
+    def test_malformed_ndjson_rejected(self):
+        """Test that a malformed NDJSON line fails the request"""
+        body = json.dumps(self._row(0)) + '\n{not json\n'
+
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('line 2', response.data['detail'])
+
+    @override_settings(CONTACT_BULK_MAX_ROWS=2)
+    def test_row_limit(self):
+        """Test that oversized imports are refused"""
+        response = self.client.post(self.url, [self._row(i) for i in range(3)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_bulk_import_requires_admin(self):
+        """Test that non-admin users cannot import"""
+        user = User.objects.create_user(username='staffless', password='userpass123')
+        self.client.force_authenticate(user=user)
+
+        response = self.client.post(self.url, [self._row(0)], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Contacts.objects.exists())
+
+
+class ContactBulkProcessTests(APITestCase):
+    """Test cases for set-based bulk processing"""
+
+    url = '/api/contacts/bulk_mark_processed/'
+
+    def setUp(self):
+        """Create contacts and authenticate as admin"""
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        Contacts.objects.bulk_create([
+            Contacts(
+                name='Lead Person',
+                email=f'lead{i}@example.com',
+                message='Please get back to me about pricing.'
+            )
+            for i in range(5)
+        ])
+        self.ids = list(Contacts.objects.order_by('pk').values_list('pk', flat=True))
+
+    def test_queryset_chunked_update_shares_timestamp(self):
+        """Test that chunked updates touch every row with one timestamp"""
+        Contacts.objects.filter(pk=self.ids[0]).update(is_processed=True)
+
+        with self.assertNumQueries(2 * 2 + 1):  # SELECT + UPDATE per chunk, final empty SELECT
+            count, processed_at = Contacts.objects.all().mark_as_processed(chunk_size=2)
+
+        self.assertEqual(count, 4)
+        stamps = set(
+            Contacts.objects.exclude(pk=self.ids[0]).values_list('processed_at', flat=True)
+        )
+        self.assertEqual(stamps, {processed_at})
+
+    def test_bulk_mark_processed_by_ids(self):
+        """Test marking a list of IDs as processed"""
+        response = self.client.post(self.url, {'ids': self.ids[:3]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(Contacts.objects.filter(is_processed=True).count(), 3)
+
+    def test_bulk_mark_processed_by_filter(self):
+        """Test marking contacts matching a filter as processed"""
+        response = self.client.post(
+            self.url, {'filter': {'email': 'LEAD4@example.com'}}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertTrue(Contacts.objects.get(email='lead4@example.com').is_processed)
+
+    def test_bulk_mark_processed_requires_selection(self):
+        """Test that an empty selection is rejected instead of updating everything"""
+        for body in ({}, {'filter': {}}, {'ids': [1], 'filter': {'email': 'a@example.com'}}):
+            response = self.client.post(self.url, body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Contacts.objects.filter(is_processed=True).exists())
+
+    def test_admin_action_uses_single_update(self):
+        """Test that the admin bulk action does not save rows one by one"""
+        self.client.force_login(self.admin_user)
+
+        with patch.object(Contacts, 'save') as save:
+            response = self.client.post('/admin/contact/contacts/', {
+                'action': 'mark_as_processed',
+                '_selected_action': self.ids,
+            })
+
+        self.assertEqual(response.status_code, 302)
+        save.assert_not_called()
+        self.assertEqual(Contacts.objects.filter(is_processed=True).count(), 5)
+
+
+class KeysetPaginationTests(APITestCase):
+    """Test cases for cursor pagination of contact listings"""
+
+    def setUp(self):
+        """Create contacts sharing timestamps and authenticate as admin"""
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        cache.clear()
+        Contacts.objects.bulk_create([
+            Contacts(
+                name='Lead Person',
+                email=f'lead{i}@example.com',
+                message='Please get back to me about pricing.',
+                is_processed=i % 2 == 0
+            )
+            for i in range(7)
+        ])
+        # Force ties on created_at so ordering relies on the id tie-breaker
+        stamp = timezone.now()
+        Contacts.objects.update(created_at=stamp)
+        Contacts.objects.filter(email='lead6@example.com').update(
+            created_at=stamp + timezone.timedelta(seconds=1)
+        )
+
+    def _collect(self, url):
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_list_walks_every_row_once(self):
+        """Test that following next links returns each contact once in order"""
+        ids, pages = self._collect('/api/contacts/?page_size=3')
+
+        expected = list(
+            Contacts.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_inserts_do_not_shift_pages(self):
+        """Test that rows created while paging do not duplicate later results"""
+        response = self.client.get('/api/contacts/?page_size=3')
+        first = [row['id'] for row in response.data['results']]
+
+        Contacts.objects.create(
+            name='New Lead', email='new@example.com', message='Arrived while paging.'
+        )
+        rest, _ = self._collect(response.data['next'])
+
+        self.assertEqual(len(set(first) | set(rest)), 7)
+        self.assertFalse(set(first) & set(rest))
+
+    def test_unprocessed_is_paginated(self):
+        """Test that the unprocessed action pages through the backlog"""
+        ids, pages = self._collect('/api/contacts/unprocessed/?page_size=2')
+
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(pages, 2)
+        self.assertFalse(Contacts.objects.filter(id__in=ids, is_processed=True).exists())
+
+    def test_invalid_cursor(self):
+        """Test that a tampered cursor is rejected"""
+        response = self.client.get('/api/contacts/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ContactIndexTests(TestCase):
+    """Query-plan checks for the unprocessed inbox indexes"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        Contacts.objects.bulk_create([
+            Contacts(
+                name='Lead Person',
+                email=f'lead{i}@example.com',
+                message='Please get back to me about pricing.',
+                is_processed=i % 4 != 0
+            )
+            for i in range(200)
+        ])
+
+    def _plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_unprocessed_action_uses_partial_index(self):
+        """Test that the unprocessed page query is served by the partial index"""
+
+        # Build the page query exactly as the unprocessed action does
+        paginator = KeysetPagination()
+        request = Request(RequestFactory().get('/api/contacts/unprocessed/'))
+        paginator.request = request
+        queryset = Contacts.objects.filter(is_processed=False).order_by(*paginator.ordering)
+
+        plan = self._plan(queryset[:paginator.get_page_size(request) + 1])
+
+        self.assertIn('contact_unprocessed_idx', plan)
+
+    def test_admin_unprocessed_filter_uses_partial_index(self):
+        """Test that the admin changelist filtered to pending rows uses the partial index"""
+
+        request = RequestFactory().get('/admin/contact/contacts/', {'is_processed__exact': '0'})
+        request.user = self.admin_user
+        changelist = django_admin.site._registry[Contacts].get_changelist_instance(request)
+
+        plan = self._plan(changelist.get_queryset(request)[:changelist.list_per_page])
+
+        self.assertIn('contact_unprocessed_idx', plan)
+
+
+class ContactExportTests(APITestCase):
+    """Test cases for the streaming contact export"""
+
+    url = '/api/contacts/export/'
+
+    def setUp(self):
+        """Create contacts and authenticate as admin"""
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.pending = Contacts.objects.create(
+            name='Pending Lead', email='pending@example.com',
+            message='=HYPERLINK("http://evil.example")'
+        )
+        self.done = Contacts.objects.create(
+            name='Done Lead', email='done@example.com',
+            message='Already handled, thanks.', is_processed=True
+        )
+
+    def _body(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_streams_all_rows(self):
+        """Test that the CSV export streams a header and every contact"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        lines = self._body(response).splitlines()
+        self.assertTrue(lines[0].startswith('id,name,email,message'))
+        self.assertEqual(len(lines), 3)
+        # Formula-looking cells are neutralised
+        self.assertIn("'=HYPERLINK", lines[1])
+
+    def test_ndjson_export_with_filters(self):
+        """Test NDJSON export filtered by processed state and date range"""
+        response = self.client.get(self.url, {
+            'export_format': 'ndjson',
+            'is_processed': 'false',
+            'created_after': (timezone.now() - timezone.timedelta(hours=1)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in self._body(response).splitlines()]
+        self.assertEqual([row['email'] for row in rows], ['pending@example.com'])
+        self.assertFalse(rows[0]['is_processed'])
+
+    def test_export_rejects_bad_parameters(self):
+        """Test that unknown formats and invalid filters return 400"""
+        self.assertEqual(
+            self.client.get(self.url, {'export_format': 'xlsx'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get(self.url, {'created_after': 'yesterday'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_export_admin_only(self):
+        """Test that anonymous users cannot export"""
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_action_streams_selection(self):
+        """Test the admin export action on selected contacts"""
+        self.client.force_login(self.admin_user)
+
+        response = self.client.post('/admin/contact/contacts/', {
+            'action': 'export_as_ndjson',
+            '_selected_action': [self.done.pk],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in self._body(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.done.pk])
+
+
+class GCRARateLimiterTests(TestCase):
+    """Test cases for the GCRA submission rate limiter"""
+
+    def setUp(self):
+        cache.clear()
+        fallback_cache.clear()
+
+    def test_burst_then_steady_rate(self):
+        """Test that N requests pass, then one per period / N"""
+        limiter = LocalGCRALimiter()
+
+        with patch('contact.ratelimit.time.time', return_value=1000.0):
+            results = [limiter.hit('client', 3, 3600) for _ in range(4)]
+
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertAlmostEqual(results[-1][1], 1200.0)
+
+        # One emission interval later exactly one more request is allowed
+        with patch('contact.ratelimit.time.time', return_value=2200.0):
+            self.assertTrue(limiter.hit('client', 3, 3600)[0])
+            self.assertFalse(limiter.hit('client', 3, 3600)[0])
+
+    def test_first_period_admits_two_n_minus_one(self):
+        """Test the documented bound: a greedy client gets 2N - 1 into the first period"""
+        limiter = LocalGCRALimiter()
+        admitted = 0
+        for second in range(3600):
+            with patch('contact.ratelimit.time.time', return_value=1000.0 + second):
+                admitted += limiter.hit('client', 3, 3600)[0]
+
+        self.assertEqual(admitted, 5)
+
+    def test_state_is_one_value_per_client(self):
+        """Test that the limiter keeps a single timestamp per key"""
+        limiter = LocalGCRALimiter()
+        for _ in range(3):
+            limiter.hit('client', 3, 3600)
+        self.assertIsInstance(cache.get('gcra:client'), float)
+
+    def test_redis_limiter_runs_script(self):
+        """Test that the Redis limiter evaluates GCRA server-side"""
+        limiter = RedisGCRALimiter('redis://localhost:6379/0')
+        limiter.script = MagicMock(return_value=[0, b'12.5'])
+
+        self.assertEqual(limiter.hit('client', 3, 3600), (False, 12.5))
+        limiter.script.assert_called_once_with(keys=['gcra:client'], args=[1200.0, 3600])
+
+    def test_redis_outage_falls_back_to_local(self):
+        """Test that a Redis outage degrades to in-process limits"""
+        limiter = RedisGCRALimiter('redis://localhost:6379/0')
+        limiter.script = MagicMock(side_effect=redis.ConnectionError('down'))
+
+        results = [limiter.hit('client', 2, 60)[0] for _ in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://127.0.0.1:1/0',
+        }
+    })
+    def test_redis_outage_with_redis_default_cache(self):
+        """Test that the fallback does not use the default cache on the same dead Redis"""
+        limiter = RedisGCRALimiter('redis://127.0.0.1:1/0', timeout=0.1)
+
+        results = [limiter.hit('client', 2, 60)[0] for _ in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+
+    def test_contact_endpoint_throttled(self):
+        """Test that the fourth submission within the hour gets 429 with Retry-After"""
+        client = APIClient()
+        data = {
+            'name': 'Rate Tester',
+            'email': 'rate@example.com',
+            'message': 'Testing the submission rate limit.'
+        }
+        for _ in range(3):
+            self.assertEqual(
+                client.post('/api/contacts/', data, format='json').status_code,
+                status.HTTP_201_CREATED
+            )
+
+        response = client.post('/api/contacts/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+
+class ContactResponseCacheTests(APITestCase):
+    """Test cases for the versioned admin response cache"""
+
+    def setUp(self):
+        """Create a contact and authenticate as admin"""
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.contact = Contacts.objects.create(
+            name='Cached Lead', email='cached@example.com',
+            message='Please get back to me about pricing.'
+        )
+
+    def test_repeat_poll_served_from_cache(self):
+        """Test that a repeated poll hits the cache without touching the database"""
+        first = self.client.get('/api/contacts/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/contacts/')
+
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+    def test_query_parameters_are_part_of_the_key(self):
+        """Test that different pages are cached separately"""
+        self.client.get('/api/contacts/')
+        response = self.client.get('/api/contacts/?page_size=1')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_save_invalidates(self):
+        """Test that post_save invalidates cached lists and details"""
+        detail_url = f'/api/contacts/{self.contact.id}/'
+        self.client.get('/api/contacts/unprocessed/')
+        self.client.get(detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.contact.mark_as_processed()
+
+        response = self.client.get('/api/contacts/unprocessed/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'], [])
+        self.assertTrue(self.client.get(detail_url).data['is_processed'])
+
+    def test_bulk_update_invalidates(self):
+        """Test that set-based updates, which skip signals, still invalidate"""
+        self.client.get('/api/contacts/unprocessed/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Contacts.objects.all().mark_as_processed(chunk_size=10)
+
+        self.assertEqual(self.client.get('/api/contacts/unprocessed/').data['results'], [])
+
+    @override_settings(CONTACT_RESPONSE_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        """Test that a zero timeout bypasses the cache"""
+        self.client.get('/api/contacts/')
+        self.assertNotIn('X-Cache', self.client.get('/api/contacts/'))
+
+
+class ContactConditionalGetTests(APITestCase):
+    """Test cases for ETag / Last-Modified support on admin reads"""
+
+    def setUp(self):
+        """Create a contact and authenticate as admin"""
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.contact = Contacts.objects.create(
+            name='Polled Lead', email='polled@example.com',
+            message='Please get back to me about pricing.'
+        )
+
+    def test_validators_returned(self):
+        """Test that list, retrieve and unprocessed send an ETag, and only retrieve Last-Modified"""
+        for url in ('/api/contacts/', f'/api/contacts/{self.contact.id}/', '/api/contacts/unprocessed/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response['ETag'].startswith('W/"'))
+            self.assertEqual('Last-Modified' in response, url == f'/api/contacts/{self.contact.id}/')
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+        """Test that a list with a deleted row is not answered 304 by date"""
+        older = Contacts.objects.create(
+            name='Older Lead', email='older@example.com', message='An older message about pricing.'
+        )
+        Contacts.objects.filter(pk=older.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        since = self.client.get(f'/api/contacts/{self.contact.id}/')['Last-Modified']
+        older.delete()
+
+        response = self.client.get('/api/contacts/', HTTP_IF_MODIFIED_SINCE=since)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_none_match_returns_304(self):
+        """Test that an unchanged list answers 304 with no body"""
+        etag = self.client.get('/api/contacts/unprocessed/')['ETag']
+
+        response = self.client.get('/api/contacts/unprocessed/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    @override_settings(CONTACT_RESPONSE_CACHE_TIMEOUT=0)
+    def test_304_skips_page_query(self):
+        """Test that revalidation costs one aggregate query without the response cache"""
+        etag = self.client.get('/api/contacts/')['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/contacts/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since_returns_304(self):
+        """Test Last-Modified based revalidation"""
+        detail_url = f'/api/contacts/{self.contact.id}/'
+        last_modified = self.client.get(detail_url)['Last-Modified']
+
+        response = self.client.get(detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_produce_new_etag(self):
+        """Test that processing and deleting contacts change the validators"""
+        first = self.client.get('/api/contacts/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Contacts.objects.all().mark_as_processed()
+        response = self.client.get('/api/contacts/', HTTP_IF_NONE_MATCH=first)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second = response['ETag']
+        self.assertNotEqual(first, second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.contact.delete()
+        response = self.client.get('/api/contacts/', HTTP_IF_NONE_MATCH=second)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_query_parameters_change_etag(self):
+        """Test that different pages get different validators"""
+        self.assertNotEqual(
+            self.client.get('/api/contacts/')['ETag'],
+            self.client.get('/api/contacts/?page_size=1')['ETag']
+        )
+
+    def test_missing_contact_still_404(self):
+        """Test that unknown and malformed ids are not answered from validators"""
+        self.assertEqual(self.client.get('/api/contacts/999999/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/contacts/abc/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StageTimingTests(APITestCase):
+    """Test cases for per-stage timing and the Server-Timing header"""
+
+    def setUp(self):
+        cache.clear()
+        reset_stage_histograms()
+        self.valid_contact_data = {
+            'name': 'Timed Person',
+            'email': 'timed@example.com',
+            'message': 'How long does this submission take?',
+            'recaptcha_token': 'token'
+        }
+
+    def test_nested_stages_are_exclusive(self):
+        """Test that a nested stage is subtracted from its parent"""
+        timer = StageTimer()
+        with patch('contact.timing.time.perf_counter', side_effect=[1.0, 1.010, 1.015, 1.030]):
+            with timer.stage('db'):
+                with timer.stage('notify'):
+                    pass
+
+        stages = dict(timer.stages)
+        self.assertAlmostEqual(stages['notify'], 5.0)
+        self.assertAlmostEqual(stages['db'], 25.0)
+
+    @override_settings(SERVER_TIMING_HEADER='always', RECAPTCHA_SECRET_KEY='secret')
+    @patch('contact.views.verify_recaptcha', return_value=(True, 0.9, []))
+    def test_submission_reports_stages(self, mock_verify):
+        """Test that a submission reports each stage in Server-Timing"""
+        response = self.client.post('/api/contacts/', self.valid_contact_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        names = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        self.assertEqual(names[:3], ['recaptcha', 'validate', 'db'])
+        self.assertEqual(names[-1], 'total')
+
+        histograms = stage_histograms()
+        for name in ('recaptcha', 'validate', 'db', 'total'):
+            self.assertEqual(histograms[name]['count'], 1)
+
+    def test_header_hidden_from_anonymous_users(self):
+        """Test that the default 'staff' mode hides timings from the public"""
+        response = self.client.post('/api/contacts/', self.valid_contact_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Server-Timing', response)
+        # Still aggregated
+        self.assertEqual(stage_histograms()['validate']['count'], 1)
+
+    def test_header_shown_to_staff(self):
+        """Test that staff users see Server-Timing and can read the histograms"""
+        admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=admin_user)
+
+        response = self.client.get('/api/contacts/timings/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertEqual(response.data['pid'], os.getpid())
+
+
+@override_settings(METRICS_TOKEN='scrape-secret')
+class MetricsTests(APITestCase):
+    """Test cases for the Prometheus metrics endpoint"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _scrape(self, **headers):
+        headers.setdefault('HTTP_AUTHORIZATION', 'Bearer scrape-secret')
+        response = self.client.get('/metrics', **headers)
+        return response, response.content.decode()
+
+    def _sample(self, text, prefix):
+        for line in text.splitlines():
+            if line.startswith(prefix):
+                return float(line.rsplit(' ', 1)[1])
+        return 0.0
+
+    def test_request_metrics_recorded(self):
+        """Test that requests are counted per route, method and status"""
+        _, before = self._scrape()
+        self.client.post('/api/contacts/', {
+            'name': 'Metric Person',
+            'email': 'metric@example.com',
+            'message': 'Counting this submission in the metrics.'
+        }, format='json')
+
+        response, text = self._scrape()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        prefix = 'averon_http_requests_total{method="POST",status="201",view="contact-list"}'
+        self.assertEqual(self._sample(text, prefix) - self._sample(before, prefix), 1)
+        self.assertIn('averon_http_request_db_queries_bucket{le="0.0",method="POST",view="contact-list"}', text)
+        self.assertIn('averon_request_stage_duration_seconds_count{stage="db"}', text)
+
+    def test_state_gauges(self):
+        """Test outbox depth and circuit breaker state are computed at scrape time"""
+        contact = Contacts.objects.create(
+            name='Queued', email='queued@example.com', message='Waiting for notification.'
+        )
+        NotificationOutbox.objects.create(contact=contact)
+
+        _, text = self._scrape()
+
+        self.assertIn('averon_notification_outbox{status="pending"} 1.0', text)
+        self.assertIn('averon_circuit_breaker_state{name="recaptcha",state="closed"} 1.0', text)
+
+    def test_throttle_rejections_counted(self):
+        """Test that throttled submissions are counted"""
+        _, before = self._scrape()
+        for _ in range(4):
+            self.client.post('/api/contacts/', {}, format='json')
+
+        _, text = self._scrape()
+
+        prefix = 'averon_throttle_rejections_total{scope="contact_submit"}'
+        self.assertEqual(self._sample(text, prefix) - self._sample(before, prefix), 1)
+
+    def test_token_required(self):
+        """Test that METRICS_TOKEN protects the endpoint"""
+        self.assertEqual(self._scrape(HTTP_AUTHORIZATION='')[0].status_code, 401)
+        self.assertEqual(self._scrape(HTTP_AUTHORIZATION='Bearer wrong')[0].status_code, 401)
+        response, _ = self._scrape()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_disabled_without_token(self):
+        """Test that the endpoint is closed by default"""
+        self.assertEqual(self._scrape(HTTP_AUTHORIZATION='')[0].status_code, 403)
+        self.assertEqual(self._scrape(HTTP_AUTHORIZATION='Bearer ')[0].status_code, 403)
+
+    def test_multiprocess_directory_aggregated(self):
+        """Test that multiprocess mode reads every worker's samples"""
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}), \
+                patch('contact.metrics.MultiProcessCollector') as collector:
+            response, _ = self._scrape()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        collector.assert_called_once()
+
+
+class ContactSearchTests(APITestCase):
+    """Test cases for full-text contact search"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.quote = Contacts.objects.create(
+            name='Alice Walker', email='alice@example.com', ip_address='10.1.2.3',
+            message='I would like a quote for running shoes in bulk.'
+        )
+        self.invoice = Contacts.objects.create(
+            name='Bob Stone', email='bob@corp.example',
+            message='Question about invoices; Alice from sales referred me.'
+        )
+
+    def _names(self, queryset):
+        return [contact.name for contact in queryset]
+
+    def test_search_covers_all_fields(self):
+        """Test that name, email, message words and IP are searchable"""
+        self.assertEqual(self._names(Contacts.objects.search('walker')), ['Alice Walker'])
+        self.assertEqual(self._names(Contacts.objects.search('bob@corp.example')), ['Bob Stone'])
+        self.assertEqual(self._names(Contacts.objects.search('run')), ['Alice Walker'])  # stemmed
+        self.assertEqual(self._names(Contacts.objects.search('10.1.2.3')), ['Alice Walker'])
+
+    def test_index_follows_set_based_writes(self):
+        """Test that QuerySet.update and delete keep the index in sync"""
+        Contacts.objects.filter(pk=self.invoice.pk).update(message='Only about shipping dates now.')
+        self.quote.delete()
+
+        self.assertEqual(self._names(Contacts.objects.search('invoices')), [])
+        self.assertEqual(self._names(Contacts.objects.search('shoes')), [])
+        self.assertEqual(self._names(Contacts.objects.search('shipping')), ['Bob Stone'])
+
+    def test_ranked_by_relevance(self):
+        """Test that a name match outranks a mention in the message"""
+        results = Contacts.objects.search('alice', ranked=True)
+
+        self.assertEqual(self._names(results), ['Alice Walker', 'Bob Stone'])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+    def test_query_syntax_matched_literally(self):
+        """Test that search operators in user input cannot break the query"""
+        self.assertEqual(self._names(Contacts.objects.search('" AND (*')), [])
+        self.assertEqual(self._names(Contacts.objects.search('shoes" OR "invoices')), [])
+
+    def test_api_q_filter(self):
+        """Test that ?q= filters the list and keeps newest-first keyset order"""
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.get('/api/contacts/', {'q': 'alice'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['name'] for row in response.data['results']], ['Bob Stone', 'Alice Walker'])
+        self.assertEqual(self.client.get('/api/contacts/', {'q': 'shoes'}).data['results'][0]['id'], self.quote.id)
+
+    def test_admin_search_ranked(self):
+        """Test that the admin search box returns ranked full-text matches"""
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get('/admin/contact/contacts/', {'q': 'alice'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._names(response.context['cl'].result_list), ['Alice Walker', 'Bob Stone'])
+
+
+class DuplicateSubmissionTests(APITestCase):
+    """Test cases for the duplicate submission short-circuit"""
+
+    def setUp(self):
+        cache.clear()
+        self.data = {
+            'name': 'Double Clicker',
+            'email': 'double@example.com',
+            'message': 'Please call me back about the offer.',
+            'recaptcha_token': 'token',
+        }
+
+    def test_fingerprint_ignores_case_and_whitespace(self):
+        """Test that trivially different copies share a fingerprint"""
+        self.assertEqual(
+            fingerprint('Double@Example.com ', 'Please  call me\nBACK'),
+            fingerprint('double@example.com', 'please call me back')
+        )
+        self.assertNotEqual(
+            fingerprint('double@example.com', 'please call me back'),
+            fingerprint('other@example.com', 'please call me back')
+        )
+
+    @patch('contact.views.verify_recaptcha', return_value=(True, 0.9, []))
+    def test_duplicate_replayed_without_work(self, verify):
+        """Test that a repeat gets the first response without reCAPTCHA, INSERT or email"""
+        first = self.client.post('/api/contacts/', self.data, format='json')
+        repeat = self.client.post('/api/contacts/', {
+            **self.data, 'message': '  please call me back ABOUT the offer. '
+        }, format='json')
+
+        self.assertEqual(repeat.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(repeat['X-Duplicate-Submission'], 'true')
+        self.assertEqual(repeat.data['data']['id'], first.data['data']['id'])
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(Contacts.objects.count(), 1)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    @patch('contact.views.verify_recaptcha', return_value=(True, 0.9, []))
+    def test_failed_submission_released(self, verify):
+        """Test that a rejected submission does not block a corrected retry"""
+        rejected = self.client.post('/api/contacts/', {**self.data, 'name': 'X'}, format='json')
+        retry = self.client.post('/api/contacts/', self.data, format='json')
+
+        self.assertEqual(rejected.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('X-Duplicate-Submission', retry)
+
+    def test_in_flight_duplicate_conflicts(self):
+        """Test that a duplicate of a still-running submission gets 409 without waiting"""
+        cache.add(DEDUP_KEY_PREFIX + fingerprint(self.data['email'], self.data['message']), IN_FLIGHT)
+
+        with patch('time.sleep') as sleep:
+            response = self.client.post('/api/contacts/', self.data, format='json')
+
+        sleep.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(Contacts.objects.count(), 0)
+
+    @override_settings(CONTACT_DUPLICATE_WINDOW=0)
+    @patch('contact.views.verify_recaptcha', return_value=(True, 0.9, []))
+    def test_disabled_window(self, verify):
+        """Test that a zero window turns deduplication off"""
+        self.client.post('/api/contacts/', self.data, format='json')
+        self.client.post('/api/contacts/', self.data, format='json')
+
+        self.assertEqual(Contacts.objects.count(), 2)
+
+    async def test_async_endpoint_replays(self):
+        """Test that the async endpoint shares the duplicate store"""
+        data = {key: value for key, value in self.data.items() if key != 'recaptcha_token'}
+        first = await self.async_client.post('/api/contacts/async/', data, content_type='application/json')
+        repeat = await self.async_client.post('/api/contacts/async/', data, content_type='application/json')
+
+        self.assertEqual(repeat.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(repeat['X-Duplicate-Submission'], 'true')
+        self.assertEqual(json.loads(repeat.content)['data']['id'], json.loads(first.content)['data']['id'])
+        self.assertEqual(await Contacts.objects.acount(), 1)
+
+
+class IdempotencyKeyTests(APITestCase):
+    """Test cases for Idempotency-Key on contact creation"""
+
+    def setUp(self):
+        cache.clear()
+        self.data = {
+            'name': 'Mobile User',
+            'email': 'mobile@example.com',
+            'message': 'Sent from a phone on a train.',
+            'recaptcha_token': 'single-use-token',
+        }
+
+    def _post(self, data=None, key='retry-key-1'):
+        return self.client.post(
+            '/api/contacts/', data or self.data, format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    @patch('contact.views.verify_recaptcha', return_value=(True, 0.9, []))
+    def test_retry_replays_stored_response(self, verify):
+        """Test that a retry gets the first response without reCAPTCHA or the database"""
+        first = self._post()
+
+        with self.assertNumQueries(0):
+            retry = self._post({**self.data, 'recaptcha_token': 'fresh-token'})
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(Contacts.objects.count(), 1)
+
+    @patch('contact.views.verify_recaptcha', return_value=(True, 0.9, []))
+    def test_retries_not_throttled(self, verify):
+        """Test that replays do not count against the submission limit"""
+        self._post()
+        responses = [self._post() for _ in range(5)]
+
+        self.assertEqual({response.status_code for response in responses}, {status.HTTP_201_CREATED})
+
+    @patch('contact.views.verify_recaptcha', return_value=(True, 0.9, []))
+    def test_keys_scoped_per_client(self, verify):
+        """Test that another client's request with the same key is not a replay"""
+        self._post()
+
+        other = self.client.post(
+            '/api/contacts/', {**self.data, 'email': 'someone.else@example.com'}, format='json',
+            HTTP_IDEMPOTENCY_KEY='retry-key-1', REMOTE_ADDR='203.0.113.9'
+        )
+
+        self.assertEqual(other.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', other)
+        self.assertEqual(Contacts.objects.count(), 2)
+
+    def test_key_reused_with_different_body(self):
+        """Test that reusing a key for another submission is rejected"""
+        self._post()
+
+        response = self._post({**self.data, 'message': 'A completely different message.'})
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_in_flight_retry_conflicts(self):
+        """Test that a retry while the first attempt holds the lock gets 409"""
+        cache.add(IDEMPOTENCY_LOCK_PREFIX + hashlib.sha256(b'ip:127.0.0.1\nretry-key-1').hexdigest(), True)
+
+        response = self._post()
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Contacts.objects.count(), 0)
+
+    @patch('contact.views.save_contact', side_effect=RuntimeError('database down'))
+    def test_server_errors_not_stored(self, save):
+        """Test that a failed attempt can be retried with the same key"""
+        self.data.pop('recaptcha_token')
+        self.assertEqual(self._post().status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        save.side_effect = None
+        save.return_value = Contacts.objects.create(
+            name=self.data['name'], email=self.data['email'], message=self.data['message']
+        )
+        retry = self._post()
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', retry)
+
+    @patch('contact.views.verify_recaptcha', return_value=(False, 0.0, ['network-error']))
+    def test_retry_with_fresh_token_after_network_error(self, verify):
+        """Test that a reCAPTCHA rejection is not replayed to the retry"""
+        self.assertEqual(self._post().status_code, status.HTTP_400_BAD_REQUEST)
+
+        verify.return_value = (True, 0.9, [])
+        retry = self._post({**self.data, 'recaptcha_token': 'fresh-token'})
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', retry)
+        self.assertEqual(verify.call_args[0][0], 'fresh-token')
+        self.assertEqual(Contacts.objects.count(), 1)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Test cases for the admin changelist paginator"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        Contacts.objects.bulk_create(
+            Contacts(name=f'Sender {i}', email=f'sender{i}@example.com', message='Hello there',
+                     is_processed=i < 2)
+            for i in range(6)
+        )
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=10)
+    def test_small_results_counted_exactly(self):
+        """Test that counts below the limit are exact and skip the planner"""
+        with patch.object(EstimatedCountPaginator, 'estimate') as estimate:
+            paginator = EstimatedCountPaginator(Contacts.objects.all(), 25)
+            self.assertEqual(paginator.count, 6)
+
+        estimate.assert_not_called()
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=3)
+    def test_large_results_use_estimate(self):
+        """Test that counts at the limit come from the planner estimate"""
+        with patch.object(EstimatedCountPaginator, 'estimate', return_value=250000):
+            self.assertEqual(EstimatedCountPaginator(Contacts.objects.all(), 25).count, 250000)
+            self.assertEqual(
+                EstimatedCountPaginator(Contacts.objects.filter(is_processed=True), 25).count, 2
+            )
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=3)
+    def test_falls_back_to_exact_count(self):
+        """Test that backends without an estimate get an exact count"""
+        self.assertEqual(EstimatedCountPaginator(Contacts.objects.all(), 25).count, 6)
+
+    def test_changelist_skips_full_count(self):
+        """Test that the changelist does not count the unfiltered table"""
+        self.client.force_login(self.admin_user)
+
+        with patch.object(EstimatedCountPaginator, 'estimate') as estimate:
+            response = self.client.get('/admin/contact/contacts/', {'is_processed__exact': '1'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertIsNone(response.context['cl'].full_result_count)
+        estimate.assert_not_called()
+
+
+class ContactDailyStatsTests(APITestCase):
+    """Test cases for the daily statistics rollup"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.first_day = datetime(2026, 3, 1, 12, tzinfo=dt_timezone.utc)
+        self.second_day = datetime(2026, 3, 2, 12, tzinfo=dt_timezone.utc)
+        contacts = Contacts.objects.bulk_create(
+            Contacts(name=f'Sender {i}', email=f'sender{i}@example.com', message='Hello there')
+            for i in range(3)
+        )
+        Contacts.objects.filter(pk__in=[c.pk for c in contacts[:2]]).update(created_at=self.first_day)
+        Contacts.objects.filter(pk=contacts[2].pk).update(created_at=self.second_day)
+        self.contacts = contacts
+
+    def _day(self, moment):
+        return ContactDailyStats.objects.get(day=moment.date())
+
+    def test_created_contacts_counted(self):
+        """Test that inserts, including moves between days, update the submissions"""
+        self.assertEqual(self._day(self.first_day).submissions, 2)
+        self.assertEqual(self._day(self.second_day).submissions, 1)
+        self.assertEqual(ContactDailyStats.objects.filter(submissions__gt=0).count(), 2)
+
+    def test_processing_tracked(self):
+        """Test that set-based processing records the count and time to process"""
+        Contacts.objects.filter(pk=self.contacts[0].pk).update(
+            is_processed=True, processed_at=self.first_day + timedelta(hours=2)
+        )
+        Contacts.objects.filter(pk=self.contacts[1].pk).update(
+            is_processed=True, processed_at=self.first_day + timedelta(hours=4)
+        )
+
+        day = self._day(self.first_day)
+        self.assertEqual(day.processed, 2)
+        self.assertAlmostEqual(day.mean_processing_seconds, 3 * 3600, places=0)
+
+        Contacts.objects.filter(pk=self.contacts[0].pk).update(is_processed=False, processed_at=None)
+        day = self._day(self.first_day)
+        self.assertEqual(day.processed, 1)
+        self.assertAlmostEqual(day.mean_processing_seconds, 4 * 3600, places=0)
+
+    def test_deleted_contacts_removed(self):
+        """Test that deleting a contact takes it out of its day"""
+        self.contacts[2].delete()
+
+        self.assertEqual(self._day(self.second_day).submissions, 0)
+        self.assertIsNone(self._day(self.second_day).mean_processing_seconds)
+
+    def test_rebuild_command(self):
+        """Test that the command recomputes the table from the contacts"""
+        ContactDailyStats.objects.all().delete()
+        out = StringIO()
+
+        call_command('rebuild_contact_stats', stdout=out)
+
+        self.assertIn('2 day(s)', out.getvalue())
+        self.assertEqual(self._day(self.first_day).submissions, 2)
+
+    def test_stats_endpoint(self):
+        """Test that the stats action reports totals and days in a range"""
+        Contacts.objects.filter(pk=self.contacts[2].pk).update(
+            is_processed=True, processed_at=self.second_day + timedelta(minutes=30)
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.get('/api/contacts/stats/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals']['submissions'], 3)
+        self.assertEqual(response.data['totals']['processed'], 1)
+        self.assertAlmostEqual(response.data['totals']['mean_processing_seconds'], 1800, places=0)
+        self.assertEqual([row['day'] for row in response.data['days']], ['2026-03-01', '2026-03-02'])
+
+        response = self.client.get('/api/contacts/stats/', {'start': '2026-03-02'})
+        self.assertEqual(response.data['totals']['submissions'], 1)
+
+        response = self.client.get('/api/contacts/stats/', {'start': '2026-03-02', 'end': '2026-03-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stats_endpoint_admin_only(self):
+        """Test that anonymous users cannot read the statistics"""
+        response = self.client.get('/api/contacts/stats/')
+
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+    def test_date_hierarchy_reads_rollup(self):
+        """Test that the admin drill-down dates come from ContactDailyStats"""
+        # Only the rollup knows about this day; the contacts do not
+        ContactDailyStats.objects.create(day=date(2025, 7, 4), submissions=1)
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get('/admin/contact/contacts/')
+        years = response.context['cl'].queryset.datetimes('created_at', 'year')
+        self.assertEqual([d.year for d in years], [2025, 2026])
+
+        response = self.client.get('/admin/contact/contacts/', {'created_at__year': '2026'})
+        months = response.context['cl'].queryset.datetimes('created_at', 'month')
+        self.assertEqual([(d.year, d.month) for d in months], [(2026, 3)])
+
+        # Any other filter falls back to the contacts themselves
+        response = self.client.get('/admin/contact/contacts/', {'is_processed__exact': '0'})
+        years = response.context['cl'].queryset.datetimes('created_at', 'year')
+        self.assertEqual([d.year for d in years], [2026])
+
+
+class ContactArchiveTests(TestCase):
+    """Test cases for archiving and restoring old contacts"""
+
+    def setUp(self):
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+        override = override_settings(CONTACT_ARCHIVE_DIR=self.archive_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.old_day = datetime(2024, 5, 1, 12, tzinfo=dt_timezone.utc)
+        contacts = Contacts.objects.bulk_create(
+            Contacts(name=f'Sender {i}', email=f'sender{i}@example.com', message='Hello there',
+                     ip_address='10.0.0.1')
+            for i in range(4)
+        )
+        self.old_processed = contacts[:2]
+        self.old_pending = contacts[2]
+        self.recent_processed = contacts[3]
+        Contacts.objects.filter(pk__in=[c.pk for c in contacts[:3]]).update(created_at=self.old_day)
+        Contacts.objects.filter(pk__in=[c.pk for c in contacts[:2]] + [contacts[3].pk]).update(
+            is_processed=True, processed_at=F('created_at') + timedelta(hours=1)
+        )
+
+    def _stats(self):
+        return [
+            (day.day, day.total_submissions, day.total_processed, round(day.mean_processing_seconds or 0))
+            for day in ContactDailyStats.objects.order_by('day')
+        ]
+
+    def test_archives_old_processed_contacts(self):
+        """Test that only old processed contacts move, into their day's shard"""
+        out = StringIO()
+        call_command('archive_contacts', '--older-than', '30', '--chunk-size', '1', stdout=out)
+
+        self.assertIn('Archived 2 contact(s)', out.getvalue())
+        self.assertEqual(
+            set(Contacts.objects.values_list('pk', flat=True)),
+            {self.old_pending.pk, self.recent_processed.pk}
+        )
+        shard = shard_path(None, self.old_day.date())
+        self.assertTrue(str(shard).endswith('2024/05/contacts-2024-05-01.jsonl.gz'))
+        self.assertEqual(sorted(record['id'] for record in read_shard(shard)),
+                         sorted(c.pk for c in self.old_processed))
+
+    def test_dry_run(self):
+        """Test that --dry-run only counts"""
+        out = StringIO()
+        call_command('archive_contacts', '--older-than', '30', '--dry-run', stdout=out)
+
+        self.assertIn('2 contact(s) would be archived', out.getvalue())
+        self.assertEqual(Contacts.objects.count(), 4)
+
+    def test_statistics_survive_archival(self):
+        """Test that the daily statistics still count archived contacts"""
+        before = self._stats()
+
+        archive_contacts(30)
+        self.assertEqual(self._stats(), before)
+        self.assertEqual(ContactDailyStats.objects.get(day=self.old_day.date()).archived, 2)
+
+        restore_contacts(shard_paths())
+        self.assertEqual(self._stats(), before)
+        self.assertEqual(ContactDailyStats.objects.get(day=self.old_day.date()).archived, 0)
+
+    def test_restore_round_trip(self):
+        """Test that restored contacts keep their ids and timestamps, once"""
+        originals = {
+            c.pk: c for c in Contacts.objects.filter(pk__in=[c.pk for c in self.old_processed])
+        }
+        archive_contacts(30)
+
+        out = StringIO()
+        call_command('restore_contacts', '--start', '2024-05-01', '--end', '2024-05-01', stdout=out)
+        self.assertIn('Restored 2 contact(s) from 1 file(s)', out.getvalue())
+        self.assertEqual(restore_contacts(shard_paths()), 0)
+
+        for contact in Contacts.objects.filter(pk__in=originals):
+            original = originals[contact.pk]
+            self.assertEqual(contact.email, original.email)
+            self.assertEqual(contact.created_at, original.created_at)
+            self.assertEqual(contact.processed_at, original.processed_at)
+            self.assertEqual(contact.updated_at, original.updated_at)
+            self.assertEqual(contact.ip_address, original.ip_address)
+        self.assertEqual(len(originals), 2)
+
+    def test_duplicate_archive_copies_restore_once(self):
+        """Test that rows archived twice (interrupted run) restore once"""
+        rows = list(Contacts.objects.filter(pk=self.old_processed[0].pk).values(*ARCHIVE_FIELDS))
+        _append_shard(shard_path(None, self.old_day.date()), rows)
+        archive_contacts(30)
+
+        self.assertEqual(len(read_shard(shard_path(None, self.old_day.date()))), 2)
+        self.assertEqual(restore_contacts(shard_paths()), 2)
+
+
+class _RecordingHandler(logging.Handler):
+    """Collects records and the thread that handled them"""
+
+    def __init__(self, name, gate=None):
+        super().__init__()
+        self.set_name(name)
+        self.records = []
+        self.threads = []
+        self.entered = threading.Event()
+        self.gate = gate
+
+    def emit(self, record):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.records.append(self.format(record))
+        self.threads.append(threading.current_thread())
+
+
+class LoggingPipelineTests(TestCase):
+    """Test cases for the queued JSON logging pipeline"""
+
+    def _logger(self, handler):
+        logger = logging.getLogger(f'averon.test.{id(handler)}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger
+
+    def _sink(self, name, *targets):
+        sink = logging.getLogger(name)
+        sink.propagate = False
+        for target in targets:
+            sink.addHandler(target)
+            self.addCleanup(sink.removeHandler, target)
+        return name
+
+    def test_json_formatter(self):
+        """Test that records become one JSON object with extras and tracebacks"""
+        try:
+            raise RuntimeError('broken')
+        except RuntimeError:
+            record = logging.getLogger('django').makeRecord(
+                'django', logging.ERROR, __file__, 1, 'Contact %s failed', (7,),
+                exc_info=sys.exc_info(), extra={'ip_address': '10.0.0.1'}
+            )
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual(entry['message'], 'Contact 7 failed')
+        self.assertEqual(entry['level'], 'ERROR')
+        self.assertEqual(entry['ip_address'], '10.0.0.1')
+        self.assertIn('RuntimeError: broken', entry['exc_info'])
+
+    def test_records_handled_on_listener_thread(self):
+        """Test that target handlers run off the logging thread and are flushed on stop"""
+        target = _RecordingHandler('test-target')
+        handler = QueueListenerHandler(self._sink('logsink.test', target))
+        logger = self._logger(handler)
+
+        logger.info('Submission from %s', '10.0.0.1')
+        handler.stop()
+
+        self.assertEqual(target.records, ['Submission from 10.0.0.1'])
+        self.assertNotEqual(target.threads[0], threading.current_thread())
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that a full queue drops records rather than blocking the caller"""
+        gate = threading.Event()
+        target = _RecordingHandler('slow-target', gate=gate)
+        handler = QueueListenerHandler(self._sink('logsink.slow', target), queue_size=1)
+        logger = self._logger(handler)
+
+        logger.info('first')
+        self.assertTrue(target.entered.wait(5))  # listener is now busy with it
+        logger.info('second')
+        logger.info('third')
+
+        self.assertEqual(handler.dropped, 1)
+        gate.set()
+        with patch('sys.stderr', new_callable=StringIO):
+            handler.stop()
+        self.assertEqual(target.records, ['first', 'second'])
+
+    def test_sink_resolved_when_listener_starts(self):
+        """Test that sink handlers configured after the queue handler are used"""
+        handler = QueueListenerHandler('logsink.late')
+        logger = self._logger(handler)
+        target = _RecordingHandler('late-target')
+        self._sink('logsink.late', target)
+
+        logger.info('configured in any order')
+        handler.stop()
+
+        self.assertEqual(target.records, ['configured in any order'])
+
@@ -3,11 +3,20 @@ Custom throttling classes for contact form submission
 """
 from rest_framework.throttling import AnonRateThrottle
 
+from .idempotency import is_replay
+from .metrics import THROTTLE_REJECTIONS
+from .ratelimit import get_rate_limiter
+
 
 class ContactSubmitThrottle(AnonRateThrottle):
     """
     Throttle for contact form submissions
-    Allows 3 submissions per hour per IP address
+    Allows a burst of 3 submissions per IP address, then one every 20 minutes
+    (the 3/hour rate; see contact/ratelimit.py for the exact semantics)
+
+    Uses GCRA through the shared rate limiter (Redis when configured), so the
+    limit holds across all workers and needs one stored value per IP instead
+    of DRF's per-request timestamp history.
     """
     scope = 'contact_submit'
 
@@ -25,3 +34,26 @@ class ContactSubmitThrottle(AnonRateThrottle):
             'scope': self.scope,
             'ident': ident
         }
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        # A retry answered from the idempotency store does no work
+        if is_replay(request):
+            return True
+
+        allowed, self._wait = get_rate_limiter().hit(self.key, self.num_requests, self.duration)
+        if not allowed:
+            THROTTLE_REJECTIONS.labels(self.scope).inc()
+        return allowed
+
+    def wait(self):
+        """
+        Seconds until the client may submit again
+        """
+        return getattr(self, '_wait', None) or None
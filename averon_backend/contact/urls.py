@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ContactViewSet
+from .async_views import create_contact_async
 
 router = DefaultRouter()
 router.register(r'contacts', ContactViewSet, basename='contact')
 
 urlpatterns = [
+    # Must come before the router so 'async' is not taken as a contact pk
+    path('contacts/async/', create_contact_async, name='contact-create-async'),
     path('', include(router.urls)),
 ]
@@ -1,16 +1,30 @@
 import logging
-import threading
+import os
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
-from django.core.mail import send_mail
+from rest_framework.parsers import JSONParser
+from rest_framework.exceptions import ValidationError
 from django.conf import settings
-from django.utils import timezone
-from .models import Contacts
-from .serializers import ContactSerializer, ContactAdminSerializer
+from django.db import transaction
+from django.db.models import Q
+from .models import Contacts, ContactDailyStats
+from .dedup import IN_FLIGHT, claim_submission, finish_submission
+from .idempotency import idempotent
+from .serializers import (
+    ContactSerializer, ContactAdminSerializer, BulkMarkProcessedSerializer,
+    ContactFilterSerializer, ContactDailyStatsSerializer, DailyStatsRangeSerializer
+)
 from .throttles import ContactSubmitThrottle
-from .recaptcha import verify_recaptcha, check_recaptcha_score
+from .recaptcha import verify_recaptcha, check_recaptcha_score, CIRCUIT_OPEN
+from .notifications import enqueue_notification
+from .parsers import NDJSONParser
+from .pagination import KeysetPagination
+from .response_cache import cached_response, invalidate_on_commit
+from .conditional import conditional_response
+from .timing import stage, stage_histograms
+from .exports import EXPORT_FORMATS, FORMAT_CSV, export_response
 
 # Configure logger
 logger = logging.getLogger('django')
@@ -36,6 +50,161 @@ def get_user_agent(request):
     return request.META.get('HTTP_USER_AGENT', '')[:500]  # Limit length
 
 
+def check_recaptcha_result(result, ip_address):
+    """
+    Apply the contact form's reCAPTCHA rules to a verification result
+
+    Args:
+        result: (is_valid, score, error_codes) from verify_recaptcha
+        ip_address: Client IP, for logging
+
+    Returns:
+        Tuple of (rejection, degraded)
+        - rejection: (body, status, headers) when the submission must be
+          refused, otherwise None
+        - degraded: True if accepted without verification (circuit open)
+    """
+    is_valid, score, errors = result
+    degraded = CIRCUIT_OPEN in errors
+
+    if degraded and not is_valid:
+        security_logger.warning(
+            "reCAPTCHA unavailable (circuit open); rejecting submission from IP %s", ip_address
+        )
+        return (
+            {
+                'message': 'Verification service temporarily unavailable',
+                'errors': {'recaptcha': ['Please try again in a few minutes']}
+            },
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {'Retry-After': str(settings.RECAPTCHA_BREAKER_RESET_TIMEOUT)}
+        ), degraded
+
+    if degraded:
+        security_logger.warning(
+            "reCAPTCHA unavailable (circuit open); accepting and flagging submission from IP %s",
+            ip_address
+        )
+
+    if not is_valid:
+        security_logger.warning(
+            "reCAPTCHA verification failed from IP %s: %s", ip_address, errors
+        )
+        return (
+            {
+                'message': 'reCAPTCHA verification failed',
+                'errors': {'recaptcha': ['Please complete the reCAPTCHA verification']}
+            },
+            status.HTTP_400_BAD_REQUEST,
+            None
+        ), degraded
+
+    # Check score threshold (0.5 = balanced, 0.7 = stricter)
+    if not check_recaptcha_score(score, threshold=0.5):
+        security_logger.warning(
+            "reCAPTCHA score too low (%.2f) from IP %s", score, ip_address
+        )
+        return (
+            {
+                'message': 'Suspicious activity detected',
+                'errors': {'recaptcha': ['Your submission appears automated. Please try again.']}
+            },
+            status.HTTP_400_BAD_REQUEST,
+            None
+        ), degraded
+
+    return None, degraded
+
+
+def save_contact(serializer, ip_address, user_agent, recaptcha_degraded=False):
+    """
+    Save a validated contact with audit information
+
+    The notification is queued in the same transaction so it survives
+    worker restarts.
+    """
+    with stage('db'), transaction.atomic():
+        contact = serializer.save(
+            ip_address=ip_address,
+            user_agent=user_agent,
+            recaptcha_degraded=recaptcha_degraded
+        )
+        enqueue_notification(contact)
+
+    # Log successful submission
+    logger.info(
+        "Contact form submitted successfully: %s from %s (IP: %s)",
+        contact.id, contact.email, ip_address
+    )
+    return contact
+
+
+def duplicate_submission_result(previous):
+    """
+    Response for a submission identical to a recent one (see contact/dedup.py)
+
+    Returns:
+        Tuple of (body, status_code, headers)
+    """
+    if previous == IN_FLIGHT:
+        return (
+            {'message': 'An identical submission is already being processed.'},
+            status.HTTP_409_CONFLICT,
+            {'Retry-After': '1'}
+        )
+    return previous, status.HTTP_201_CREATED, {'X-Duplicate-Submission': 'true'}
+
+
+def submission_response_data(contact):
+    """
+    Response body for a successful contact form submission
+    """
+    return {
+        'message': 'Contact form submitted successfully. We will get back to you soon!',
+        'data': {
+            'id': contact.id,
+            'email': contact.email,
+            'name': contact.name,
+            'created_at': contact.created_at,
+        },
+        # Notification is delivered asynchronously from the outbox
+        'email_sent': True  # Informational only
+    }
+
+
+def search_filter(queryset, request):
+    """
+    Apply the `?q=` full-text filter of a list request, keeping its ordering
+    """
+    query = request.query_params.get('q', '').strip()
+    return queryset.search(query) if query else queryset
+
+
+def all_contacts_scope(view, request, kwargs):
+    """
+    Rows behind the contact list (for conditional GET validators)
+    """
+    return search_filter(Contacts.objects.all(), request)
+
+
+def unprocessed_contacts_scope(view, request, kwargs):
+    """
+    Rows behind the unprocessed inbox (for conditional GET validators)
+    """
+    return Contacts.objects.filter(is_processed=False)
+
+
+def contact_detail_scope(view, request, kwargs):
+    """
+    Row behind a contact detail (for conditional GET validators)
+    """
+    try:
+        return Contacts.objects.filter(pk=int(kwargs['pk']))
+    except (KeyError, ValueError):
+        # Malformed id; the view itself answers 404
+        return Contacts.objects.none()
+
+
 class ContactViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing contact form submissions with security features
@@ -43,6 +212,7 @@ class ContactViewSet(viewsets.ModelViewSet):
     queryset = Contacts.objects.all()
     serializer_class = ContactSerializer
     throttle_classes = [ContactSubmitThrottle]
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         """
@@ -56,8 +226,16 @@ class ContactViewSet(viewsets.ModelViewSet):
         elif self.action in ['list', 'retrieve', 'update', 'partial_update', 'destroy']:
             # Only admins can view/edit existing contacts
             return [IsAuthenticated(), IsAdminUser()]
-        # Default: require authentication for any other actions
-        return [IsAuthenticated()]
+        # Custom actions declare their own permission_classes (e.g. admin
+        # only); always require authentication on top of them
+        return [IsAuthenticated()] + super().get_permissions()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Matches come back in the list's keyset order (newest first)
+            queryset = search_filter(queryset, self.request)
+        return queryset
 
     def get_serializer_class(self):
         """
@@ -67,105 +245,82 @@ class ContactViewSet(viewsets.ModelViewSet):
             return ContactAdminSerializer
         return ContactSerializer
 
+    @conditional_response(all_contacts_scope, last_modified=False)
+    @cached_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_response(contact_detail_scope)
+    @cached_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Create a new contact with security tracking and comprehensive error handling
+
+        Retries that send the same Idempotency-Key header get the stored
+        response of the first attempt.
         """
         try:
             # Get client information
             ip_address = get_client_ip(request)
             user_agent = get_user_agent(request)
 
-            # Log the submission attempt
-            security_logger.info(
-                f"Contact form submission attempt from IP: {ip_address}"
-            )
+            # Identical recent submission: answer it before any expensive work
+            dedup_key, previous = claim_submission(request.data)
+            if previous is not None:
+                body, status_code, headers = duplicate_submission_result(previous)
+                return Response(body, status=status_code, headers=headers)
+
+            created = None
+            try:
+                # Log the submission attempt
+                security_logger.info(
+                    "Contact form submission attempt from IP: %s", ip_address
+                )
 
-            # Verify reCAPTCHA if token is provided
-            recaptcha_token = request.data.get('recaptcha_token', '')
-            if recaptcha_token:
-                is_valid, score, errors = verify_recaptcha(recaptcha_token, ip_address)
+                # Verify reCAPTCHA if token is provided
+                recaptcha_token = request.data.get('recaptcha_token', '')
+                recaptcha_degraded = False
+                if recaptcha_token:
+                    with stage('recaptcha'):
+                        result = verify_recaptcha(recaptcha_token, ip_address)
+                    rejection, recaptcha_degraded = check_recaptcha_result(result, ip_address)
+                    if rejection:
+                        body, status_code, headers = rejection
+                        return Response(body, status=status_code, headers=headers)
+
+                # Validate data
+                serializer = self.get_serializer(data=request.data)
+                with stage('validate'):
+                    is_valid = serializer.is_valid()
 
                 if not is_valid:
-                    security_logger.warning(
-                        f"reCAPTCHA verification failed from IP {ip_address}: {errors}"
-                    )
-                    return Response(
-                        {
-                            'message': 'reCAPTCHA verification failed',
-                            'errors': {'recaptcha': ['Please complete the reCAPTCHA verification']}
-                        },
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-                # Check score threshold (0.5 = balanced, 0.7 = stricter)
-                if not check_recaptcha_score(score, threshold=0.5):
-                    security_logger.warning(
-                        f"reCAPTCHA score too low ({score:.2f}) from IP {ip_address}"
+                    # Return validation errors with 400 status
+                    logger.warning(
+                        "Contact form validation failed from IP %s: %s", ip_address, serializer.errors
                     )
                     return Response(
                         {
-                            'message': 'Suspicious activity detected',
-                            'errors': {'recaptcha': ['Your submission appears automated. Please try again.']}
+                            'message': 'Validation failed',
+                            'errors': serializer.errors
                         },
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-            # Validate data
-            serializer = self.get_serializer(data=request.data)
-
-            if not serializer.is_valid():
-                # Return validation errors with 400 status
-                logger.warning(
-                    f"Contact form validation failed from IP {ip_address}: {serializer.errors}"
-                )
-                return Response(
-                    {
-                        'message': 'Validation failed',
-                        'errors': serializer.errors
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Save with audit information
-            contact = serializer.save(
-                ip_address=ip_address,
-                user_agent=user_agent
-            )
-
-            # Log successful submission
-            logger.info(
-                f"Contact form submitted successfully: {contact.id} "
-                f"from {contact.email} (IP: {ip_address})"
-            )
+                contact = save_contact(serializer, ip_address, user_agent, recaptcha_degraded)
 
-            # Send email notification in background thread (non-blocking)
-            email_sent = True
-            thread = threading.Thread(
-                target=self._send_notification_email,
-                args=(contact,),
-                daemon=True
-            )
-            thread.start()
-
-            return Response(
-                {
-                    'message': 'Contact form submitted successfully. We will get back to you soon!',
-                    'data': {
-                        'id': contact.id,
-                        'email': contact.email,
-                        'name': contact.name,
-                        'created_at': contact.created_at,
-                    },
-                    'email_sent': email_sent  # Informational only
-                },
-                status=status.HTTP_201_CREATED
-            )
+                created = submission_response_data(contact)
+                return Response(created, status=status.HTTP_201_CREATED)
+            finally:
+                finish_submission(dedup_key, created)
 
         except Exception as e:
             # Catch any unexpected errors
             logger.error(
-                f"Unexpected error in contact form submission: {str(e)}",
+                "Unexpected error in contact form submission: %s", e,
                 exc_info=True
             )
             return Response(
@@ -176,67 +331,6 @@ class ContactViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def _send_notification_email(self, contact):
-        """
-        Send email notification for new contact submission
-        Handles missing email configuration gracefully
-        """
-        # Check if email is configured
-        if not settings.CONTACT_EMAIL_RECIPIENT:
-            logger.warning("Email recipient not configured. Skipping email notification.")
-            return
-
-        if not settings.DEFAULT_FROM_EMAIL:
-            logger.warning("Default from email not configured. Skipping email notification.")
-            return
-
-        # Customize subject line
-        subject = f"🔔 Averon.al - New Contact from {contact.name}"
-
-        # Customize email body
-        message = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-  AVERON.AL - NEW CONTACT FORM SUBMISSION
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-📧 CONTACT INFORMATION
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Name:    {contact.name}
-Email:   {contact.email}
-
-💬 MESSAGE
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-{contact.message}
-
-🔍 SUBMISSION DETAILS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-ID:            {contact.id}
-Submitted:     {contact.created_at.strftime('%B %d, %Y at %I:%M %p UTC')}
-IP Address:    {contact.ip_address}
-User Agent:    {contact.user_agent[:100]}...
-
-🔗 QUICK ACTIONS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-View in Admin: http://{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}:8000/admin/contact/contacts/{contact.id}/
-Reply to:      {contact.email}
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-This is an automated notification from Averon.al
-        """
-
-        try:
-            import resend
-            resend.api_key = settings.RESEND_API_KEY
-            resend.Emails.send({
-                "from": f"Averon <{settings.DEFAULT_FROM_EMAIL}>",
-                "to": [settings.CONTACT_EMAIL_RECIPIENT],
-                "subject": subject,
-                "text": message,
-            })
-        except Exception as e:
-            logger.error(f"send_mail failed: {str(e)}")
-            raise
-
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def mark_processed(self, request, pk=None):
         """
@@ -246,7 +340,7 @@ This is an automated notification from Averon.al
         contact.mark_as_processed()
 
         logger.info(
-            f"Contact {contact.id} marked as processed by {request.user.username}"
+            "Contact %s marked as processed by %s", contact.id, request.user.username
         )
 
         return Response({
@@ -255,10 +349,218 @@ This is an automated notification from Averon.al
         })
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    @conditional_response(unprocessed_contacts_scope, last_modified=False)
+    @cached_response
     def unprocessed(self, request):
         """
-        Get all unprocessed contacts (admin only)
+        Get unprocessed contacts, newest first, one page at a time (admin only)
         """
-        contacts = self.queryset.filter(is_processed=False)
+        contacts = self.paginate_queryset(self.queryset.filter(is_processed=False))
         serializer = self.get_serializer(contacts, many=True)
-        return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def timings(self, request):
+        """
+        Stage latency histograms of the worker process serving this request (admin only)
+        """
+        return Response({
+            'pid': os.getpid(),
+            'stages': stage_histograms(),
+        })
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def stats(self, request):
+        """
+        Submissions, processed count and mean time to process per day (admin only)
+
+        Query parameters: start and end (YYYY-MM-DD, inclusive). Read from
+        the ContactDailyStats rollup, so the cost grows with the number of
+        days rather than the number of contacts. Archived contacts count.
+        """
+        period = DailyStatsRangeSerializer(data=request.query_params)
+        if not period.is_valid():
+            return Response(
+                {
+                    'message': 'Validation failed',
+                    'errors': period.errors
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        days = ContactDailyStats.objects.filter(
+            Q(submissions__gt=0) | Q(archived__gt=0)
+        ).order_by('day')
+        if period.validated_data.get('start'):
+            days = days.filter(day__gte=period.validated_data['start'])
+        if period.validated_data.get('end'):
+            days = days.filter(day__lte=period.validated_data['end'])
+        days = list(days)
+
+        submissions = sum(day.total_submissions for day in days)
+        processed = sum(day.total_processed for day in days)
+        processing_seconds = sum(day.total_processing_seconds for day in days)
+        return Response({
+            'totals': {
+                'submissions': submissions,
+                'processed': processed,
+                'mean_processing_seconds': processing_seconds / processed if processed else None,
+            },
+            'days': ContactDailyStatsSerializer(days, many=True).data,
+        })
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def export(self, request):
+        """
+        Stream contacts as CSV or NDJSON (admin only)
+
+        Query parameters: export_format (csv or ndjson, default csv) and the
+        optional filters created_after, created_before, email, is_processed
+        and recaptcha_degraded.
+        """
+        params = request.query_params.dict()
+        export_format = params.pop('export_format', FORMAT_CSV)
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {
+                    'message': 'Validation failed',
+                    'errors': {'export_format': [f"Must be one of: {', '.join(EXPORT_FORMATS)}"]}
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filters = ContactFilterSerializer(data=params)
+        if not filters.is_valid():
+            return Response(
+                {
+                    'message': 'Validation failed',
+                    'errors': filters.errors
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logger.info(
+            "Contact export (%s) by %s: %s",
+            export_format, request.user.username, filters.validated_data
+        )
+        return export_response(filters.filter_queryset(Contacts.objects.all()), export_format)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def bulk_mark_processed(self, request):
+        """
+        Mark many contacts as processed in one set-based update (admin only)
+
+        Body is either {"ids": [...]} or {"filter": {...}} with any of
+        created_after, created_before, email, is_processed and
+        recaptcha_degraded.
+        """
+        selection = BulkMarkProcessedSerializer(data=request.data)
+        if not selection.is_valid():
+            return Response(
+                {
+                    'message': 'Validation failed',
+                    'errors': selection.errors
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        contacts = Contacts.objects.all()
+        if 'ids' in selection.validated_data:
+            contacts = contacts.filter(pk__in=selection.validated_data['ids'])
+        else:
+            contacts = selection.fields['filter'].filter_queryset(
+                contacts, selection.validated_data['filter']
+            )
+
+        count, processed_at = contacts.mark_as_processed(
+            chunk_size=settings.CONTACT_BULK_UPDATE_CHUNK_SIZE
+        )
+
+        logger.info(
+            "%s contact(s) marked as processed in bulk by %s", count, request.user.username
+        )
+
+        return Response({
+            'message': f'{count} contact(s) marked as processed',
+            'updated': count,
+            'processed_at': processed_at
+        })
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        permission_classes=[IsAuthenticated, IsAdminUser],
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk_import(self, request):
+        """
+        Import many contacts at once (admin only)
+
+        Accepts a JSON array (or {"contacts": [...]}) or NDJSON. Every row is
+        validated with the ContactSerializer rules; valid rows are inserted
+        with bulk_create in chunks of CONTACT_BULK_BATCH_SIZE and invalid rows
+        are reported by index. Imported contacts do not send notifications.
+        """
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get('contacts')
+        if not isinstance(rows, list):
+            return Response(
+                {'message': 'Expected a list of contacts'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > settings.CONTACT_BULK_MAX_ROWS:
+            return Response(
+                {'message': f'At most {settings.CONTACT_BULK_MAX_ROWS} contacts per request'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        # One serializer instance validates every row; building the field
+        # set per row would dominate the cost of large imports
+        validator = ContactSerializer()
+        contacts = []
+        errors = []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.append({'index': index, 'errors': {'non_field_errors': ['Expected an object']}})
+                continue
+            try:
+                data = validator.run_validation(row)
+            except ValidationError as e:
+                errors.append({'index': index, 'errors': e.detail})
+                continue
+            contacts.append(Contacts(
+                name=data['name'],
+                email=data['email'],
+                message=data['message'],
+            ))
+
+        batch_size = settings.CONTACT_BULK_BATCH_SIZE
+        for start in range(0, len(contacts), batch_size):
+            with transaction.atomic():
+                Contacts.objects.bulk_create(contacts[start:start + batch_size])
+        if contacts:
+            # bulk_create does not send post_save
+            invalidate_on_commit()
+
+        logger.info(
+            "Bulk import by %s: %s created, %s rejected",
+            request.user.username, len(contacts), len(errors)
+        )
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif contacts:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(
+            {
+                'created': len(contacts),
+                'failed': len(errors),
+                'errors': errors,
+            },
+            status=response_status
+        )
@@ -0,0 +1,169 @@
+"""
+Non-blocking logging pipeline
+
+Loggers write to a `QueueListenerHandler`, which only puts the record on an
+in-memory queue. A background listener thread takes records off the queue
+and hands them to the real handlers (console, rotating files), so message
+interpolation, JSON encoding and all blocking I/O happen off the request
+thread. Use lazy %-style arguments (`logger.info("... %s", value)`) so
+nothing is formatted on the request path either.
+
+The real handlers are attached to a "sink" logger that nothing logs to
+directly; the listener runs that logger's handlers. Configured from
+settings.LOGGING:
+
+    'handlers': {
+        'queue': {
+            '()': 'core.log.QueueListenerHandler',
+            'sink': 'logsink.default',
+            'queue_size': 10000,
+        },
+    },
+    'loggers': {
+        'logsink.default': {'handlers': ['console', 'file'], 'propagate': False},
+    }
+
+The sink is looked up when the listener starts (on the first record), so
+the order in which dictConfig builds the handlers does not matter.
+
+Queued records are flushed by `stop_listeners()`, which runs at interpreter
+exit and from gunicorn's worker_exit hook.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'taskName',
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line
+    """
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'process': record.process,
+            'thread': record.thread,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+_listeners = set()
+_listeners_lock = threading.Lock()
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Block rather than fail when the queue is full at shutdown
+        self.queue.put(self._sentinel)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Enqueue records for a background thread that runs a sink logger's handlers
+
+    Build it with the '()' key in LOGGING: with 'class', Python 3.12+
+    dictConfig sets up QueueHandler subclasses itself.
+
+    Args:
+        sink: Name of the logger whose handlers write the records
+        queue_size: Maximum queued records; further records are dropped
+            (and counted) rather than blocking the caller
+        respect_handler_level: Apply each target handler's own level
+    """
+
+    def __init__(self, sink, queue_size=10000, respect_handler_level=True):
+        super().__init__(queue.Queue(queue_size))
+        self.sink = sink
+        self.queue_size = queue_size
+        self.respect_handler_level = respect_handler_level
+        self.dropped = 0
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        # Started on first use rather than in __init__: a forked worker
+        # (gunicorn) inherits the handler but not the listener thread, so it
+        # starts its own with a fresh queue
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self.queue = queue.Queue(self.queue_size)
+            targets = logging.getLogger(self.sink).handlers
+            self.listener = _Listener(
+                self.queue, *targets, respect_handler_level=self.respect_handler_level
+            )
+            self.listener.start()
+            self._pid = os.getpid()
+            with _listeners_lock:
+                _listeners.add(self)
+
+    def prepare(self, record):
+        # The listener runs in this process, so the record is handed over as
+        # is; unlike QueueHandler, nothing is formatted on the caller's thread
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """
+        Stop the listener after it has written every queued record
+        """
+        with self._start_lock:
+            if self.listener is None or self._pid != os.getpid():
+                return
+            self.listener.stop()
+            self.listener = None
+            self._pid = None
+        if self.dropped:
+            sys.stderr.write(f"{self.dropped} log record(s) dropped: logging queue full\n")
+            self.dropped = 0
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+def stop_listeners():
+    """
+    Flush and stop every queue listener of this process
+    """
+    with _listeners_lock:
+        handlers = list(_listeners)
+        _listeners.clear()
+    for handler in handlers:
+        handler.stop()
+
+
+atexit.register(stop_listeners)
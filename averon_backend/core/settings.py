@@ -55,6 +55,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its total covers every other middleware
+    'contact.timing.ServerTimingMiddleware',
+    'contact.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -93,11 +96,19 @@ WSGI_APPLICATION = 'core.wsgi.application'
 DB_ENGINE = os.environ.get('DB_ENGINE', 'django.db.backends.sqlite3')
 
 if DB_ENGINE == 'django.db.backends.sqlite3':
-    # SQLite for development
+    # SQLite for development. WAL lets readers run alongside the writer;
+    # IMMEDIATE transactions take the write lock up front, so concurrent
+    # writers wait up to `timeout` seconds for it instead of failing with
+    # "database is locked" when a read lock cannot be upgraded.
     DATABASES = {
         'default': {
             'ENGINE': DB_ENGINE,
             'NAME': BASE_DIR / os.environ.get('DB_NAME', 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            }
         }
     }
 else:
@@ -205,11 +216,17 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'idempotency-key',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
 ]
+# Response headers browser clients may read
+CORS_EXPOSE_HEADERS = [
+    'idempotent-replayed',
+    'retry-after',
+]
 
 # ==============================================================================
 # REST FRAMEWORK SETTINGS
@@ -245,13 +262,68 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# ==============================================================================
+# CACHE AND RATE LIMITING
+# ==============================================================================
+
+# Shared Redis cache (the redis service in docker-compose.yml), e.g.
+# redis://:password@redis:6379/0. Throttle state, the reCAPTCHA circuit
+# breaker and cached responses are then shared by every worker. Without it
+# each process falls back to its own in-memory cache.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'averon',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# ContactSubmitThrottle uses GCRA (one timestamp per client) evaluated
+# atomically inside Redis when REDIS_URL is set, and in-process otherwise.
+# Seconds to wait for Redis before falling back to the in-process limiter.
+THROTTLE_REDIS_TIMEOUT = float(os.environ.get('THROTTLE_REDIS_TIMEOUT', '0.5'))
+
+# Read-through cache for the admin contact list/retrieve/unprocessed
+# endpoints, invalidated whenever a contact changes. Set the timeout to 0 to
+# disable it.
+CONTACT_RESPONSE_CACHE_ALIAS = os.environ.get('CONTACT_RESPONSE_CACHE_ALIAS', 'default')
+CONTACT_RESPONSE_CACHE_TIMEOUT = int(os.environ.get('CONTACT_RESPONSE_CACHE_TIMEOUT', '300'))
+
+# ==============================================================================
+# REQUEST TIMING AND METRICS
+# ==============================================================================
+
+# Per-stage timings (recaptcha, validate, db, notify, total) are always
+# aggregated in-process; who also gets them as a Server-Timing header:
+# 'staff' (staff users, everyone when DEBUG), 'always' or 'off'
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'staff')
+
+# Prometheus metrics at /metrics (not proxied by nginx). The scraper must send
+# "Authorization: Bearer <METRICS_TOKEN>"; while it is empty the endpoint
+# answers 403 to everyone. With several
+# worker processes, PROMETHEUS_MULTIPROC_DIR (environment only, set by
+# gunicorn.conf.py / start.sh) makes every worker's samples visible.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # ==============================================================================
 # API DOCUMENTATION (drf-spectacular)
 # ==============================================================================
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Averon Digital API',
-    'DESCRIPTION': 'RESTful API for Averon Digital web agency platform. Includes contact form management and business operations.',
+    'DESCRIPTION': (
+        'RESTful API for Averon Digital web agency platform. '
+        'Includes contact form management and business operations.'
+    ),
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
     'CONTACT': {
@@ -317,6 +389,29 @@ CONTACT_EMAIL_RECIPIENT = os.environ.get('CONTACT_EMAIL_RECIPIENT', EMAIL_HOST_U
 # Resend API
 RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
 
+# ==============================================================================
+# NOTIFICATION OUTBOX
+# ==============================================================================
+
+# Notifications are queued in the NotificationOutbox table in the same
+# transaction as the contact. After commit they are offered to a bounded
+# in-process pool (set NOTIFICATION_WORKERS=0 to disable); retries and anything
+# the pool could not take are handled by `manage.py process_notifications`.
+NOTIFICATION_WORKERS = int(os.environ.get('NOTIFICATION_WORKERS', '2'))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', '6'))
+NOTIFICATION_RETRY_BASE_SECONDS = int(os.environ.get('NOTIFICATION_RETRY_BASE_SECONDS', '30'))
+NOTIFICATION_RETRY_MAX_SECONDS = int(os.environ.get('NOTIFICATION_RETRY_MAX_SECONDS', '3600'))
+NOTIFICATION_LEASE_SECONDS = int(os.environ.get('NOTIFICATION_LEASE_SECONDS', '120'))
+
+# NOTIFICATION_MODE = 'digest' sends one email per batch of pending
+# notifications instead of one per submission: once NOTIFICATION_DIGEST_MAX_SIZE
+# are pending, or once the oldest has waited NOTIFICATION_DIGEST_INTERVAL_SECONDS.
+# Flushes take a lock in the cache; use Redis when running several processes.
+# Interval flushes need `manage.py process_notifications` running.
+NOTIFICATION_MODE = os.environ.get('NOTIFICATION_MODE', 'immediate')
+NOTIFICATION_DIGEST_INTERVAL_SECONDS = int(os.environ.get('NOTIFICATION_DIGEST_INTERVAL_SECONDS', '900'))
+NOTIFICATION_DIGEST_MAX_SIZE = int(os.environ.get('NOTIFICATION_DIGEST_MAX_SIZE', '50'))
+
 
 # ==============================================================================
 # RECAPTCHA CONFIGURATION
@@ -327,10 +422,105 @@ RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
 RECAPTCHA_SECRET_KEY = os.environ.get('RECAPTCHA_SECRET_KEY', '')
 RECAPTCHA_SITE_KEY = os.environ.get('RECAPTCHA_SITE_KEY', '')
 
+# Verification client: one pooled keep-alive session per worker process.
+# Point RECAPTCHA_VERIFY_URL at a local stub for tests and benchmarks.
+RECAPTCHA_VERIFY_URL = os.environ.get(
+    'RECAPTCHA_VERIFY_URL',
+    'https://www.google.com/recaptcha/api/siteverify'
+)
+RECAPTCHA_POOL_SIZE = int(os.environ.get('RECAPTCHA_POOL_SIZE', '10'))
+RECAPTCHA_CONNECT_TIMEOUT = float(os.environ.get('RECAPTCHA_CONNECT_TIMEOUT', '2'))
+RECAPTCHA_READ_TIMEOUT = float(os.environ.get('RECAPTCHA_READ_TIMEOUT', '3'))
+
+# Circuit breaker: after N failures (errors or calls slower than
+# SLOW_CALL_SECONDS) within FAILURE_WINDOW seconds, skip siteverify for
+# RESET_TIMEOUT seconds, then let a single probe through. State is kept in the
+# default cache, so it is shared by all workers when that cache is shared.
+RECAPTCHA_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('RECAPTCHA_BREAKER_FAILURE_THRESHOLD', '5'))
+RECAPTCHA_BREAKER_FAILURE_WINDOW = int(os.environ.get('RECAPTCHA_BREAKER_FAILURE_WINDOW', '30'))
+RECAPTCHA_BREAKER_RESET_TIMEOUT = int(os.environ.get('RECAPTCHA_BREAKER_RESET_TIMEOUT', '30'))
+RECAPTCHA_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('RECAPTCHA_BREAKER_SLOW_CALL_SECONDS', '2'))
+
+# What to do with submissions while the breaker is open:
+# 'reject' answers 503, 'accept' saves them flagged as recaptcha_degraded
+RECAPTCHA_DEGRADED_POLICY = os.environ.get('RECAPTCHA_DEGRADED_POLICY', 'reject')
+
+# ==============================================================================
+# BULK OPERATIONS
+# ==============================================================================
+
+# POST /api/contacts/bulk/ (admin only): rows per request and per INSERT
+CONTACT_BULK_MAX_ROWS = int(os.environ.get('CONTACT_BULK_MAX_ROWS', '50000'))
+CONTACT_BULK_BATCH_SIZE = int(os.environ.get('CONTACT_BULK_BATCH_SIZE', '1000'))
+
+# Rows per UPDATE when marking contacts processed in bulk (admin action and
+# POST /api/contacts/bulk_mark_processed/)
+CONTACT_BULK_UPDATE_CHUNK_SIZE = int(os.environ.get('CONTACT_BULK_UPDATE_CHUNK_SIZE', '5000'))
+
+# Rows fetched per database round trip by the streaming CSV/NDJSON export
+CONTACT_EXPORT_CHUNK_SIZE = int(os.environ.get('CONTACT_EXPORT_CHUNK_SIZE', '2000'))
+
+# ==============================================================================
+# ARCHIVAL
+# ==============================================================================
+
+# `manage.py archive_contacts` moves processed contacts older than
+# CONTACT_ARCHIVE_AFTER_DAYS into gzipped JSONL files under CONTACT_ARCHIVE_DIR,
+# CONTACT_ARCHIVE_CHUNK_SIZE rows per transaction; `restore_contacts` reverses it
+CONTACT_ARCHIVE_DIR = os.environ.get('CONTACT_ARCHIVE_DIR', str(BASE_DIR / 'archives'))
+CONTACT_ARCHIVE_AFTER_DAYS = int(os.environ.get('CONTACT_ARCHIVE_AFTER_DAYS', '365'))
+CONTACT_ARCHIVE_CHUNK_SIZE = int(os.environ.get('CONTACT_ARCHIVE_CHUNK_SIZE', '1000'))
+
+# ==============================================================================
+# ADMIN
+# ==============================================================================
+
+# The contacts changelist counts matching rows exactly up to this many and
+# uses the PostgreSQL planner estimate above it. Set to 0 to always count.
+ADMIN_EXACT_COUNT_LIMIT = int(os.environ.get('ADMIN_EXACT_COUNT_LIMIT', '10000'))
+
+# ==============================================================================
+# SPAM FILTERING
+# ==============================================================================
+
+# Optional JSON rule file for the contact message spam filter (see
+# contact/spam.py for the format). Changes are picked up by running workers
+# within SPAM_RULES_CHECK_INTERVAL seconds. Built-in rules are used when unset.
+SPAM_RULES_FILE = os.environ.get('SPAM_RULES_FILE', '')
+SPAM_RULES_CHECK_INTERVAL = float(os.environ.get('SPAM_RULES_CHECK_INTERVAL', '30'))
+
+# Optional disposable email domain blocklist, one domain per line (e.g. the
+# public disposable-email-domains list). Subdomains of listed domains are
+# rejected too. Reloaded within DISPOSABLE_DOMAINS_CHECK_INTERVAL seconds of a
+# change; a small built-in list is used when unset.
+DISPOSABLE_DOMAINS_FILE = os.environ.get('DISPOSABLE_DOMAINS_FILE', '')
+DISPOSABLE_DOMAINS_CHECK_INTERVAL = float(os.environ.get('DISPOSABLE_DOMAINS_CHECK_INTERVAL', '300'))
+
+# Identical submissions (same email and message, ignoring case and
+# whitespace) within CONTACT_DUPLICATE_WINDOW seconds get the first response
+# back without reCAPTCHA, validation, INSERT or email (see contact/dedup.py).
+# A duplicate of a submission still in flight gets 409 at once; the in-flight
+# claim expires after CONTACT_DUPLICATE_CLAIM_TIMEOUT seconds if its worker
+# dies. Set the window to 0 to disable.
+CONTACT_DUPLICATE_WINDOW = int(os.environ.get('CONTACT_DUPLICATE_WINDOW', '600'))
+CONTACT_DUPLICATE_CLAIM_TIMEOUT = int(os.environ.get('CONTACT_DUPLICATE_CLAIM_TIMEOUT', '60'))
+
+# Idempotency-Key on POST /api/contacts/: completed responses are kept for
+# CONTACT_IDEMPOTENCY_TTL seconds; retries made while the first request is
+# still running get 409 for up to CONTACT_IDEMPOTENCY_LOCK_TIMEOUT seconds.
+CONTACT_IDEMPOTENCY_TTL = int(os.environ.get('CONTACT_IDEMPOTENCY_TTL', '86400'))
+CONTACT_IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get('CONTACT_IDEMPOTENCY_LOCK_TIMEOUT', '30'))
+
 # ==============================================================================
 # LOGGING CONFIGURATION
 # ==============================================================================
 
+# Loggers write to the queue handlers, which only enqueue the record; the
+# console and file handlers run on a background thread (see core/log.py).
+# LOG_FORMAT is 'json' (one object per line, for log shippers) or 'text'.
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text' if DEBUG else 'json')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -343,6 +533,9 @@ LOGGING = {
             'format': '[{levelname}] {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'core.log.JSONFormatter',
+        },
     },
     'filters': {
         'require_debug_false': {
@@ -356,7 +549,7 @@ LOGGING = {
         'console': {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose' if not DEBUG else 'simple',
+            'formatter': 'json' if LOG_FORMAT == 'json' else ('verbose' if not DEBUG else 'simple'),
         },
         **({
             'file': {
@@ -365,7 +558,7 @@ LOGGING = {
                 'filename': BASE_DIR / 'logs' / 'django.log',
                 'maxBytes': 1024 * 1024 * 10,
                 'backupCount': 5,
-                'formatter': 'verbose',
+                'formatter': 'json' if LOG_FORMAT == 'json' else 'verbose',
             },
             'security_file': {
                 'level': 'WARNING',
@@ -373,24 +566,43 @@ LOGGING = {
                 'filename': BASE_DIR / 'logs' / 'security.log',
                 'maxBytes': 1024 * 1024 * 10,
                 'backupCount': 5,
-                'formatter': 'verbose',
+                'formatter': 'json' if LOG_FORMAT == 'json' else 'verbose',
                 'filters': ['require_debug_false'],
             },
         } if DEBUG else {}),
+        'queue': {
+            '()': 'core.log.QueueListenerHandler',
+            'sink': 'logsink.default',
+            'queue_size': LOG_QUEUE_SIZE,
+        },
+        'security_queue': {
+            '()': 'core.log.QueueListenerHandler',
+            'sink': 'logsink.security',
+            'queue_size': LOG_QUEUE_SIZE,
+        },
     },
     'loggers': {
-        'django': {
+        # Handlers run by the queue listeners; nothing logs here directly
+        'logsink.default': {
             'handlers': ['console'] + (['file'] if DEBUG else []),
+            'propagate': False,
+        },
+        'logsink.security': {
+            'handlers': ['console'] + (['security_file'] if DEBUG else []),
+            'propagate': False,
+        },
+        'django': {
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'django.security': {
-            'handlers': ['console'] + (['security_file'] if DEBUG else []),
+            'handlers': ['security_queue'],
             'level': 'WARNING',
             'propagate': False,
         },
         'django.request': {
-            'handlers': ['console'] + (['file'] if DEBUG else []),
+            'handlers': ['queue'],
             'level': 'WARNING',
             'propagate': False,
         },
@@ -0,0 +1,35 @@
+"""
+gunicorn settings shared by every way the backend is started
+
+gunicorn loads ./gunicorn.conf.py automatically; command-line flags (e.g. in
+start.sh or docker-compose.yml) still override anything set here.
+"""
+import os
+import shutil
+import tempfile
+
+# Prometheus multiprocess mode: every worker writes its metrics to mmap files
+# here and /metrics aggregates them. Must be set before the app is imported.
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'averon-prometheus'),
+)
+
+from prometheus_client import multiprocess  # noqa: E402 (needs the directory set)
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be added to this one
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    # Write out log records still queued for the background logging thread
+    from core.log import stop_listeners
+
+    stop_listeners()
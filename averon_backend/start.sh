@@ -4,6 +4,21 @@ set -e
 echo "Running database migrations..."
 python manage.py migrate --no-input
 
+# Shared directory for Prometheus metrics from all worker processes;
+# cleared on every start (gunicorn.conf.py does the same for gunicorn)
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/averon-prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    # Async submission path (POST /api/contacts/async/) under uvicorn
+    echo "Starting uvicorn on port ${PORT:-8080}..."
+    exec uvicorn core.asgi:application \
+        --host 0.0.0.0 \
+        --port ${PORT:-8080} \
+        --workers ${WEB_CONCURRENCY:-4}
+fi
+
 echo "Starting gunicorn on port ${PORT:-8080}..."
 exec gunicorn core.wsgi:application \
     --bind 0.0.0.0:${PORT:-8080} \